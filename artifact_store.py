@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import errno
+
+# Linux ioctl request number for FICLONE (copy-on-write clone of a whole file)
+FICLONE = 0x40049409
+
+# Name of the variant that always points at the downloaded bytes
+ORIGINAL_VARIANT = 'original'
+
+
+def _try_reflink(src, dst):
+    """
+    Try to create dst as a copy-on-write clone of src.
+
+    Returns:
+        bool: True if a reflink was created, False if the filesystem can't do it
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            import fcntl
+        except ImportError:
+            return False
+        try:
+            with open(src, 'rb') as src_f, open(dst, 'wb') as dst_f:
+                fcntl.ioctl(dst_f.fileno(), FICLONE, src_f.fileno())
+            return True
+        except OSError:
+            # Remove the empty destination left behind by a failed clone
+            if os.path.exists(dst):
+                os.remove(dst)
+            return False
+    if sys.platform == 'darwin':
+        # APFS supports clonefile(2), exposed by cp -c
+        import subprocess
+        result = subprocess.run(['cp', '-c', src, dst], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if result.returncode == 0:
+            return True
+        if os.path.exists(dst):
+            os.remove(dst)
+    return False
+
+
+def link_artifact(src, dst):
+    """
+    Make dst refer to the same bytes as src without duplicating them.
+
+    Tries a reflink first, then a hardlink. If neither is supported, nothing is
+    written and the caller should treat src as the single stored original.
+
+    Args:
+        src (str): Existing file
+        dst (str): Path for the linked variant
+
+    Returns:
+        str: 'reflink', 'hardlink' or 'original' (no second file was created)
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+
+    if _try_reflink(src, dst):
+        return 'reflink'
+
+    try:
+        os.link(src, dst)
+        return 'hardlink'
+    except OSError as e:
+        # EXDEV (cross-device), EPERM/ENOTSUP (filesystem doesn't support links)
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+            raise
+    return 'original'
+
+
+class ArtifactManifest:
+    """
+    Track the raw, denoised and encoded variants of one downloaded media file.
+
+    The manifest is stored as JSON next to the original file
+    ('<name>.manifest.json') and maps each variant name to its path and how
+    its bytes are stored.
+    """
+
+    def __init__(self, original_file):
+        self.original_file = os.path.abspath(original_file)
+        base, _ = os.path.splitext(self.original_file)
+        self.manifest_path = f"{base}.manifest.json"
+        self.variants = {}
+        if os.path.exists(self.manifest_path):
+            self.load()
+        self.add_variant(ORIGINAL_VARIANT, self.original_file, 'original')
+
+    def load(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.variants = data.get('variants', {})
+        except (OSError, ValueError) as e:
+            print(f"Could not read manifest {self.manifest_path}: {str(e)}")
+            self.variants = {}
+
+    def save(self):
+        data = {
+            'original': self.original_file,
+            'updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'variants': self.variants,
+        }
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def add_variant(self, name, path, storage, **details):
+        """
+        Record a variant of the original file.
+
+        Args:
+            name (str): Variant name, e.g. 'raw', 'denoised', 'mp3'
+            path (str): File holding the variant
+            storage (str): 'original', 'reflink', 'hardlink' or 'file'
+            **details: Extra information to keep (codec, bitrate, ...)
+        """
+        path = os.path.abspath(path)
+        entry = {
+            'path': path,
+            'storage': storage,
+            'size': os.path.getsize(path) if os.path.exists(path) else None,
+        }
+        entry.update(details)
+        self.variants[name] = entry
+
+    def get_path(self, name):
+        """Return the file path for a variant, or None if it isn't tracked"""
+        entry = self.variants.get(name)
+        return entry['path'] if entry else None
+
+    def stored_bytes(self):
+        """
+        Number of bytes actually occupied by the tracked variants.
+
+        Variants sharing the original's bytes (reflink, hardlink, original) are
+        only counted once.
+        """
+        total = 0
+        counted_original = False
+        for entry in self.variants.values():
+            if entry['storage'] in ('original', 'reflink', 'hardlink'):
+                if not counted_original:
+                    total += entry.get('size') or 0
+                    counted_original = True
+            else:
+                total += entry.get('size') or 0
+        return total
+
+
+def store_raw_variant(audio_file, manifest=None):
+    """
+    Register the '_raw' variant of a download without copying its bytes.
+
+    Args:
+        audio_file (str): Downloaded file
+        manifest (ArtifactManifest): Existing manifest, created if None
+
+    Returns:
+        tuple: (raw file path, storage method, manifest)
+    """
+    if manifest is None:
+        manifest = ArtifactManifest(audio_file)
+
+    base, ext = os.path.splitext(audio_file)
+    raw_file = f"{base}_raw{ext}"
+    storage = link_artifact(audio_file, raw_file)
+    if storage == 'original':
+        # No links available: the original file is the only stored copy
+        raw_file = audio_file
+    manifest.add_variant('raw', raw_file, storage)
+    manifest.save()
+    return raw_file, storage, manifest
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+import concurrent.futures
+
+from ydl_session import YdlSessionPool
+from download_job import build_ydl_options, download_url
+from job_server import run_denoise
+from playlist import is_collection_url, enumerate_entries
+from bandwidth import BandwidthManager, parse_rate
+
+# Target formats for the optional final encode
+ENCODE_ARGS = {
+    'mp3': ['-c:a', 'libmp3lame', '-b:a', '128k'],
+    'm4a': ['-c:a', 'aac', '-b:a', '128k'],
+    'opus': ['-c:a', 'libopus', '-b:a', '64k'],
+}
+
+# Marks the end of a stage queue
+END_OF_QUEUE = None
+
+
+class ResourceLimits:
+    """
+    One semaphore per contended resource.
+
+    network: concurrent yt-dlp downloads
+    cpu:     concurrent denoise jobs (each uses a full core)
+    ffmpeg:  concurrent ffmpeg/ffprobe subprocesses
+    """
+
+    def __init__(self, network=4, cpu=None, ffmpeg=None):
+        cpu = cpu or os.cpu_count() or 1
+        self.network_slots = network
+        self.cpu_slots = cpu
+        self.ffmpeg_slots = ffmpeg or cpu
+        self.network = asyncio.Semaphore(self.network_slots)
+        self.cpu = asyncio.Semaphore(self.cpu_slots)
+        self.ffmpeg = asyncio.Semaphore(self.ffmpeg_slots)
+
+
+async def run_ffmpeg(args, limits, timeout=None):
+    """
+    Run ffmpeg (or ffprobe) without blocking the event loop.
+
+    Args:
+        args (list): Full command line, starting with 'ffmpeg' or 'ffprobe'
+        limits (ResourceLimits): Shared limits; holds an ffmpeg slot while running
+        timeout (float): Kill the process after this many seconds
+
+    Returns:
+        bytes: The process's stdout
+
+    Raises:
+        asyncio.TimeoutError: If the process ran longer than timeout
+        RuntimeError: If the process exits with an error
+    """
+    async with limits.ffmpeg:
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+    if process.returncode != 0:
+        raise RuntimeError(f"{args[0]} failed: {stderr.decode(errors='replace').strip()}")
+    return stdout
+
+
+class Job:
+    """One URL moving through the download -> denoise -> encode stages"""
+
+    def __init__(self, url, label=None):
+        self.url = url
+        self.label = label or url
+        self.file = None
+        self.error = None
+        self.timings = {}
+
+
+class Orchestrator:
+    """
+    Run downloads, denoising and ffmpeg encodes concurrently in one process.
+
+    Each stage has its own workers connected by bounded queues, so a slow
+    stage makes the stages before it wait (backpressure) instead of piling up
+    finished downloads on disk. yt-dlp runs in a thread pool, denoising in a
+    process pool and ffmpeg as asyncio subprocesses, so network, CPU and disk
+    are busy at the same time.
+    """
+
+    def __init__(self, ydl_opts, limits, denoise=True, encode=None, queue_size=4,
+                 noise_duration=2.0, chunk_duration=30.0,
+                 download_timeout=None, denoise_timeout=None, ffmpeg_timeout=None,
+                 total_rate=None):
+        self.ydl_opts = ydl_opts
+        self.limits = limits
+        self.denoise = denoise
+        self.encode = encode
+        self.queue_size = queue_size
+        self.noise_duration = noise_duration
+        self.chunk_duration = chunk_duration
+        self.download_timeout = download_timeout
+        self.denoise_timeout = denoise_timeout
+        self.ffmpeg_timeout = ffmpeg_timeout
+        self.bandwidth = BandwidthManager(total_rate) if total_rate else None
+        self.sessions = YdlSessionPool(max_per_profile=limits.network_slots)
+        self.thread_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=limits.network_slots, thread_name_prefix='download')
+        self.process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=limits.cpu_slots)
+        self.finished = []
+
+    async def run(self, urls, enumerate_options=None):
+        """
+        Process every URL; collection URLs are expanded lazily.
+
+        Returns:
+            list: Finished Job objects (check job.error)
+        """
+        stages = [('download', self._download, self.limits.network_slots)]
+        if self.denoise:
+            stages.append(('denoise', self._denoise, self.limits.cpu_slots))
+        if self.encode:
+            stages.append(('encode', self._encode, self.limits.ffmpeg_slots))
+
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in stages]
+        done_queue = asyncio.Queue()
+        tasks = []
+        for index, (name, step, workers) in enumerate(stages):
+            out_queue = queues[index + 1] if index + 1 < len(queues) else done_queue
+            tasks.append(asyncio.ensure_future(
+                self._stage(name, step, workers, queues[index], out_queue)))
+        collector = asyncio.ensure_future(self._collect(done_queue))
+
+        try:
+            async for job in self._jobs(urls, enumerate_options or {}):
+                # Blocks while the first stage is full
+                await queues[0].put(job)
+            await queues[0].put(END_OF_QUEUE)
+            await asyncio.gather(*tasks, collector)
+        finally:
+            self.thread_pool.shutdown(wait=False, cancel_futures=True)
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+            self.sessions.close_all()
+        return self.finished
+
+    async def _jobs(self, urls, enumerate_options):
+        """Yield a Job per video, expanding playlists one entry at a time"""
+        loop = asyncio.get_running_loop()
+        for url in urls:
+            if not is_collection_url(url):
+                yield Job(url)
+                continue
+            entries = enumerate_entries(url, self.ydl_opts, **enumerate_options)
+            while True:
+                # Listing pages are fetched in a thread; only as fast as jobs are consumed
+                entry = await loop.run_in_executor(self.thread_pool, next, entries, None)
+                if entry is None:
+                    break
+                yield Job(entry['url'], f"#{entry['index']} {entry['title'] or entry['url']}")
+
+    async def _stage(self, name, step, workers, in_queue, out_queue):
+        """Run workers on in_queue and pass every job (failed ones too) to out_queue"""
+        async def worker():
+            while True:
+                job = await in_queue.get()
+                if job is END_OF_QUEUE:
+                    # Let the other workers of this stage see the end as well
+                    await in_queue.put(END_OF_QUEUE)
+                    return
+                start = time.time()
+                try:
+                    await step(job)
+                except Exception as e:
+                    job.error = f"{name} failed: {str(e) or type(e).__name__}"
+                job.timings[name] = time.time() - start
+                await out_queue.put(job)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        await out_queue.put(END_OF_QUEUE)
+
+    async def _collect(self, done_queue):
+        """Gather jobs leaving the last stage and report each one"""
+        while True:
+            job = await done_queue.get()
+            if job is END_OF_QUEUE:
+                return
+            self.finished.append(job)
+            timings = ', '.join(f"{name} {seconds:.1f}s" for name, seconds in job.timings.items())
+            if job.error:
+                print(f"[FAILED] {job.label}: {job.error}")
+            else:
+                print(f"[DONE] {job.label} -> {job.file} ({timings})")
+
+    async def _submit(self, semaphore, executor, func, *args, before_start=None):
+        """
+        Start func in executor once semaphore has a free slot.
+
+        Threads and pool processes can't be killed when a timeout fires, so the
+        slot is released when the work really finishes, not when we stop waiting.
+        before_start, if given, runs once the slot is taken and before func
+        starts; the function it returns (if any) runs when func finishes.
+        """
+        await semaphore.acquire()
+        cleanup = None
+        try:
+            if before_start is not None:
+                cleanup = before_start()
+            future = asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BaseException:
+            if cleanup is not None:
+                cleanup()
+            semaphore.release()
+            raise
+
+        def finished(f):
+            semaphore.release()
+            if cleanup is not None:
+                cleanup()
+        future.add_done_callback(finished)
+        return future
+
+    async def _download(self, job):
+        cancel_event = threading.Event()
+        share = None
+
+        def progress_hook(d):
+            # A worker thread can't be killed; stop it at its next progress update
+            if cancel_event.is_set():
+                from yt_dlp.utils import DownloadCancelled
+                raise DownloadCancelled("Download timed out")
+            if share is not None:
+                share.progress_hook(d)
+
+        def take_share():
+            # Registered before the download thread starts, so its first bytes are throttled too
+            nonlocal share
+            share = self.bandwidth.register(job.label)
+            return share.release
+
+        print(f"Downloading: {job.label}")
+        future = await self._submit(self.limits.network, self.thread_pool, download_url,
+                                    job.url, self.ydl_opts, self.sessions, progress_hook,
+                                    before_start=take_share if self.bandwidth is not None else None)
+        try:
+            job.file, info = await asyncio.wait_for(asyncio.shield(future), self.download_timeout)
+        except asyncio.TimeoutError:
+            cancel_event.set()
+            raise
+        job.label = info.get('title') or job.label
+
+    async def _denoise(self, job):
+        if job.error:
+            return
+        print(f"Denoising: {job.file}")
+        future = await self._submit(self.limits.cpu, self.process_pool, run_denoise,
+                                    job.file, None, self.noise_duration, self.chunk_duration)
+        job.file = await asyncio.wait_for(asyncio.shield(future), self.denoise_timeout)
+
+    async def _encode(self, job):
+        if job.error:
+            return
+        output_file = f"{os.path.splitext(job.file)[0]}.{self.encode}"
+        if output_file == job.file:
+            return
+        await run_ffmpeg([
+            'ffmpeg', '-y', '-v', 'error', '-i', job.file,
+            '-vn', *ENCODE_ARGS[self.encode], output_file
+        ], self.limits, self.ffmpeg_timeout)
+        job.file = output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Download, denoise and encode many URLs concurrently in one process')
+    parser.add_argument('urls', nargs='+', help='Video, playlist or channel URLs')
+    parser.add_argument('-o', '--output-dir', default=os.path.expanduser('~/Downloads'),
+                        help='Download directory')
+    parser.add_argument('--no-denoise', action='store_true', help='Only download (and encode)')
+    parser.add_argument('--encode', choices=sorted(ENCODE_ARGS), default=None,
+                        help='Encode the final file to this format with ffmpeg')
+    parser.add_argument('--downloads', type=int, default=4, help='Concurrent downloads, default 4')
+    parser.add_argument('--cpu-workers', type=int, default=os.cpu_count() or 1,
+                        help='Concurrent denoise jobs, default: number of CPUs')
+    parser.add_argument('--ffmpeg-workers', type=int, default=None,
+                        help='Concurrent ffmpeg processes, default: number of CPU workers')
+    parser.add_argument('--queue-size', type=int, default=4,
+                        help='Jobs waiting between stages before earlier stages pause, default 4')
+    parser.add_argument('--download-timeout', type=float, default=None, help='Seconds per download')
+    parser.add_argument('--denoise-timeout', type=float, default=None, help='Seconds per denoise job')
+    parser.add_argument('--ffmpeg-timeout', type=float, default=None, help='Seconds per ffmpeg encode')
+    parser.add_argument('--bandwidth-saver', action='store_true',
+                        help='Pick the smallest audio stream that keeps speech quality')
+    parser.add_argument('--total-rate', type=parse_rate, default=None,
+                        help='Total download rate shared by running downloads, e.g. 5M (bytes/s); '
+                             'bandwidth a slow download cannot use goes to the others')
+    parser.add_argument('--proxy', default=None, help='Proxy URL for downloads')
+    parser.add_argument('--playlist-items', default=None, help="Playlist indices to process, e.g. '1-20,25'")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    ydl_opts = build_ydl_options(args.output_dir, media='audio', proxy=args.proxy,
+                                 bandwidth_saver=args.bandwidth_saver)
+
+    async def orchestrate():
+        # Semaphores must be created inside the running loop
+        limits = ResourceLimits(args.downloads, args.cpu_workers, args.ffmpeg_workers)
+        orchestrator = Orchestrator(
+            ydl_opts, limits,
+            denoise=not args.no_denoise,
+            encode=args.encode,
+            queue_size=args.queue_size,
+            download_timeout=args.download_timeout,
+            denoise_timeout=args.denoise_timeout,
+            ffmpeg_timeout=args.ffmpeg_timeout,
+            total_rate=args.total_rate
+        )
+        return await orchestrator.run(args.urls, {'playlist_items': args.playlist_items})
+
+    start = time.time()
+    jobs = asyncio.run(orchestrate())
+    failed = [job for job in jobs if job.error]
+    print(f"\nFinished {len(jobs) - len(failed)}/{len(jobs)} jobs in {time.time() - start:.1f} seconds")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+import time
+import threading
+
+# Relative share of the total rate per priority level
+PRIORITY_WEIGHTS = {'high': 4.0, 'normal': 2.0, 'low': 1.0}
+
+# How often shares are re-balanced while downloads are running (seconds)
+REBALANCE_INTERVAL = 2.0
+
+# A job reaching less than this fraction of its share is limited by the source,
+# not by us; its unused share goes to the other jobs
+UNDERUSE_RATIO = 0.9
+
+# Such a job keeps this much more than its achieved speed, so it can speed up again
+HEADROOM = 1.25
+
+# Bytes a job may burst above its rate, as seconds of its rate
+BURST_SECONDS = 0.5
+
+# Lowest rate a capped job gets (bytes/s), so a stalled job that measured
+# speed 0 can start moving again
+MIN_RATE = 32 * 1024
+
+_RATE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def parse_rate(text):
+    """
+    Parse a rate like '500K', '2.5M' or '1048576' into bytes per second.
+
+    Returns:
+        float: Bytes per second, or None for an empty value
+
+    Raises:
+        ValueError: If the text is not a valid rate
+    """
+    if text in (None, ''):
+        return None
+    value = str(text).strip().upper()
+    for suffix in ('/S', 'B'):
+        if value.endswith(suffix):
+            value = value[:-len(suffix)]
+    unit = value[-1:] if value[-1:] in _RATE_UNITS else ''
+    number = value[:-1] if unit else value
+    try:
+        rate = float(number) * _RATE_UNITS[unit]
+    except ValueError:
+        raise ValueError(f"Invalid rate '{text}', expected e.g. 500K or 2M")
+    if rate <= 0:
+        raise ValueError(f"Rate must be positive, got '{text}'")
+    return rate
+
+
+class BandwidthShare:
+    """
+    One download's slice of the total rate.
+
+    Pass progress_hook to yt-dlp; it sleeps the download thread whenever the
+    job gets ahead of its current allocation (a token bucket refilled at rate).
+    Safe to call from several fragment threads of one download at once.
+    """
+
+    def __init__(self, manager, name, weight):
+        self.manager = manager
+        self.name = name
+        self.weight = weight
+        # Bytes per second; None means unlimited
+        self.rate = None
+        self.speed = None
+        self._last_bytes = None
+        self._allowance = 0.0
+        self._last_time = time.monotonic()
+        self._window_start = self._last_time
+        self._window_bytes = 0
+        # Guards the bucket and the speed window; never held while sleeping
+        self._lock = threading.Lock()
+
+    def progress_hook(self, d):
+        """yt-dlp progress hook that throttles this download"""
+        if d.get('status') == 'downloading':
+            self.throttle(d.get('downloaded_bytes') or 0)
+
+    def throttle(self, downloaded_bytes):
+        """
+        Account for downloaded_bytes (cumulative for the current file) and
+        sleep as long as needed to stay within the allocated rate.
+        """
+        delay = 0.0
+        with self._lock:
+            if self._last_bytes is None or downloaded_bytes < self._last_bytes:
+                # First report, or a new file started (e.g. video then audio of one job);
+                # bytes resumed from a partial file were not downloaded now
+                self._last_bytes = downloaded_bytes
+            delta = downloaded_bytes - self._last_bytes
+            self._last_bytes = downloaded_bytes
+
+            now = time.monotonic()
+            rebalance = self._measure(delta, now)
+            rate = self.rate
+            if rate is None:
+                self._last_time = now
+            else:
+                # _last_time may lie ahead while another thread sleeps off a debt;
+                # that time is already spent, so this thread waits behind it
+                self._allowance = min(self._allowance + (now - self._last_time) * rate, rate * BURST_SECONDS)
+                self._allowance -= delta
+                self._last_time = now
+                if self._allowance < 0:
+                    delay = -self._allowance / rate
+                    self._allowance = 0.0
+                    self._last_time = now + delay
+        if rebalance:
+            self.manager.rebalance()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _measure(self, delta, now):
+        """Track the achieved speed (lock held); True when a re-balance is due"""
+        self._window_bytes += delta
+        elapsed = now - self._window_start
+        if elapsed < REBALANCE_INTERVAL:
+            return False
+        self.speed = self._window_bytes / elapsed
+        self._window_start = now
+        self._window_bytes = 0
+        return True
+
+    def release(self):
+        """Give this share back; the remaining jobs get its bandwidth"""
+        self.manager.release(self)
+
+
+class BandwidthManager:
+    """
+    Split one total download rate across concurrent downloads.
+
+    Each download gets total * weight / sum(weights), where weight comes from
+    its priority. Downloads that can't use their share (a slow source or an
+    almost finished file) are capped near their achieved speed and the rest
+    is handed to the others. Shares are recomputed when a download starts or
+    finishes and every REBALANCE_INTERVAL seconds while data flows.
+    """
+
+    def __init__(self, total_rate):
+        self.total_rate = total_rate
+        self.lock = threading.Lock()
+        self.shares = []
+
+    def register(self, name, priority='normal', weight=None):
+        """
+        Add a download and return its BandwidthShare.
+
+        Args:
+            name (str): Label used in log messages
+            priority (str): 'high', 'normal' or 'low'
+            weight (float): Explicit weight; overrides priority
+        """
+        if weight is None:
+            if priority not in PRIORITY_WEIGHTS:
+                raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(PRIORITY_WEIGHTS)}")
+            weight = PRIORITY_WEIGHTS[priority]
+        share = BandwidthShare(self, name, float(weight))
+        with self.lock:
+            self.shares.append(share)
+            self._allocate()
+        return share
+
+    def release(self, share):
+        with self.lock:
+            if share in self.shares:
+                self.shares.remove(share)
+                # Let everyone try for the freed bandwidth; caps come back with the next measurement
+                for other in self.shares:
+                    other.speed = None
+                self._allocate()
+
+    def rebalance(self):
+        with self.lock:
+            self._allocate()
+
+    def _allocate(self):
+        """Weighted max-min fair allocation (lock held)"""
+        remaining = self.total_rate
+        active = list(self.shares)
+        while active:
+            total_weight = sum(share.weight for share in active)
+            fair = {share: remaining * share.weight / total_weight for share in active}
+            # Jobs that couldn't use their previous rate only get what they used, plus headroom
+            limited = [
+                share for share in active
+                if share.speed is not None and share.rate is not None
+                and share.speed < share.rate * UNDERUSE_RATIO
+                and self._capped_rate(share) < fair[share]
+            ]
+            if not limited:
+                for share in active:
+                    share.rate = fair[share]
+                return
+            for share in limited:
+                share.rate = self._capped_rate(share)
+                remaining -= share.rate
+                active.remove(share)
+
+    @staticmethod
+    def _capped_rate(share):
+        """Rate of a job held back by its source: achieved speed plus headroom, at least MIN_RATE"""
+        return max(share.speed * HEADROOM, MIN_RATE)
+
+    def describe(self):
+        """One line per active download with its rate and achieved speed"""
+        with self.lock:
+            lines = []
+            for share in self.shares:
+                speed = f"{share.speed / 1024:.0f} KB/s" if share.speed is not None else "n/a"
+                allowed = f"{share.rate / 1024:.0f} KB/s" if share.rate is not None else "unlimited"
+                lines.append(f"{share.name}: {allowed} allowed, {speed} achieved")
+            return lines
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+import os
+import wave
+import heapq
+import threading
+import concurrent.futures
+
+from ffmpeg_tools import probe_media
+
+# Samples per second one worker denoises, before any batch has been timed
+# (about 15x real time for 44.1 kHz audio)
+DEFAULT_SAMPLES_PER_SECOND = 44100 * 15
+
+# Assumed when a file can't be probed: bitrate (bits/s) and sample rate
+FALLBACK_BITRATE = 128000
+FALLBACK_SAMPLE_RATE = 44100
+
+# Parallel ffprobe calls when probing a batch
+PROBE_THREADS = 8
+
+
+def probe_duration(path):
+    """
+    Read a file's duration and sample rate without decoding it.
+
+    WAV headers are read directly; other formats go through ffprobe. When
+    both fail the duration is guessed from the file size.
+
+    Returns:
+        dict: duration (seconds), sample_rate, channels (None if unknown),
+              estimated (True if guessed from size)
+    """
+    if path.lower().endswith('.wav'):
+        try:
+            with wave.open(path, 'rb') as f:
+                rate = f.getframerate()
+                return {'duration': f.getnframes() / rate, 'sample_rate': rate,
+                        'channels': f.getnchannels(), 'estimated': False}
+        except (wave.Error, EOFError, OSError):
+            pass  # e.g. float WAV, which the wave module can't read; ffprobe can
+    try:
+        info = probe_media(path)
+        if info['duration']:
+            return {
+                'duration': info['duration'],
+                'sample_rate': info['sample_rate'] or FALLBACK_SAMPLE_RATE,
+                'channels': info['channels'],
+                'estimated': False,
+            }
+    except Exception:
+        pass
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    return {'duration': size * 8 / FALLBACK_BITRATE, 'sample_rate': FALLBACK_SAMPLE_RATE,
+            'channels': None, 'estimated': True}
+
+
+def probe_batch(paths):
+    """Probe several files in parallel; returns {path: probe_duration(path)}"""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=PROBE_THREADS) as executor:
+        return dict(zip(paths, executor.map(probe_duration, paths)))
+
+
+class CostModel:
+    """
+    Predict processing time from the number of samples to denoise.
+
+    Denoising time grows with duration x sample rate. The speed starts at
+    DEFAULT_SAMPLES_PER_SECOND and is corrected as files finish, so the ETA
+    adapts to the machine.
+    """
+
+    def __init__(self, samples_per_second=DEFAULT_SAMPLES_PER_SECOND, smoothing=0.3):
+        self.samples_per_second = samples_per_second
+        self.smoothing = smoothing
+        self.observed = 0
+        self.lock = threading.Lock()
+
+    def cost(self, probe):
+        """Predicted seconds for one worker to process a file described by probe_duration()"""
+        return probe['duration'] * probe['sample_rate'] / self.samples_per_second
+
+    def observe(self, probe, elapsed):
+        """Update the speed from a file that took elapsed seconds"""
+        if elapsed <= 0 or not probe['duration']:
+            return
+        speed = probe['duration'] * probe['sample_rate'] / elapsed
+        with self.lock:
+            if self.observed == 0:
+                self.samples_per_second = speed
+            else:
+                self.samples_per_second += self.smoothing * (speed - self.samples_per_second)
+            self.observed += 1
+
+
+def longest_first(items, cost):
+    """Sort items by cost(item), largest first (LPT order)"""
+    return sorted(items, key=cost, reverse=True)
+
+
+def predict_makespan(costs, workers, busy=()):
+    """
+    Predict when a batch finishes if queued jobs go, longest first, to the next free worker.
+
+    Args:
+        costs: Predicted seconds of each queued job
+        workers (int): Number of workers
+        busy: Remaining seconds of the jobs already running
+
+    Returns:
+        float: Seconds until the last job finishes
+    """
+    finish_times = sorted(busy)[-workers:] if workers > 0 else []
+    finish_times += [0.0] * (max(1, workers) - len(finish_times))
+    heapq.heapify(finish_times)
+    for cost in sorted(costs, reverse=True):
+        heapq.heappush(finish_times, heapq.heappop(finish_times) + cost)
+    return max(finish_times)
+
+
+def format_eta(seconds):
+    """Short duration text, e.g. '2h 05m', '12m 30s', '45s'"""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
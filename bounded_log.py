@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import os
+import time
+import threading
+import collections
+import logging
+import logging.handlers
+import tkinter as tk
+
+# Lines kept in the log pane before older ones spill to disk
+DEFAULT_MAX_LINES = 1000
+
+# Directory holding the rotating spill files
+DEFAULT_LOG_DIR = os.path.expanduser('~/.youtube_media_downloader/logs')
+
+
+class BoundedLog:
+    """
+    Ring-buffer log for a ScrolledText pane.
+
+    append() may be called from any thread; messages are collected and
+    inserted once per Tk frame. Only the newest max_lines lines stay in the
+    widget, older ones are written to a rotating log file.
+    """
+
+    def __init__(self, root, text_widget, status_var=None, name='app',
+                 max_lines=DEFAULT_MAX_LINES, log_dir=DEFAULT_LOG_DIR,
+                 max_file_bytes=5 * 1024 * 1024, backup_count=3, fps=10):
+        """
+        Args:
+            root: Tk root used to schedule flushes
+            text_widget: ScrolledText showing the log (kept in DISABLED state)
+            status_var: Optional StringVar set to the latest message
+            name (str): Spill file name ('<name>.log')
+            max_lines (int): Number of lines retained in the widget
+            log_dir (str): Directory for spill files, None to drop old lines
+            max_file_bytes (int): Size at which the spill file rotates
+            backup_count (int): Number of rotated spill files to keep
+            fps (int): Maximum widget updates per second
+        """
+        self.root = root
+        self.text_widget = text_widget
+        self.status_var = status_var
+        self.max_lines = max(1, int(max_lines))
+        self.interval_ms = max(1, int(1000 / fps))
+        self.lines = collections.deque()
+        self.pending = []
+        self.lock = threading.Lock()
+        self._flush_scheduled = False
+        self.spill_logger = self._create_spill_logger(name, log_dir, max_file_bytes, backup_count)
+
+    def _create_spill_logger(self, name, log_dir, max_file_bytes, backup_count):
+        if not log_dir:
+            return None
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, f"{name}.log"),
+                maxBytes=max_file_bytes,
+                backupCount=backup_count,
+                encoding='utf-8'
+            )
+        except OSError as e:
+            print(f"Could not open log spill file in {log_dir}: {str(e)}")
+            return None
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger = logging.getLogger(f"bounded_log.{name}.{id(self)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        return logger
+
+    def append(self, message):
+        """Queue a message for the log pane (thread-safe)"""
+        timestamp = time.strftime("%H:%M:%S")
+        line = f"[{timestamp}] {message}"
+        with self.lock:
+            self.pending.append(line)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        try:
+            self.root.after(self.interval_ms, self.flush)
+        except (RuntimeError, tk.TclError):
+            # Tk is shutting down; nothing left to display
+            pass
+
+    def flush(self):
+        """Insert pending lines in one go and trim the pane (Tk thread only)"""
+        with self.lock:
+            batch = self.pending
+            self.pending = []
+            self._flush_scheduled = False
+        if not batch:
+            return
+
+        self.lines.extend(batch)
+        spilled = []
+        while len(self.lines) > self.max_lines:
+            spilled.append(self.lines.popleft())
+        if self.spill_logger is not None:
+            for line in spilled:
+                self.spill_logger.info(line)
+
+        self.text_widget.config(state=tk.NORMAL)
+        # A batch larger than the pane only needs its newest lines inserted
+        shown = batch[-self.max_lines:]
+        self.text_widget.insert(tk.END, "\n".join(shown) + "\n")
+        # The widget always ends with an empty line after the trailing newline
+        widget_lines = int(self.text_widget.index('end-1c').split('.')[0]) - 1
+        excess = widget_lines - self.max_lines
+        if excess > 0:
+            self.text_widget.delete('1.0', f'{excess + 1}.0')
+        self.text_widget.see(tk.END)
+        self.text_widget.config(state=tk.DISABLED)
+
+        if self.status_var is not None:
+            self.status_var.set(batch[-1].split('] ', 1)[-1])
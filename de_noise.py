@@ -9,6 +9,9 @@ from tqdm import tqdm
 import subprocess
 import time
 import signal
+import tempfile
+
+from ffmpeg_tools import is_video_file, probe_media, audio_encoder_for
 
 # Import TimeoutException from process_audio_robust.py
 # Check if we can import it from the module
@@ -36,17 +39,287 @@ try:
         print("Please install ffmpeg and try again.")
         print("Installation command example (Homebrew): brew install ffmpeg")
         sys.exit(1)
-    print("ffmpeg installation detected")
+    # stderr, so stdout stays clean for --stream output
+    print("ffmpeg installation detected", file=sys.stderr)
 except Exception:
     print("ERROR: ffmpeg is required but error occurred during detection!")
     sys.exit(1)
 
 
+def denoise_chunks(audio_data, sr, noise_sample, chunk_duration: float = 30.0, progress=None):
+    """Yield denoised chunks of audio_data, chunk_duration seconds each.
+
+    Args:
+        audio_data: Mono audio samples
+        sr: Sample rate
+        noise_sample: Samples containing only background noise
+        chunk_duration: Duration for chunk processing (seconds)
+        progress: Optional callable(chunks_done, total_chunks) called after each chunk
+    """
+    chunk_size = max(1, int(chunk_duration * sr))
+    total_chunks = max(1, int(np.ceil(len(audio_data) / chunk_size)))
+    
+    with tqdm(total=total_chunks, desc="Processing progress") as pbar:
+        for i in range(total_chunks):
+            chunk = audio_data[i * chunk_size:(i + 1) * chunk_size]
+            yield nr.reduce_noise(y=chunk, y_noise=noise_sample, sr=sr)
+            pbar.update(1)
+            if progress is not None:
+                progress(i + 1, total_chunks)
+
+
+class BlockDenoiser:
+    """Denoise an unbounded mono stream in fixed-size blocks.
+
+    Each block is denoised together with context_duration seconds of audio
+    on both sides, and only the block itself is kept, so there are no clicks
+    at block edges. Output lags input by block_duration + context_duration
+    seconds, and memory use does not depend on the stream length.
+
+    Blocks use stationary noise reduction against the fixed noise sample,
+    which keeps processing well under real time on one core.
+
+    Args:
+        sr: Sample rate
+        noise_sample: Samples containing only background noise
+        block_duration: Seconds of audio denoised per step
+        context_duration: Seconds of extra audio on each side of a block
+    """
+
+    def __init__(self, sr, noise_sample, block_duration: float = 1.0, context_duration: float = 0.25):
+        self.sr = sr
+        self.noise_sample = np.asarray(noise_sample, dtype=np.float32)
+        self.block_size = max(1, int(block_duration * sr))
+        self.context_size = int(context_duration * sr)
+        self.latency = (self.block_size + self.context_size) / sr
+        self._history = np.zeros(0, dtype=np.float32)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self.processed_seconds = 0.0
+        self.processing_time = 0.0
+
+    @property
+    def realtime_factor(self):
+        """Processing time divided by audio duration (below 1 keeps up with real time)"""
+        return self.processing_time / self.processed_seconds if self.processed_seconds else 0.0
+
+    def process(self, samples):
+        """Add samples; returns the denoised samples that are ready (possibly none)"""
+        self._pending = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)])
+        ready = []
+        # A block can be finished once its right-hand context has arrived
+        while len(self._pending) >= self.block_size + self.context_size:
+            ready.append(self._denoise_block(self.block_size))
+        return np.concatenate(ready) if ready else np.zeros(0, dtype=np.float32)
+
+    def flush(self):
+        """Denoise whatever is left at the end of the stream"""
+        if not len(self._pending):
+            return np.zeros(0, dtype=np.float32)
+        return self._denoise_block(len(self._pending))
+
+    def _denoise_block(self, size):
+        start = time.time()
+        window = np.concatenate([self._history, self._pending[:size + self.context_size]])
+        reduced = nr.reduce_noise(y=window, y_noise=self.noise_sample, sr=self.sr, stationary=True)
+        block = np.asarray(reduced[len(self._history):len(self._history) + size], dtype=np.float32)
+        # The end of this block is the left-hand context of the next one
+        self._history = self._pending[max(0, size - self.context_size):size]
+        self._pending = self._pending[size:]
+        self.processing_time += time.time() - start
+        self.processed_seconds += size / self.sr
+        return block
+
+
+def save_noise_profile(path, noise_sample, sr):
+    """Save a noise sample for later --noise-profile use (.npz)"""
+    np.savez(path, noise=np.asarray(noise_sample, dtype=np.float32), sr=sr)
+
+
+def load_noise_profile(path, sr):
+    """Load a noise sample from a saved .npz profile or any audio file, resampled to sr
+
+    Args:
+        path: Profile (.npz from save_noise_profile) or audio file containing only noise
+        sr: Sample rate of the stream the profile will be used with
+    """
+    if path.lower().endswith('.npz'):
+        with np.load(path) as profile:
+            noise, profile_sr = profile['noise'], int(profile['sr'])
+    else:
+        noise, profile_sr = librosa.load(path, sr=None, mono=True)
+    if profile_sr != sr:
+        noise = librosa.resample(noise, orig_sr=profile_sr, target_sr=sr)
+    return np.asarray(noise, dtype=np.float32)
+
+
+def reduce_noise_video(
+    input_file: str,
+    output_file: str = None,
+    noise_sample_duration: float = 2.0,
+    chunk_duration: float = 30.0,
+    progress=None
+):
+    """Apply noise reduction to the audio track of a video file.
+    
+    The audio is decoded through a pipe, denoised chunk by chunk and muxed back
+    with the video stream copied, so the video is never re-encoded.
+    
+    Args:
+        input_file: Input video file path
+        output_file: Output video file path, if None will add '_denoised' to the original filename
+        noise_sample_duration: Duration for noise sampling (seconds), default first 2 seconds
+        chunk_duration: Duration for chunk processing (seconds)
+        progress: Optional callable(chunks_done, total_chunks), see denoise_chunks
+    """
+    info = probe_media(input_file)
+    if not info['has_audio']:
+        raise ValueError(f"No audio track found in {input_file}")
+    sr = info['sample_rate'] or 44100
+    
+    if output_file is None:
+        file_path = Path(input_file)
+        output_file = str(file_path.parent / f"{file_path.stem}_denoised{file_path.suffix}")
+    os.makedirs(Path(output_file).parent, exist_ok=True)
+    
+    # Decode only the first audio track to raw 32-bit float mono PCM
+    print(f"Decoding audio track of {input_file} ({sr} Hz)")
+    start_time = time.time()
+    result = subprocess.run([
+        'ffmpeg', '-v', 'error', '-i', input_file,
+        '-map', '0:a:0', '-vn', '-f', 'f32le', '-acodec', 'pcm_f32le',
+        '-ac', '1', '-ar', str(sr), 'pipe:1'
+    ], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    audio_data = np.frombuffer(result.stdout, dtype=np.float32)
+    print(f"Audio decoded in {time.time() - start_time:.2f} seconds, duration: {len(audio_data)/sr:.2f} seconds")
+    
+    noise_sample = audio_data[:int(noise_sample_duration * sr)]
+    
+    # Mux the denoised PCM (stdin) with the original video stream (stream copy)
+    print(f"Applying noise reduction and muxing into: {output_file}")
+    start_time = time.time()
+    with tempfile.TemporaryFile() as ffmpeg_log:
+        mux = subprocess.Popen([
+            'ffmpeg', '-y', '-v', 'error',
+            '-i', input_file,
+            '-f', 'f32le', '-ar', str(sr), '-ac', '1', '-i', 'pipe:0',
+            '-map', '0:v?', '-map', '1:a',
+            '-c:v', 'copy', *audio_encoder_for(output_file),
+            '-shortest', output_file
+        ], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=ffmpeg_log)
+        try:
+            for reduced_chunk in denoise_chunks(audio_data, sr, noise_sample, chunk_duration, progress):
+                mux.stdin.write(np.asarray(reduced_chunk, dtype=np.float32).tobytes())
+        except BrokenPipeError:
+            pass
+        finally:
+            mux.stdin.close()
+            return_code = mux.wait()
+        if return_code != 0:
+            ffmpeg_log.seek(0)
+            raise RuntimeError(f"ffmpeg failed to mux denoised audio: {ffmpeg_log.read().decode(errors='replace')}")
+    
+    print(f"Noise reduction completed, processing time: {time.time() - start_time:.2f} seconds")
+    print(f"Denoised video saved to: {output_file}")
+    return output_file
+
+
+def reduce_noise_streaming(
+    input_file: str,
+    output_file: str = None,
+    noise_sample_duration: float = 2.0,
+    chunk_duration: float = 30.0,
+    progress=None
+):
+    """Apply noise reduction while holding only one chunk of audio in memory.
+    
+    Same processing as reduce_noise (the first noise_sample_duration seconds
+    are the noise sample, chunks are denoised independently), but the audio
+    is read from an ffmpeg decoder pipe and written to an ffmpeg encoder pipe
+    chunk by chunk. Memory use doesn't depend on the file's length, so this
+    is the fallback for files too large to load whole. A video stream is
+    copied into the output unchanged.
+    
+    Args:
+        input_file: Input audio or video file path
+        output_file: Output file path, if None will add '_denoised' to the original filename
+        noise_sample_duration: Duration for noise sampling (seconds), default first 2 seconds
+        chunk_duration: Duration for chunk processing (seconds)
+        progress: Optional callable(chunks_done, total_chunks), see denoise_chunks
+    """
+    info = probe_media(input_file)
+    if not info['has_audio']:
+        raise ValueError(f"No audio track found in {input_file}")
+    sr = info['sample_rate'] or 44100
+    chunk_size = max(1, int(chunk_duration * sr))
+    total_chunks = max(1, int(np.ceil((info['duration'] or 0) * sr / chunk_size)))
+    
+    if output_file is None:
+        file_path = Path(input_file)
+        output_file = str(file_path.parent / f"{file_path.stem}_denoised{file_path.suffix}")
+    os.makedirs(Path(output_file).parent, exist_ok=True)
+    
+    print(f"Streaming noise reduction of {input_file} ({sr} Hz, {chunk_duration:.0f}-second chunks)")
+    start_time = time.time()
+    decoder = subprocess.Popen([
+        'ffmpeg', '-v', 'error', '-nostdin', '-i', input_file,
+        '-map', '0:a:0', '-vn', '-f', 'f32le', '-acodec', 'pcm_f32le',
+        '-ac', '1', '-ar', str(sr), 'pipe:1'
+    ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    video_input = ['-i', input_file] if info['has_video'] else []
+    video_map = ['-map', '0:v?', '-c:v', 'copy', '-map', '1:a'] if info['has_video'] else []
+    with tempfile.TemporaryFile() as ffmpeg_log:
+        encoder = subprocess.Popen([
+            'ffmpeg', '-y', '-v', 'error', *video_input,
+            '-f', 'f32le', '-ar', str(sr), '-ac', '1', '-i', 'pipe:0',
+            *video_map, *audio_encoder_for(output_file),
+            '-shortest', output_file
+        ], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=ffmpeg_log)
+        noise_sample = None
+        chunks_done = 0
+        try:
+            with tqdm(total=total_chunks, desc="Processing progress") as pbar:
+                while True:
+                    data = decoder.stdout.read(chunk_size * 4)
+                    if not data:
+                        break
+                    chunk = np.frombuffer(data[:len(data) - len(data) % 4], dtype=np.float32)
+                    if noise_sample is None:
+                        # The first chunk holds the noise sample (as long as chunks are longer than it)
+                        noise_sample = chunk[:int(noise_sample_duration * sr)].copy()
+                    reduced = nr.reduce_noise(y=chunk, y_noise=noise_sample, sr=sr)
+                    encoder.stdin.write(np.asarray(reduced, dtype=np.float32).tobytes())
+                    chunks_done += 1
+                    pbar.update(1)
+                    if progress is not None:
+                        progress(min(chunks_done, total_chunks), max(chunks_done, total_chunks))
+        except BrokenPipeError:
+            pass
+        finally:
+            decoder.stdout.close()
+            decoder.kill()
+            decoder.wait()
+            try:
+                encoder.stdin.close()
+            except BrokenPipeError:
+                pass
+            return_code = encoder.wait()
+        if noise_sample is None:
+            raise RuntimeError(f"ffmpeg could not decode the audio of {input_file}")
+        if return_code != 0:
+            ffmpeg_log.seek(0)
+            raise RuntimeError(f"ffmpeg failed to encode denoised audio: {ffmpeg_log.read().decode(errors='replace')}")
+    
+    print(f"Noise reduction completed, processing time: {time.time() - start_time:.2f} seconds")
+    print(f"Denoised file saved to: {output_file}")
+    return output_file
+
+
 def reduce_noise(
     input_file: str,
     output_file: str = None,
     noise_sample_duration: float = 2.0,
-    chunk_duration: float = 30.0
+    chunk_duration: float = 30.0,
+    progress=None
 ):
     """Apply noise reduction to an audio file.
     
@@ -55,7 +328,12 @@ def reduce_noise(
         output_file: Output audio file path, if None will add '_denoised' to the original filename
         noise_sample_duration: Duration for noise sampling (seconds), default first 2 seconds
         chunk_duration: Duration for chunk processing (seconds), useful for large files
+        progress: Optional callable(chunks_done, total_chunks), see denoise_chunks
     """
+    # Video containers keep their video stream; only the audio track is processed
+    if is_video_file(input_file):
+        return reduce_noise_video(input_file, output_file, noise_sample_duration, chunk_duration, progress)
+    
     try:
         # Save original file path before any potential conversion
         original_input_file = input_file
@@ -148,31 +426,13 @@ def reduce_noise(
         print("Applying noise reduction...")
         
         # For large files, use chunk processing
-        chunk_size = int(chunk_duration * sr)
-        total_chunks = int(np.ceil(len(audio_data) / chunk_size))
-        
         start_time = time.time()
         
-        if total_chunks > 1:
-            # Chunk processing
-            reduced_noise = np.zeros_like(audio_data)
-            
-            with tqdm(total=total_chunks, desc="Processing progress") as pbar:
-                for i in range(total_chunks):
-                    start_idx = i * chunk_size
-                    end_idx = min((i + 1) * chunk_size, len(audio_data))
-                    chunk = audio_data[start_idx:end_idx]
-                    
-                    # Apply noise reduction to each chunk
-                    reduced_chunk = nr.reduce_noise(y=chunk, y_noise=noise_sample, sr=sr)
-                    reduced_noise[start_idx:end_idx] = reduced_chunk
-                    
-                    pbar.update(1)
-        else:
-            # Process all at once
-            with tqdm(total=1, desc="Processing progress") as pbar:
-                reduced_noise = nr.reduce_noise(y=audio_data, y_noise=noise_sample, sr=sr)
-                pbar.update(1)
+        reduced_noise = np.zeros_like(audio_data)
+        position = 0
+        for reduced_chunk in denoise_chunks(audio_data, sr, noise_sample, chunk_duration, progress):
+            reduced_noise[position:position + len(reduced_chunk)] = reduced_chunk
+            position += len(reduced_chunk)
         
         process_time = time.time() - start_time
         print(f"Noise reduction completed, processing time: {process_time:.2f} seconds")
@@ -243,19 +503,153 @@ def reduce_noise(
         raise
 
 
+# Raw PCM formats accepted by --stream: numpy dtype and full-scale value
+STREAM_FORMATS = {
+    's16le': ('<i2', 32768.0),
+    's32le': ('<i4', 2147483648.0),
+    'f32le': ('<f4', 1.0),
+}
+
+
+def stream_denoise(
+    in_stream,
+    out_stream,
+    sr: int,
+    channels: int = 1,
+    sample_format: str = 's16le',
+    noise_sample_duration: float = 2.0,
+    noise_profile: str = None,
+    block_duration: float = 0.5,
+    context_duration: float = 0.1
+):
+    """Denoise raw interleaved PCM from in_stream to out_stream in the same format.
+    
+    Each channel gets its own BlockDenoiser, so latency and memory stay fixed
+    however long the stream runs. Without a noise profile, the first
+    noise_sample_duration seconds are held back to learn one and then
+    denoised like the rest.
+    
+    Args:
+        in_stream: Binary stream to read (e.g. sys.stdin.buffer)
+        out_stream: Binary stream to write (e.g. sys.stdout.buffer)
+        sr: Sample rate of the stream
+        channels: Number of interleaved channels
+        sample_format: 's16le', 's32le' or 'f32le'
+        noise_sample_duration: Seconds at the start used as noise sample
+        noise_profile: Profile (.npz) or noise-only audio file to use instead
+        block_duration: Seconds per denoise block
+        context_duration: Extra seconds denoised on each side of a block
+    
+    Returns:
+        float: Seconds of audio processed
+    """
+    dtype, scale = STREAM_FORMATS[sample_format]
+    frame_bytes = np.dtype(dtype).itemsize * channels
+    read_size = frame_bytes * max(1, int(sr * 0.1))
+    read = in_stream.read1 if hasattr(in_stream, 'read1') else in_stream.read
+    
+    denoisers = None
+    if noise_profile:
+        noise = load_noise_profile(noise_profile, sr)
+        denoisers = [BlockDenoiser(sr, noise, block_duration, context_duration) for _ in range(channels)]
+    warmup = []
+    warmup_frames = 0
+    leftover = b''
+    frames_in = 0
+    
+    def write(outputs):
+        # Channels advance in lockstep, so their outputs have equal lengths
+        length = min(len(o) for o in outputs)
+        if not length:
+            return
+        interleaved = np.stack([o[:length] for o in outputs], axis=1).reshape(-1) * scale
+        if scale != 1.0:
+            interleaved = np.clip(np.round(interleaved), -scale, scale - 1)
+        out_stream.write(interleaved.astype(dtype).tobytes())
+        out_stream.flush()
+    
+    def start(frames):
+        # Learn one noise profile per channel from the held-back frames
+        print(f"Noise profile learnt from the first {len(frames) / sr:.1f} seconds", file=sys.stderr)
+        return [BlockDenoiser(sr, frames[:, ch], block_duration, context_duration) for ch in range(channels)]
+    
+    while True:
+        data = read(read_size)
+        if not data:
+            break
+        data = leftover + data
+        usable = len(data) - len(data) % frame_bytes
+        leftover = data[usable:]
+        frames = (np.frombuffer(data[:usable], dtype=dtype).astype(np.float32) / scale).reshape(-1, channels)
+        frames_in += len(frames)
+        
+        if denoisers is None:
+            warmup.append(frames)
+            warmup_frames += len(frames)
+            if warmup_frames < noise_sample_duration * sr:
+                continue
+            frames = np.concatenate(warmup)
+            warmup = []
+            denoisers = start(frames)
+        write([d.process(frames[:, ch]) for ch, d in enumerate(denoisers)])
+    
+    if denoisers is None and warmup:
+        # The stream was shorter than the noise sample
+        frames = np.concatenate(warmup)
+        denoisers = start(frames)
+        write([d.process(frames[:, ch]) for ch, d in enumerate(denoisers)])
+    if denoisers is not None:
+        write([d.flush() for d in denoisers])
+        print(f"Stream finished: {frames_in / sr:.1f} seconds, real-time factor "
+              f"{sum(d.realtime_factor for d in denoisers):.2f}", file=sys.stderr)
+    return frames_in / sr
+
+
 def main():
     # Create command line argument parser
-    parser = argparse.ArgumentParser(description='Audio Noise Reduction Tool')
-    parser.add_argument('input_file', help='Input audio file path')
+    parser = argparse.ArgumentParser(
+        description='Audio Noise Reduction Tool',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Stream mode reads raw PCM on stdin and writes denoised PCM to stdout, e.g.:\n"
+            "  ffmpeg -i in.m4a -f s16le -ac 1 -ar 24000 - | \\\n"
+            "    python de_noise.py --stream --rate 24000 | \\\n"
+            "    ffmpeg -f s16le -ac 1 -ar 24000 -i - out.m4a"
+        )
+    )
+    parser.add_argument('input_file', nargs='?', help='Input audio or video file path (not used with --stream)')
     parser.add_argument('-o', '--output', help='Output audio file path', default=None)
     parser.add_argument('-d', '--duration', type=float, default=2.0, 
                         help='Duration for noise sampling (seconds), default first 2 seconds')
     parser.add_argument('-c', '--chunk', type=float, default=30, 
                         help='Duration for chunk processing (seconds), useful for large files, default 30 seconds')
+    parser.add_argument('--stream', action='store_true',
+                        help='Filter raw PCM from stdin to stdout (format given by --rate/--channels/--format)')
+    parser.add_argument('--rate', type=int, default=None, help='Stream sample rate (required with --stream)')
+    parser.add_argument('--channels', type=int, default=1, help='Stream channel count, default 1')
+    parser.add_argument('--format', choices=sorted(STREAM_FORMATS), default='s16le',
+                        help='Stream sample format, default s16le')
+    parser.add_argument('--noise-profile', default=None,
+                        help='Stream mode: noise profile (.npz) or noise-only audio file instead of the first -d seconds')
+    parser.add_argument('--block', type=float, default=0.5,
+                        help='Stream mode: seconds per denoise block (latency is block + context), default 0.5')
+    parser.add_argument('--context', type=float, default=0.1,
+                        help='Stream mode: seconds of context on each side of a block, default 0.1')
     
     # Parse command line arguments
     args = parser.parse_args()
     
+    if args.stream:
+        if args.rate is None:
+            parser.error('--stream needs --rate')
+        stream_denoise(
+            sys.stdin.buffer, sys.stdout.buffer, args.rate, args.channels, args.format,
+            args.duration, args.noise_profile, args.block, args.context
+        )
+        return
+    if args.input_file is None:
+        parser.error('input_file is required unless --stream is given')
+    
     # Expand user directory symbol
     input_file = os.path.expanduser(args.input_file)
     output_file = os.path.expanduser(args.output) if args.output else None
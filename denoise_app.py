@@ -9,6 +9,7 @@ import shutil
 
 # Import the noise reduction function
 from de_noise import reduce_noise
+from bounded_log import BoundedLog, DEFAULT_MAX_LINES
 
 class AudioDenoiseApp:
     def __init__(self, root):
@@ -20,6 +21,9 @@ class AudioDenoiseApp:
         # Track if denoising is in progress
         self.denoise_in_progress = False
         
+        # Lines kept in the status pane; older lines go to the log file
+        self.log_max_lines = DEFAULT_MAX_LINES
+        
         # Selected file paths
         self.input_file_path = tk.StringVar()
         self.output_file_path = tk.StringVar()
@@ -114,9 +118,14 @@ class AudioDenoiseApp:
         info_bar = ttk.Label(self.root, textvariable=self.info_var, relief=tk.SUNKEN, anchor=tk.W)
         info_bar.pack(side=tk.BOTTOM, fill=tk.X)
         
+        # Bounded, frame-batched log for the status pane
+        self.log = BoundedLog(self.root, self.status_text, self.info_var,
+                              name='denoise_app', max_lines=self.log_max_lines)
+        
     def browse_input_file(self):
         file_types = [
             ("Audio Files", "*.m4a *.mp3 *.wav *.flac *.ogg *.aac"),
+            ("Video Files", "*.mp4 *.m4v *.mov *.mkv *.webm *.avi"),
             ("All Files", "*.*")
         ]
         file_path = filedialog.askopenfilename(filetypes=file_types)
@@ -132,6 +141,7 @@ class AudioDenoiseApp:
     def browse_output_file(self):
         file_types = [
             ("Audio Files", "*.m4a *.mp3 *.wav *.flac *.ogg *.aac"),
+            ("Video Files", "*.mp4 *.m4v *.mov *.mkv *.webm *.avi"),
             ("All Files", "*.*")
         ]
         file_path = filedialog.asksaveasfilename(filetypes=file_types)
@@ -196,7 +206,7 @@ class AudioDenoiseApp:
             # Call the noise reduction function
             result_file = reduce_noise(
                 input_file,
-                noise_duration=self.noise_duration.get(),
+                noise_sample_duration=self.noise_duration.get(),
                 chunk_duration=self.chunk_duration.get(),
                 output_file=output_file
             )
@@ -225,15 +235,7 @@ class AudioDenoiseApp:
     
     def log_message(self, message):
         """Add a message to the status log"""
-        self.root.after(100, lambda: self._update_log(message))
-    
-    def _update_log(self, message):
-        timestamp = time.strftime("%H:%M:%S")
-        self.status_text.config(state=tk.NORMAL)
-        self.status_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.status_text.see(tk.END)
-        self.status_text.config(state=tk.DISABLED)
-        self.info_var.set(message)
+        self.log.append(message)
 
 if __name__ == "__main__":
     root = tk.Tk()
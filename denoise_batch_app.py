@@ -6,9 +6,115 @@ from tkinter import ttk, scrolledtext, filedialog, messagebox
 import threading
 import time
 import shutil
+import queue
+import multiprocessing
+
+from bounded_log import BoundedLog, DEFAULT_MAX_LINES
+from batch_schedule import probe_batch, CostModel, longest_first, predict_makespan, format_eta
+from memory_admission import MemoryAdmission, default_budget, STREAMING
+
+# Seconds a cancelled worker gets to stop at a chunk boundary before it is terminated
+CANCEL_GRACE_SECONDS = 5
+
+# Interval (ms) at which the Tk thread redraws the progress rows
+PROGRESS_REFRESH_MS = 250
+
+# Row states that don't change any more
+FINISHED_STATES = ('Done', 'Failed', 'Skipped', 'Cancelled')
+
+
+class BatchCancelled(Exception):
+    """Raised inside a worker when the batch is cancelled"""
+    pass
+
+
+# Set in each worker process by _init_batch_worker
+_events = None
+_cancel = None
+
+
+def _init_batch_worker(events, cancel):
+    global _events, _cancel
+    _events = events
+    _cancel = cancel
+
+
+def _denoise_batch_file(index, input_file, output_file, noise_duration, chunk_duration, mode=None):
+    """
+    Denoise one file in a batch worker, reporting ('progress', index, fraction) events.
+
+    mode STREAMING uses reduce_noise_streaming (one chunk in memory at a time).
+
+    Returns:
+        float: Processing time in seconds
+    """
+    if _cancel.is_set():
+        raise BatchCancelled()
+    _events.put(('progress', index, 0.0))
+
+    def progress(done, total):
+        # Loading and saving take time too, so chunks cover 5-95%
+        _events.put(('progress', index, 0.05 + 0.9 * done / total))
+        if _cancel.is_set():
+            raise BatchCancelled()
+
+    # Imported in the worker; the app itself doesn't need numpy loaded
+    from de_noise import reduce_noise, reduce_noise_streaming
+    start_time = time.time()
+    denoise = reduce_noise_streaming if mode == STREAMING else reduce_noise
+    denoise(
+        input_file,
+        output_file=output_file,
+        noise_sample_duration=noise_duration,
+        chunk_duration=chunk_duration,
+        progress=progress
+    )
+    return time.time() - start_time
+
+
+def _batch_worker_main(tasks, events, cancel):
+    """
+    Worker process loop: run jobs from tasks until None arrives.
+
+    Each finished job is reported as ('done', index, status, value) with
+    status 'ok' (value: seconds), 'cancelled' or 'error' (value: message).
+    """
+    _init_batch_worker(events, cancel)
+    while True:
+        job = tasks.get()
+        if job is None:
+            return
+        index, args = job
+        try:
+            events.put(('done', index, 'ok', _denoise_batch_file(index, *args)))
+        except BatchCancelled:
+            events.put(('done', index, 'cancelled', None))
+        except Exception as e:
+            events.put(('done', index, 'error', str(e)))
+
+
+class _BatchWorker:
+    """A worker process owned by the batch, with its own task queue and current job"""
+
+    def __init__(self, context, events, cancel):
+        self.tasks = context.Queue()
+        self.process = context.Process(target=_batch_worker_main, args=(self.tasks, events, cancel), daemon=True)
+        self.process.start()
+        self.index = None
+
+    def run(self, index, args):
+        self.index = index
+        self.tasks.put((index, args))
+
+    def stop(self, timeout):
+        """Let an idle worker exit; terminate it if it doesn't within timeout seconds"""
+        if self.process.is_alive():
+            self.tasks.put(None)
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
 
-# Import the noise reduction function
-from de_noise import reduce_noise
 
 class BatchAudioDenoiseApp:
     def __init__(self, root):
@@ -19,15 +125,29 @@ class BatchAudioDenoiseApp:
         
         # Track if denoising is in progress
         self.denoise_in_progress = False
+        
+        # Lines kept in the status pane; older lines go to the log file
+        self.log_max_lines = DEFAULT_MAX_LINES
         self.current_file_index = 0
         self.total_files = 0
         self.selected_files = []
         
+        # Per-file (status, fraction) written by the batch thread, drawn by the Tk thread
+        self.file_states = {}
+        self.dirty_rows = set()
+        self.state_lock = threading.Lock()
+        self.cancel_event = None
+        self.eta_text = ""
+        
         # Noise reduction parameters
         self.noise_duration = tk.DoubleVar(value=2.0)
         self.chunk_duration = tk.DoubleVar(value=30.0)
         self.keep_original = tk.BooleanVar(value=True)
         self.output_dir = tk.StringVar(value="")
+        # Each worker holds a whole file in memory, so leave some cores (and RAM) free
+        self.workers = tk.IntVar(value=max(1, (os.cpu_count() or 2) // 2))
+        # Files are started only while their estimated peak memory fits in this budget
+        self.memory_budget = tk.DoubleVar(value=round(default_budget() / 2**30, 1))
         
         # Create GUI components
         self.create_widgets()
@@ -44,14 +164,20 @@ class BatchAudioDenoiseApp:
         files_frame = ttk.LabelFrame(main_frame, text="Selected Files", padding="10")
         files_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
-        # File list
-        self.file_listbox = tk.Listbox(files_frame, selectmode=tk.EXTENDED, width=80, height=10)
-        self.file_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
+        # File list, one row per file with its own status and progress
+        self.file_tree = ttk.Treeview(files_frame, columns=('status', 'progress'), selectmode='extended', height=10)
+        self.file_tree.heading('#0', text='File')
+        self.file_tree.heading('status', text='Status')
+        self.file_tree.heading('progress', text='Progress')
+        self.file_tree.column('#0', width=460)
+        self.file_tree.column('status', width=110, anchor=tk.W)
+        self.file_tree.column('progress', width=80, anchor=tk.E)
+        self.file_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
         
         # Scrollbar for file list
-        scrollbar = ttk.Scrollbar(files_frame, orient=tk.VERTICAL, command=self.file_listbox.yview)
+        scrollbar = ttk.Scrollbar(files_frame, orient=tk.VERTICAL, command=self.file_tree.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.file_listbox.config(yscrollcommand=scrollbar.set)
+        self.file_tree.config(yscrollcommand=scrollbar.set)
         
         # File actions frame
         file_actions_frame = ttk.Frame(main_frame)
@@ -98,6 +224,22 @@ class BatchAudioDenoiseApp:
         chunk_spinbox = ttk.Spinbox(chunk_frame, from_=10.0, to=300.0, increment=10.0, textvariable=self.chunk_duration, width=10)
         chunk_spinbox.pack(side=tk.LEFT)
         
+        # Parallel workers
+        workers_frame = ttk.Frame(settings_frame)
+        workers_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(workers_frame, text="Parallel Workers:", width=30).pack(side=tk.LEFT, padx=(0, 10))
+        workers_spinbox = ttk.Spinbox(workers_frame, from_=1, to=os.cpu_count() or 1, increment=1, textvariable=self.workers, width=10)
+        workers_spinbox.pack(side=tk.LEFT)
+        
+        # Memory budget
+        memory_frame = ttk.Frame(settings_frame)
+        memory_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(memory_frame, text="Memory Budget (GB):", width=30).pack(side=tk.LEFT, padx=(0, 10))
+        memory_spinbox = ttk.Spinbox(memory_frame, from_=0.5, to=1024.0, increment=0.5, textvariable=self.memory_budget, width=10)
+        memory_spinbox.pack(side=tk.LEFT)
+        
         # Options
         options_frame = ttk.Frame(settings_frame)
         options_frame.pack(fill=tk.X, pady=(0, 5))
@@ -136,9 +278,14 @@ class BatchAudioDenoiseApp:
         info_bar = ttk.Label(self.root, textvariable=self.info_var, relief=tk.SUNKEN, anchor=tk.W)
         info_bar.pack(side=tk.BOTTOM, fill=tk.X)
         
+        # Bounded, frame-batched log for the status pane
+        self.log = BoundedLog(self.root, self.status_text, self.info_var,
+                              name='denoise_batch_app', max_lines=self.log_max_lines)
+        
     def add_files(self):
         file_types = [
             ("Audio Files", "*.m4a *.mp3 *.wav *.flac *.ogg *.aac"),
+            ("Video Files", "*.mp4 *.m4v *.mov *.mkv *.webm *.avi"),
             ("All Files", "*.*")
         ]
         file_paths = filedialog.askopenfilenames(filetypes=file_types)
@@ -153,23 +300,28 @@ class BatchAudioDenoiseApp:
             for file_path in file_paths:
                 if file_path not in self.selected_files:
                     self.selected_files.append(file_path)
-                    self.file_listbox.insert(tk.END, os.path.basename(file_path))
+                    # The path is the row id, so rows can be found again after removals
+                    self.file_tree.insert('', tk.END, iid=file_path, text=os.path.basename(file_path), values=('', ''))
             
             self.log_message(f"Added {len(file_paths)} files to the list")
             
     def remove_files(self):
-        selected_indices = sorted(self.file_listbox.curselection(), reverse=True)
-        if selected_indices:
-            for index in selected_indices:
-                self.file_listbox.delete(index)
-                del self.selected_files[index]
+        if self.denoise_in_progress:
+            return
+        selected_paths = self.file_tree.selection()
+        if selected_paths:
+            for file_path in selected_paths:
+                self.file_tree.delete(file_path)
+                self.selected_files.remove(file_path)
             
-            self.log_message(f"Removed {len(selected_indices)} files from the list")
+            self.log_message(f"Removed {len(selected_paths)} files from the list")
         else:
             messagebox.showinfo("Info", "Please select file(s) to remove")
             
     def clear_files(self):
-        self.file_listbox.delete(0, tk.END)
+        if self.denoise_in_progress:
+            return
+        self.file_tree.delete(*self.file_tree.get_children())
         self.selected_files.clear()
         self.log_message("All files cleared from the list")
         
@@ -207,79 +359,216 @@ class BatchAudioDenoiseApp:
                 messagebox.showerror("Error", f"Failed to create output directory: {str(e)}")
                 return
         
+        # Read the settings here: Tk variables belong to the Tk thread
+        try:
+            workers = max(1, int(self.workers.get()))
+            memory_budget = int(self.memory_budget.get() * 2**30)
+            noise_duration = self.noise_duration.get()
+            chunk_duration = self.chunk_duration.get()
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Error", "Please enter valid numbers for the settings.")
+            return
+        jobs = []
+        for input_file in self.selected_files:
+            name_without_ext, ext = os.path.splitext(os.path.basename(input_file))
+            jobs.append((input_file, os.path.join(output_dir, f"{name_without_ext}_denoised{ext}")))
+        
         # Update UI state
         self.denoise_in_progress = True
         self.current_file_index = 0
-        self.total_files = len(self.selected_files)
+        self.total_files = len(jobs)
+        with self.state_lock:
+            self.file_states = {input_file: ('Queued', 0.0) for input_file, _ in jobs}
+            self.dirty_rows = set(self.file_states)
         self.denoise_button.config(state=tk.DISABLED)
         self.cancel_button.config(state=tk.NORMAL)
         self.progress_var.set(0)
-        self.progress_label.config(text=f"Starting batch processing...")
-        
-        # Start batch denoising in a separate thread
-        threading.Thread(target=self.process_batch_denoise, daemon=True).start()
+        self.progress_label.config(text=f"Starting batch processing with {workers} workers...")
+        
+        # Created before the thread starts, so a Cancel clicked right away is not lost;
+        # spawned workers don't inherit Tk state from this process
+        context = multiprocessing.get_context('spawn')
+        self.cancel_event = context.Event()
+        
+        # The workers are driven from a separate thread; the Tk thread only redraws
+        threading.Thread(
+            target=self.process_batch_denoise,
+            args=(jobs, workers, noise_duration, chunk_duration, self.keep_original.get(), memory_budget,
+                  context, self.cancel_event),
+            daemon=True
+        ).start()
+        self.root.after(PROGRESS_REFRESH_MS, self.refresh_progress)
     
     def cancel_denoise(self):
         self.denoise_in_progress = False
-        self.log_message("Batch denoising cancelled.")
-        
-    def process_batch_denoise(self):
-        output_dir = self.output_dir.get().strip()
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.log_message("Cancelling batch denoising...")
+    
+    def set_file_state(self, input_file, status, fraction=None):
+        """Record a row's state (any thread); finished rows keep their final state"""
+        with self.state_lock:
+            old_status, old_fraction = self.file_states.get(input_file, ('Queued', 0.0))
+            if old_status in FINISHED_STATES:
+                return
+            self.file_states[input_file] = (status, old_fraction if fraction is None else fraction)
+            self.dirty_rows.add(input_file)
+    
+    def refresh_progress(self):
+        """Redraw changed rows and the aggregate progress (Tk thread, every PROGRESS_REFRESH_MS)"""
+        with self.state_lock:
+            dirty = [(f, self.file_states[f]) for f in self.dirty_rows if f in self.file_states]
+            self.dirty_rows = set()
+            states = list(self.file_states.values())
+        for input_file, (status, fraction) in dirty:
+            if self.file_tree.exists(input_file):
+                self.file_tree.set(input_file, 'status', status)
+                self.file_tree.set(input_file, 'progress', f"{fraction * 100:.0f}%")
+        
+        # Finished rows count as complete whatever their outcome
+        if states:
+            done = sum(1.0 if status in FINISHED_STATES else fraction for status, fraction in states)
+            self.progress_var.set(done / len(states) * 100)
+        if states and self.denoise_in_progress:
+            finished = sum(1 for status, _ in states if status in FINISHED_STATES)
+            running = sum(1 for status, _ in states if status == 'Processing')
+            self.progress_label.config(
+                text=f"Finished {finished}/{len(states)} files, {running} in progress{self.eta_text}")
+        
+        if self.denoise_in_progress or dirty:
+            self.root.after(PROGRESS_REFRESH_MS, self.refresh_progress)
+        
+    def process_batch_denoise(self, jobs, workers, noise_duration, chunk_duration, keep_original,
+                              memory_budget=None, context=None, cancel_event=None):
+        """
+        Run the batch on worker processes owned by this method (batch thread).
+
+        Args:
+            context: multiprocessing context for the workers, default 'spawn'
+            cancel_event: Event set by Cancel, created by the caller before this thread starts
+        """
         success_count = 0
         error_count = 0
+        cancelled = False
+        
+        context = context or multiprocessing.get_context('spawn')
+        cancel_event = cancel_event or context.Event()
+        events = context.Queue()
+        pool = []
         
         try:
-            for i, input_file in enumerate(self.selected_files):
-                if not self.denoise_in_progress:
-                    break
-                    
-                self.current_file_index = i + 1
-                
-                # Update progress label
-                self.root.after(100, lambda: self.progress_label.config(
-                    text=f"Processing file {self.current_file_index}/{self.total_files}: {os.path.basename(input_file)}"))
-                
-                # Calculate output file path
-                base_name = os.path.basename(input_file)
-                name_without_ext, ext = os.path.splitext(base_name)
-                output_file = os.path.join(output_dir, f"{name_without_ext}_denoised{ext}")
-                
+            to_run = []
+            for index, (input_file, output_file) in enumerate(jobs):
                 # Check if output file exists and handle accordingly
-                if os.path.exists(output_file) and self.keep_original.get():
-                    error_msg = f"Skipping {base_name}: Output file already exists."
-                    self.log_message(error_msg)
+                if os.path.exists(output_file) and keep_original:
+                    self.log_message(f"Skipping {os.path.basename(input_file)}: Output file already exists.")
+                    self.set_file_state(input_file, 'Skipped', 1.0)
                     error_count += 1
                     continue
-                    
-                try:
-                    self.log_message(f"Starting noise reduction for file {self.current_file_index}/{self.total_files}: {base_name}")
-                    
-                    start_time = time.time()
-                    
-                    # Call the noise reduction function
-                    result_file = reduce_noise(
-                        input_file,
-                        noise_duration=self.noise_duration.get(),
-                        chunk_duration=self.chunk_duration.get(),
-                        output_file=output_file
-                    )
-                    
-                    total_time = time.time() - start_time
-                    
-                    self.log_message(f"Successfully processed {base_name} in {total_time:.2f} seconds")
+                to_run.append(index)
+            
+            # Longest files first, so no long file is left running alone at the end
+            probes = probe_batch([jobs[index][0] for index in to_run])
+            cost_model = CostModel()
+            to_run = longest_first(to_run, lambda index: cost_model.cost(probes[jobs[index][0]]))
+            
+            # Large files are switched to streaming mode; the rest wait for memory
+            admission = MemoryAdmission(memory_budget, log=self.log_message)
+            plans = {index: admission.plan(jobs[index][0], probes[jobs[index][0]], chunk_duration) for index in to_run}
+            
+            workers = max(1, min(workers, len(to_run)))
+            predicted = predict_makespan([cost_model.cost(p) for p in probes.values()], workers)
+            self.log_message(f"Processing {len(to_run)} files with {workers} workers, longest first "
+                             f"(predicted time {format_eta(predicted)}, memory budget {admission.budget / 2**30:.1f} GB)")
+            
+            # The batch owns its worker processes, so it can terminate them on cancel
+            if to_run:
+                pool = [_BatchWorker(context, events, cancel_event) for _ in range(workers)]
+            
+            def finish(worker, status, value):
+                """Record the outcome of worker's current file and mark the worker idle"""
+                nonlocal success_count, error_count
+                index = worker.index
+                worker.index = None
+                admission.release(plans[index][1])
+                input_file = jobs[index][0]
+                base_name = os.path.basename(input_file)
+                if status == 'ok':
+                    cost_model.observe(probes[input_file], value)
+                    self.set_file_state(input_file, 'Done', 1.0)
+                    self.log_message(f"Successfully processed {base_name} in {value:.2f} seconds")
                     success_count += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error processing {base_name}: {str(e)}"
-                    self.log_message(error_msg)
+                elif status == 'cancelled' or cancel_event.is_set():
+                    self.set_file_state(input_file, 'Cancelled')
+                else:
+                    self.set_file_state(input_file, 'Failed')
+                    self.log_message(f"Error processing {base_name}: {value}")
                     error_count += 1
+            
+            queued = list(to_run)
+            cancel_deadline = None
+            while any(w.index is not None for w in pool) or (queued and not cancel_event.is_set()):
+                # Start queued files, longest first, on idle workers while memory fits;
+                # a file that doesn't fit yet lets smaller ones behind it go ahead
+                idle = [w for w in pool if w.index is None and w.process.is_alive()]
+                for index in list(queued):
+                    if not idle or cancel_event.is_set():
+                        break
+                    input_file, output_file = jobs[index]
+                    mode, estimate = plans[index]
+                    if not admission.try_admit(estimate):
+                        continue
+                    queued.remove(index)
+                    idle.pop().run(index, (input_file, output_file, noise_duration, chunk_duration, mode))
                 
-                # Update overall progress
-                progress_percent = (self.current_file_index / self.total_files) * 100
-                self.root.after(100, lambda p=progress_percent: self.progress_var.set(p))
+                # Progress and results from the workers
+                try:
+                    while True:
+                        event = events.get(timeout=0.2)
+                        if event[0] == 'progress':
+                            _, index, fraction = event
+                            self.set_file_state(jobs[index][0], 'Processing', fraction)
+                        else:
+                            _, index, status, value = event
+                            worker = next((w for w in pool if w.index == index), None)
+                            if worker is not None:
+                                finish(worker, status, value)
+                except queue.Empty:
+                    pass
+                
+                # A worker that died in the middle of a file (crash, out of memory, or terminated)
+                for position, worker in enumerate(pool):
+                    if worker.process.is_alive() or worker.index is None:
+                        continue
+                    finish(worker, 'error', f"worker stopped unexpectedly (exit code {worker.process.exitcode})")
+                    if not cancel_event.is_set():
+                        pool[position] = _BatchWorker(context, events, cancel_event)
+                if queued and not cancel_event.is_set() and not any(w.process.is_alive() for w in pool):
+                    self.log_message("No denoise workers left, stopping the batch")
+                    for index in queued:
+                        self.set_file_state(jobs[index][0], 'Failed')
+                        error_count += 1
+                    queued = []
+                
+                remaining = queued + [w.index for w in pool if w.index is not None]
+                self.eta_text = self.estimate_eta(jobs, remaining, probes, cost_model, workers)
+                
+                if cancel_event.is_set() and cancel_deadline is None:
+                    # Drop queued files; running ones stop at their next chunk
+                    cancelled = True
+                    cancel_deadline = time.time() + CANCEL_GRACE_SECONDS
+                elif cancel_deadline is not None and time.time() > cancel_deadline:
+                    # A worker stuck loading or saving a file: stop it the hard way
+                    for worker in pool:
+                        if worker.index is not None:
+                            worker.process.terminate()
+                    cancel_deadline = float('inf')
             
             # Show completion summary
-            if self.denoise_in_progress:
+            if cancelled or cancel_event.is_set():
+                self.log_message("Batch denoising cancelled.")
+            else:
                 summary_msg = f"Batch processing completed!\n"\
                               f"Successfully processed: {success_count}\n"\
                               f"Failed to process: {error_count}"
@@ -290,26 +579,45 @@ class BatchAudioDenoiseApp:
             self.log_message(error_msg)
             self.root.after(100, lambda: messagebox.showerror("Error", error_msg))
         finally:
+            # Running files (only after a fatal error) stop at their next chunk
+            cancel_event.set()
+            for worker in pool:
+                worker.stop(CANCEL_GRACE_SECONDS)
+            # Rows that never ran (cancelled or after a fatal error)
+            for input_file, _ in jobs:
+                self.set_file_state(input_file, 'Cancelled')
             # Update UI state
             self.denoise_in_progress = False
+            if self.cancel_event is cancel_event:
+                self.cancel_event = None
+            self.eta_text = ""
             self.root.after(100, self.reset_ui)
     
+    def estimate_eta(self, jobs, remaining, probes, cost_model, workers):
+        """ETA text for the progress label, from the remaining files' predicted costs and progress"""
+        with self.state_lock:
+            states = {jobs[index][0]: self.file_states.get(jobs[index][0]) for index in remaining}
+        busy = []
+        queued = []
+        for input_file, (status, fraction) in states.items():
+            cost = cost_model.cost(probes[input_file])
+            if status == 'Processing':
+                busy.append(cost * (1 - fraction))
+            else:
+                queued.append(cost)
+        if not busy and not queued:
+            return ""
+        return f", about {format_eta(predict_makespan(queued, workers, busy))} left"
+    
     def reset_ui(self):
         self.denoise_button.config(state=tk.NORMAL)
         self.cancel_button.config(state=tk.DISABLED)
+        self.refresh_progress()
         self.progress_label.config(text="Ready")
     
     def log_message(self, message):
         """Add a message to the status log"""
-        self.root.after(100, lambda: self._update_log(message))
-    
-    def _update_log(self, message):
-        timestamp = time.strftime("%H:%M:%S")
-        self.status_text.config(state=tk.NORMAL)
-        self.status_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.status_text.see(tk.END)
-        self.status_text.config(state=tk.DISABLED)
-        self.info_var.set(message)
+        self.log.append(message)
 
 if __name__ == "__main__":
     root = tk.Tk()
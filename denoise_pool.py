@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import queue
+import threading
+import traceback
+import multiprocessing
+from pathlib import Path
+
+# Modules imported once per worker instead of once per file
+DEFAULT_PRELOAD = ('numpy', 'soundfile', 'librosa', 'noisereduce')
+
+# Recycle a worker after this many jobs...
+MAX_JOBS_PER_WORKER = 50
+
+# ...or once its memory grew this much (MB) beyond what it used when ready
+MAX_MEMORY_GROWTH_MB = 1024
+
+# Seconds allowed for starting a worker and importing the preload modules
+STARTUP_TIMEOUT = 120
+
+
+def denoise_file(input_file, output_file, noise_duration=2.0):
+    """
+    Job run inside a worker: the same processing run_noise_reduction used to
+    pass to 'python -c', with paths passed as values instead of code.
+
+    Returns:
+        str: Output file path
+    """
+    import librosa
+    import soundfile as sf
+    import noisereduce as nr
+
+    audio_data, sr = librosa.load(input_file, sr=None)
+    noise_sample = audio_data[:int(noise_duration * sr)]
+    reduced_noise = nr.reduce_noise(y=audio_data, y_noise=noise_sample, sr=sr)
+    sf.write(output_file, reduced_noise, sr)
+    return output_file
+
+
+def _rss_mb():
+    """Resident memory of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # No /proc (macOS): fall back to the peak, reported in bytes there
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _worker_main(conn, preload):
+    """Worker loop: import once, then run (func, args, kwargs) jobs until told to stop"""
+    try:
+        for name in preload:
+            __import__(name)
+    except Exception as e:
+        conn.send(('failed', f"{type(e).__name__}: {e}", _rss_mb()))
+        return
+    conn.send(('ready', None, _rss_mb()))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        func, args, kwargs = job
+        try:
+            result = func(*args, **kwargs)
+            conn.send(('ok', result, _rss_mb()))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}\n{traceback.format_exc()}", _rss_mb()))
+
+
+class PoolJobError(Exception):
+    """Raised when a job fails, times out or its worker dies"""
+    pass
+
+
+class _Worker:
+    """One pre-imported worker process and the parent's end of its pipe"""
+
+    def __init__(self, context, preload):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, preload), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+        self.started = time.time()
+
+        if not self.conn.poll(STARTUP_TIMEOUT):
+            self.kill()
+            raise RuntimeError(f"Worker did not start within {STARTUP_TIMEOUT} seconds")
+        try:
+            status, message, self.baseline_mb = self.conn.recv()
+        except EOFError:
+            self.kill()
+            raise RuntimeError("Worker exited during startup")
+        if status != 'ready':
+            self.kill()
+            raise RuntimeError(f"Worker could not import its modules: {message}")
+        self.rss_mb = self.baseline_mb
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+
+
+class DenoisePool:
+    """
+    Persistent pool of worker processes with the audio modules already imported.
+
+    Jobs go to an idle worker over a pipe, so a batch of short files pays the
+    librosa/numpy/noisereduce import cost once per worker instead of once per
+    file. The timeout is enforced from the parent: a worker stuck in a job
+    (inside native code a signal can't interrupt) is killed and replaced. A
+    worker is also replaced after max_jobs jobs or once its memory grew by
+    more than max_memory_growth_mb, so slow leaks can't build up.
+
+    run() blocks until the job is done and may be called from several threads
+    at once; up to `workers` jobs then run in parallel.
+
+    Args:
+        workers (int): Number of worker processes
+        timeout (float): Seconds allowed per job (None for no limit)
+        max_jobs (int): Jobs a worker runs before it is replaced
+        max_memory_growth_mb (float): Memory growth (MB) after which a worker is replaced
+        preload (tuple): Modules each worker imports at startup
+        log: Function used for status messages
+    """
+
+    def __init__(self, workers=1, timeout=300, max_jobs=MAX_JOBS_PER_WORKER,
+                 max_memory_growth_mb=MAX_MEMORY_GROWTH_MB, preload=DEFAULT_PRELOAD, log=print):
+        self.size = max(1, workers)
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self.preload = tuple(preload)
+        self.log = log
+        # 'spawn' gives clean workers on every platform (no forked locks or threads)
+        self.context = multiprocessing.get_context('spawn')
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.started_workers = 0
+        self.recycled = 0
+        self.closed = False
+
+        start_time = time.time()
+        for _ in range(self.size):
+            self.idle.put(self._start_worker())
+        self.log(f"Started {self.size} denoise worker(s) in {time.time() - start_time:.1f} seconds")
+
+    def _start_worker(self):
+        with self.lock:
+            self.started_workers += 1
+        return _Worker(self.context, self.preload)
+
+    def run(self, func, *args, timeout=None, **kwargs):
+        """
+        Run func(*args, **kwargs) in a worker and return its result.
+
+        func must be importable by name (a module-level function).
+
+        Raises:
+            PoolJobError: If the job raised, timed out or its worker died, or no workers are left
+        """
+        if self.closed:
+            raise RuntimeError("The pool is closed")
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._take_worker()
+        replace = False
+        try:
+            worker.conn.send((func, args, kwargs))
+            if not worker.conn.poll(timeout):
+                replace = True
+                raise PoolJobError(f"Job timed out after {timeout} seconds")
+            try:
+                status, result, worker.rss_mb = worker.conn.recv()
+            except EOFError:
+                replace = True
+                raise PoolJobError(f"Worker died (exit code {worker.process.exitcode})")
+            worker.jobs_done += 1
+            if status != 'ok':
+                raise PoolJobError(result)
+            return result
+        except (OSError, BrokenPipeError) as e:
+            replace = True
+            raise PoolJobError(f"Lost contact with worker: {e}")
+        finally:
+            self._return_worker(worker, replace)
+
+    def _take_worker(self):
+        """Wait for an idle worker; fails once every worker was lost instead of waiting forever"""
+        while True:
+            with self.lock:
+                if self.size <= 0:
+                    raise PoolJobError("No denoise workers left")
+            try:
+                return self.idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _return_worker(self, worker, broken):
+        if broken:
+            worker.kill()
+            worker.conn.close()
+        elif worker.jobs_done >= self.max_jobs:
+            self.log(f"Recycling denoise worker after {worker.jobs_done} jobs")
+            worker.stop()
+        elif worker.rss_mb - worker.baseline_mb > self.max_memory_growth_mb:
+            self.log(f"Recycling denoise worker, memory grew by {worker.rss_mb - worker.baseline_mb:.0f} MB")
+            worker.stop()
+        else:
+            self.idle.put(worker)
+            return
+        if self.closed:
+            return
+        self.recycled += 1
+        try:
+            self.idle.put(self._start_worker())
+        except RuntimeError as e:
+            # Keep the pool usable with one worker fewer rather than failing every later job
+            self.log(f"Could not replace denoise worker: {e}")
+            with self.lock:
+                self.size -= 1
+
+    def denoise(self, input_file, output_file=None, noise_duration=2.0, timeout=None):
+        """
+        Denoise one file in a worker.
+
+        Args:
+            input_file (str): Input audio file path
+            output_file (str): Output path, default '<name>_denoised<ext>' next to the input
+
+        Returns:
+            str: Output file path
+        """
+        if output_file is None:
+            file_path = Path(input_file)
+            output_file = str(file_path.parent / f"{file_path.stem}_denoised{file_path.suffix}")
+        return self.run(denoise_file, input_file, output_file, noise_duration, timeout=timeout)
+
+    def close(self):
+        """Stop the idle workers (call once no jobs are running)"""
+        self.closed = True
+        while True:
+            try:
+                worker = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+import os
+import shutil
+
+from format_policy import bandwidth_saver_selector
+from segmented_download import segmented_download_options
+from retry_policy import RetryPolicy, retry_options
+from job_journal import RESOLVED, DOWNLOADING
+
+# Output file name template shared by all downloaders
+OUTPUT_TEMPLATE = '%(title)s [%(id)s].%(ext)s'
+
+# Backoff and per-host circuit breakers shared by every download in the process
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+def build_ydl_options(download_dir, media='audio', proxy=None, bandwidth_saver=False,
+                      connections=1, use_aria2c=True, retry=DEFAULT_RETRY_POLICY, log=print):
+    """
+    Build yt-dlp options the way the GUI and scripts do.
+
+    Args:
+        download_dir (str): Directory for downloaded files
+        media (str): 'audio', 'video' or 'video_audio' (video plus stream-copied audio)
+        proxy (str): Proxy URL, '' for a direct connection, None for yt-dlp's default
+        bandwidth_saver (bool): Pick the smallest speech-quality audio stream
+        connections (int): Connections per file (segmented download)
+        use_aria2c (bool): Allow aria2c for plain HTTP; it reports no progress,
+                           so it can't be rate-managed by BandwidthManager
+        retry (RetryPolicy): Policy download_url() retries whole jobs with; yt-dlp's
+                             own retries are then off. None lets yt-dlp retry instead
+        log: Function used by the format policy to report its choice
+
+    Returns:
+        dict: yt-dlp options
+    """
+    ydl_opts = {
+        # Add SSL configuration
+        'nocheckcertificate': True,
+        # Set timeout
+        'socket_timeout': 30,
+        # Set download directory
+        'outtmpl': os.path.join(download_dir, OUTPUT_TEMPLATE),
+        # Quiet output to prevent console spam
+        'quiet': True,
+        'no_warnings': True,
+        'postprocessors': [],
+        'ffmpeg_location': shutil.which('ffmpeg') or '',
+    }
+
+    if media == 'audio':
+        if bandwidth_saver:
+            ydl_opts['format'] = bandwidth_saver_selector(preferred_ext='m4a', log=log)
+        else:
+            ydl_opts['format'] = 'bestaudio[ext=m4a]/bestaudio/best'
+    else:
+        ydl_opts['format'] = 'best[ext=mp4]/best'
+        if media == 'video_audio':
+            # Copy the audio track into .m4a/.opus without re-encoding and keep the MP4
+            ydl_opts['postprocessors'] = [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'best',
+            }]
+            ydl_opts['keepvideo'] = True
+
+    if proxy is not None:
+        ydl_opts['proxy'] = proxy
+
+    # One retry layer: the whole job is retried, or yt-dlp retries with backoff
+    ydl_opts.update(retry_options(retry or DEFAULT_RETRY_POLICY, outer=retry is not None))
+    ydl_opts.update(segmented_download_options(connections, use_aria2c=use_aria2c))
+    return ydl_opts
+
+
+def download_url(url, ydl_opts, sessions, progress_hook=None, retry=DEFAULT_RETRY_POLICY, log=print):
+    """
+    Resolve and download one URL with a pooled yt-dlp session.
+
+    Args:
+        url (str): Video URL
+        ydl_opts (dict): Options from build_ydl_options()
+        sessions (YdlSessionPool): Session pool to borrow from
+        progress_hook: Optional yt-dlp progress hook for this job
+        retry (RetryPolicy): Retries transient failures of the whole job, None for no retries
+        log: Function used to report retries
+
+    Returns:
+        tuple: (downloaded file path, info dict)
+
+    Raises:
+        yt_dlp.utils.DownloadError: If the attempts are used up or the error is fatal
+    """
+    job_opts = dict(ydl_opts)
+    if progress_hook is not None:
+        job_opts['progress_hooks'] = [progress_hook]
+
+    def attempt():
+        # Each attempt resolves again (stream URLs expire) and continues the '.part' file
+        with sessions.session(job_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+            filename = ydl.prepare_filename(info)
+            # Reuse the resolved info instead of extracting the URL a second time;
+            # without 'ignoreerrors' a failed download raises DownloadError
+            ydl.process_ie_result(info, download=True)
+        return filename, info
+
+    if retry is None:
+        return attempt()
+    return retry.call(attempt, url=url, log=log, description=f"Download of {url}")
+
+
+def resolve_and_download(sessions, ydl_opts, url, label, journal, output_dir='', kind='audio'):
+    """
+    Resolve a URL (or reuse info an interrupted run journaled) and download it.
+
+    Meant to be retried as a whole (RetryPolicy.call): a failed attempt drops
+    the journaled info, so the next attempt resolves fresh stream URLs instead
+    of retrying stale or IP-bound ones.
+
+    Args:
+        sessions (YdlSessionPool): Session pool to borrow from
+        ydl_opts (dict): yt-dlp options for this job
+        url (str): Video URL
+        label (str): Name recorded in the journal, default the video title
+        journal (JobJournal): Journal to record the phases in, or None
+        output_dir (str): Download folder the job is journaled under
+        kind (str): Journal job kind ('audio' or 'video')
+
+    Returns:
+        tuple: (downloaded file path, info dict)
+
+    Raises:
+        yt_dlp.utils.DownloadError: If the download failed
+    """
+    with sessions.session(ydl_opts) as ydl:
+        # Stream URLs resolved by an interrupted run are reused until they expire
+        info = journal.resolved_info(url, kind, output_dir) if journal is not None else None
+        if info is None:
+            info = ydl.sanitize_info(ydl.extract_info(url, download=False))
+            if journal is not None:
+                journal.record(url, RESOLVED, kind, output_dir, label=label or info.get('title'), info=info)
+        else:
+            print(f"Reusing resolved stream info from the job journal: {info.get('title') or url}")
+        filename = ydl.prepare_filename(info)
+
+        if os.path.exists(filename + '.part'):
+            part_mb = os.path.getsize(filename + '.part') / (1024 * 1024)
+            print(f"Resuming partial download ({part_mb:.1f} MB already on disk)")
+        if journal is not None:
+            journal.record(url, DOWNLOADING, kind, output_dir, filename=filename)
+
+        # Download the file from the resolved info; yt-dlp continues a '.part' file
+        # and, without 'ignoreerrors', raises DownloadError when the download fails
+        try:
+            ydl.process_ie_result(info, download=True)
+        except Exception:
+            if journal is not None:
+                # The stream URLs may have been refused (e.g. a 403); resolve again next attempt
+                journal.drop_resolved(url, kind, output_dir)
+            raise
+        return filename, info
@@ -4,13 +4,25 @@ import os
 import sys
 import time
 import shutil
-import yt_dlp
+import argparse
+import threading
+import urllib.request
+import concurrent.futures
 import numpy as np
 import soundfile as sf
 import librosa
 import noisereduce as nr
 from tqdm import tqdm
 from pydub import AudioSegment
+from artifact_store import store_raw_variant
+from format_policy import bandwidth_saver_selector
+from ffmpeg_tools import split_chapters
+from playlist import is_collection_url, enumerate_entries, start_entry_producer, iter_queue
+from ydl_session import YdlSessionPool
+from download_job import resolve_and_download
+from proxy_probe import RouteSelector, DEFAULT_CUSTOM_PROXY
+from job_journal import JobJournal, DEFAULT_JOURNAL_PATH, DOWNLOADED, ENCODED
+from retry_policy import RetryPolicy, retry_options
 
 # Configure SSL context to handle potential certificate issues
 ssl_context = ssl.create_default_context()
@@ -179,42 +191,221 @@ def reduce_noise(audio_file, noise_duration=2.0, chunk_duration=30):
         print(f"Error processing audio: {str(e)}")
         raise
 
+def denoise_chapters(audio_file, chapters, manifest, workers):
+    """
+    Split a download at its chapter markers and denoise the chapters in parallel.
+    
+    Args:
+        audio_file (str): Downloaded audio file
+        chapters (list): Chapter dicts from the yt-dlp info dict
+        manifest (ArtifactManifest): Manifest receiving the chapter variants
+        workers (int): Number of worker processes
+        
+    Returns:
+        list: Paths of the denoised chapter files
+    """
+    print(f"Splitting into {len(chapters)} chapters (stream copy)...")
+    chapter_files = split_chapters(audio_file, chapters)
+    
+    workers = max(1, min(workers, len(chapter_files)))
+    print(f"Denoising {len(chapter_files)} chapters with {workers} worker(s)...")
+    start_time = time.time()
+    
+    denoised_files = [None] * len(chapter_files)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(reduce_noise, chapter_file): index
+            for index, chapter_file in enumerate(chapter_files)
+        }
+        for future in concurrent.futures.as_completed(futures):
+            index = futures[future]
+            try:
+                denoised_files[index] = future.result()
+                print(f"Chapter {index + 1}/{len(chapter_files)} done: {os.path.basename(denoised_files[index])}")
+            except Exception as e:
+                print(f"Failed to process chapter {index + 1} ({os.path.basename(chapter_files[index])}): {str(e)}")
+    
+    for index, (chapter_file, denoised_file) in enumerate(zip(chapter_files, denoised_files), 1):
+        manifest.add_variant(f"chapter_{index:02d}", chapter_file, 'file')
+        if denoised_file:
+            manifest.add_variant(f"chapter_{index:02d}_denoised", denoised_file, 'file')
+    manifest.save()
+    
+    print(f"Chapters processed in {time.time() - start_time:.2f} seconds")
+    return [f for f in denoised_files if f]
+
+
+def process_download(audio_file, chapters, args):
+    """
+    Link the raw variant of a download and denoise it (per chapter if requested).
+    
+    Returns:
+        list: Paths of the denoised files, or None if processing failed
+    """
+    print(f"\n=== Processing file: {os.path.basename(audio_file)} ===")
+    try:
+        # Link the '_raw' variant to the download instead of copying its bytes
+        raw_audio_file, storage, manifest = store_raw_variant(audio_file)
+        if storage == 'original':
+            print(f"Raw audio kept as the original download: {os.path.basename(raw_audio_file)}")
+        else:
+            print(f"Raw audio saved as: {os.path.basename(raw_audio_file)} ({storage})")
+        
+        if args.chapters and len(chapters) > 1:
+            # Per-chapter outputs, denoised in parallel
+            denoised_files = denoise_chapters(audio_file, chapters, manifest, args.workers)
+            print(f"Denoised {len(denoised_files)}/{len(chapters)} chapters")
+            if len(denoised_files) < len(chapters):
+                # Leave the job unfinished in the journal so a rerun retries it
+                return None
+        else:
+            if args.chapters:
+                print("No chapter markers found, processing as a single file")
+            
+            # Apply noise reduction
+            denoised_file = reduce_noise(audio_file)
+            print(f"Denoised audio saved as: {os.path.basename(denoised_file)}")
+            
+            # Track the denoised/encoded output alongside the raw variant
+            manifest.add_variant('denoised', denoised_file, 'file')
+            manifest.save()
+            denoised_files = [denoised_file]
+        print(f"Artifact manifest: {os.path.basename(manifest.manifest_path)}")
+        return denoised_files
+    except Exception as e:
+        print(f"Failed to process {audio_file}: {str(e)}")
+        return None
+
+
+def candidate_routes(custom_proxy):
+    """Routes probed by --auto-proxy: direct, the system proxy and the configured proxy"""
+    routes = [('direct', None)]
+    system_proxies = urllib.request.getproxies()
+    system_proxy = system_proxies.get('https') or system_proxies.get('http')
+    if system_proxy:
+        routes.append(('system', system_proxy))
+    if custom_proxy and custom_proxy != system_proxy:
+        routes.append(('custom', custom_proxy))
+    return routes
+
+
+def iter_video_urls(urls, args, ydl_opts):
+    """
+    Yield (url, label) for every video to download.
+    
+    Single-video URLs are passed through; playlist and channel URLs are
+    enumerated with flat extraction by a producer thread feeding a bounded
+    queue, so entries are downloaded while the listing is still being read.
+    """
+    for url in urls:
+        if not is_collection_url(url):
+            yield url, url
+            continue
+        
+        print(f"\nEnumerating playlist/channel: {url}")
+        entries = enumerate_entries(
+            url, ydl_opts,
+            playlist_items=args.playlist_items,
+            date_after=args.date_after,
+            date_before=args.date_before,
+            min_duration=args.min_duration,
+            max_duration=args.max_duration
+        )
+        stop_event = threading.Event()
+        job_queue, _ = start_entry_producer(entries, maxsize=args.queue_size, stop_event=stop_event)
+        try:
+            for entry in iter_queue(job_queue):
+                yield entry['url'], f"[{entry['index']}] {entry['title']} ({entry['url']})"
+        finally:
+            stop_event.set()
+
+
 def main():
-    # Set download directory to user's Downloads folder
-    download_dir = os.path.expanduser('~/Downloads')
+    # Create command line argument parser
+    parser = argparse.ArgumentParser(
+        description='YouTube Audio Download and Noise Reduction Tool',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "This tool will:\n"
+            "  1. Download audio from the provided YouTube URLs\n"
+            "  2. Link the raw audio as a '_raw' file (reflink/hardlink, no copy)\n"
+            "  3. Apply noise reduction to the audio\n"
+            "  4. Save the denoised version\n"
+            "\n"
+            "Notes:\n"
+            "  - All files are saved to your Downloads folder unless --output-dir is given\n"
+            "  - Variants of each download are listed in a '.manifest.json' file\n"
+            "  - Progress is kept in a job journal; rerunning resumes interrupted downloads\n"
+            "    and skips finished ones (--resume retries every unfinished job)\n"
+            "  - Large files (>100MB) are processed in chunks for better performance\n"
+            "  - ffmpeg is required for audio processing"
+        )
+    )
+    parser.add_argument('urls', nargs='*',
+                        help='YouTube video, playlist or channel URLs; if none are provided, the default URLs are used')
+    parser.add_argument('--bandwidth-saver', action='store_true',
+                        help='Download the smallest audio stream that is good enough for speech '
+                             '(e.g. 64 kbps Opus or 96 kbps AAC)')
+    parser.add_argument('--chapters', action='store_true',
+                        help='Split videos with chapter markers at chapter boundaries (stream copy) '
+                             'and denoise the chapters in parallel')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of parallel workers for chapter denoising, default: number of CPUs')
+    parser.add_argument('--playlist-items', default=None,
+                        help="Playlist/channel entries to process by index, e.g. '1-20,25'")
+    parser.add_argument('--date-after', default=None,
+                        help='Only playlist/channel entries uploaded on or after this date (YYYYMMDD)')
+    parser.add_argument('--date-before', default=None,
+                        help='Only playlist/channel entries uploaded on or before this date (YYYYMMDD)')
+    parser.add_argument('--min-duration', type=float, default=None,
+                        help='Only playlist/channel entries at least this long (seconds)')
+    parser.add_argument('--max-duration', type=float, default=None,
+                        help='Only playlist/channel entries at most this long (seconds)')
+    parser.add_argument('--auto-proxy', action='store_true',
+                        help='Probe direct, system proxy and %s routes and download through the fastest' % DEFAULT_CUSTOM_PROXY)
+    parser.add_argument('--route-recheck', type=float, default=300,
+                        help='Seconds before --auto-proxy probes the routes again, default 300')
+    parser.add_argument('--queue-size', type=int, default=20,
+                        help='Maximum number of enumerated entries waiting to be downloaded, default 20')
+    parser.add_argument('--proxy', default=DEFAULT_CUSTOM_PROXY,
+                        help="Proxy URL, default %s; pass '' to connect directly "
+                             "(e.g. to a local fake_video_host.py)" % DEFAULT_CUSTOM_PROXY)
+    parser.add_argument('-o', '--output-dir', default=os.path.expanduser('~/Downloads'),
+                        help='Download directory, default: your Downloads folder')
+    parser.add_argument('--max-attempts', type=int, default=5,
+                        help='Attempts per video for transient errors (with backoff), default 5')
+    parser.add_argument('--journal', default=DEFAULT_JOURNAL_PATH,
+                        help='Job journal used to resume interrupted runs, default %(default)s')
+    parser.add_argument('--no-journal', action='store_true',
+                        help='Do not record or resume progress; always start from scratch')
+    parser.add_argument('--resume', action='store_true',
+                        help='Also retry every unfinished job recorded in the journal')
+    args = parser.parse_args()
     
     # Ensure download directory exists
+    download_dir = os.path.expanduser(args.output_dir)
     os.makedirs(download_dir, exist_ok=True)
+    bandwidth_saver = args.bandwidth_saver
     
-    # Check if help flag is provided
-    if len(sys.argv) > 1 and (sys.argv[1] == '--help' or sys.argv[1] == '-h'):
-        print("=== YouTube Audio Download and Noise Reduction Tool ===")
-        print("Usage:")
-        print("  python download_process_audio.py [YouTube URL1] [YouTube URL2] ...")
-        print("  If no URLs are provided, the tool will use default URLs.")
-        print("")
-        print("Description:")
-        print("  This tool will:")
-        print("  1. Download audio from the provided YouTube URLs")
-        print("  2. Save the raw audio with '_raw' suffix")
-        print("  3. Apply noise reduction to the audio")
-        print("  4. Save the denoised version")
-        print("")
-        print("\nNotes:")
-        print("  - All files are saved to your Downloads folder")
-        print("  - Large files (>100MB) are processed in chunks for better performance")
-        print("  - ffmpeg is required for audio processing")
-        return
+    # Records each job's phase so a rerun skips finished work
+    journal = None if args.no_journal else JobJournal(args.journal)
     
     # Check if URLs are provided as arguments
-    if len(sys.argv) > 1:
-        URLS = sys.argv[1:]
+    if args.urls:
+        URLS = list(args.urls)
+    elif args.resume and journal is not None:
+        URLS = []
     else:
         # Default URLs if none provided
         URLS = [
             'https://www.youtube.com/watch?v=BUJpAzByMjo&t=279s'
         ]
     
+    if args.resume and journal is not None:
+        unfinished = [url for url in journal.unfinished(output_dir=download_dir) if url not in URLS]
+        print(f"Resuming {len(unfinished)} unfinished job(s) from the journal")
+        URLS += unfinished
+    
     print("=== YouTube Audio Download and Noise Reduction Tool ===")
     print("This tool will download audio from YouTube, save the raw audio,")
     print("and immediately apply noise reduction, saving both versions.")
@@ -236,11 +427,9 @@ def main():
     # Build output template path
     ydl_opts = {
         # Proxy configuration
-        'proxy': 'http://127.0.0.1:7890',
+        'proxy': args.proxy,
         # Add SSL configuration
         'nocheckcertificate': True,
-        # Increase retry count
-        'retries': 10,
         # Set timeout
         'socket_timeout': 30,
         # Download audio format
@@ -251,50 +440,86 @@ def main():
         'outtmpl': os.path.join(download_dir, '%(title)s [%(id)s].%(ext)s')
     }
     
-    # Create a list to store downloaded file paths
-    downloaded_files = []
+    # Whole jobs are retried with backoff, so yt-dlp's own retries are turned off
+    retry = RetryPolicy(max_attempts=args.max_attempts)
+    ydl_opts.update(retry_options(retry))
     
-    print(f"Starting audio download for {len(URLS)} video(s)...")
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        try:
-            # Download each URL and track the files
-            for url in URLS:
-                print(f"\nDownloading audio from: {url}")
-                info = ydl.extract_info(url, download=False)
-                filename = ydl.prepare_filename(info)
-                downloaded_files.append(filename)
-                
-                # Download the file
-                error_code = ydl.download([url])
-                
-                if error_code == 0:
-                    print(f"Audio downloaded successfully: {filename}")
-                else:
-                    print(f"Error occurred during audio download, error code: {error_code}")
-                    downloaded_files.pop()  # Remove from list if download failed
+    if bandwidth_saver:
+        # Prefer m4a so the denoising step gets the same container as before
+        ydl_opts['format'] = bandwidth_saver_selector(preferred_ext='m4a')
+        print("Bandwidth saver enabled: downloading the smallest speech-quality stream")
+    
+    # Playlist and channel URLs are enumerated lazily into a bounded queue
+    collections = [url for url in URLS if is_collection_url(url)]
+    if collections:
+        print(f"{len(collections)} playlist/channel URL(s) will be enumerated with flat extraction")
+    
+    processed_count = 0
+    failed_count = 0
+    
+    # One yt-dlp session per route; sessions are reused across URLs
+    sessions = YdlSessionPool(max_per_profile=1)
+    route_selector = RouteSelector(recheck_interval=args.route_recheck) if args.auto_proxy else None
+    
+    print(f"Starting audio download for {len(URLS)} URL(s)...")
+    try:
+        # Download each video and process it as soon as it is on disk
+        for url, label in iter_video_urls(URLS, args, ydl_opts):
+            print(f"\nDownloading audio from: {label}")
+            job_opts = ydl_opts
+            if route_selector is not None:
+                # Re-probed once the last result is older than --route-recheck seconds
+                best = route_selector.best_route(candidate_routes(ydl_opts['proxy']))
+                job_opts = dict(ydl_opts, proxy=best.proxy or '') if best else ydl_opts
             
-            print("\n=== All downloads completed ===")
+            entry = journal.get(url, output_dir=download_dir) if journal is not None else None
+            if journal is not None and journal.completed_outputs(url, ENCODED, output_dir=download_dir):
+                print("Already downloaded and processed (job journal), skipping")
+                processed_count += 1
+                continue
             
-            # Process each downloaded file with noise reduction
-            for audio_file in downloaded_files:
-                print(f"\n=== Processing file: {os.path.basename(audio_file)} ===")
-                try:
-                    # Create a copy with '_raw' suffix to clearly identify raw audio
-                    raw_audio_file = audio_file.replace('.', '_raw.')
-                    if os.path.exists(raw_audio_file):
-                        os.remove(raw_audio_file)
-                    shutil.copy2(audio_file, raw_audio_file)
-                    print(f"Raw audio saved as: {os.path.basename(raw_audio_file)}")
-                    
-                    # Apply noise reduction
-                    denoised_file = reduce_noise(audio_file)
-                    print(f"Denoised audio saved as: {os.path.basename(denoised_file)}")
-                except Exception as e:
-                    print(f"Failed to process {audio_file}: {str(e)}")
+            try:
+                if journal is not None and journal.completed_outputs(url, DOWNLOADED, output_dir=download_dir):
+                    # Crashed after the download; only the processing is left
+                    filename = entry['filename']
+                    info = entry['info'] or {}
+                    print(f"Already downloaded (job journal): {filename}")
+                else:
+                    # Transient errors are retried with backoff; a host that keeps failing pauses new requests
+                    filename, info = retry.call(
+                        resolve_and_download, sessions, job_opts, url, label, journal, download_dir,
+                        url=url, description=f"Download of {label}")
+                    if journal is not None:
+                        journal.record(url, DOWNLOADED, output_dir=download_dir, filename=filename)
+                    print(f"Audio downloaded successfully: {filename}")
+            except Exception as e:
+                print(f"Failed to download {url}: {str(e)}")
+                failed_count += 1
+                if journal is not None:
+                    journal.record_failure(url, e, output_dir=download_dir)
+                if route_selector is not None:
+                    route_selector.invalidate()
+                continue
             
-            print("\n=== All files processed ===")
-        except Exception as e:
-            print(f"Exception occurred: {str(e)}")
+            denoised_files = process_download(filename, info.get('chapters') or [], args)
+            if denoised_files is not None:
+                processed_count += 1
+                if journal is not None:
+                    # The denoised files are written already encoded (mp3/wav)
+                    journal.record(url, ENCODED, output_dir=download_dir, outputs=denoised_files)
+            else:
+                failed_count += 1
+                if journal is not None:
+                    journal.record_failure(url, "processing failed", output_dir=download_dir)
+        
+        print("\n=== All files processed ===")
+        print(f"Processed: {processed_count}, failed: {failed_count}")
+    except Exception as e:
+        print(f"Exception occurred: {str(e)}")
+    finally:
+        sessions.close_all()
+        if journal is not None:
+            journal.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
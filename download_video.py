@@ -3,6 +3,12 @@ import ssl
 import os
 import sys
 
+from segmented_download import segmented_download_options, describe_connections
+from job_journal import JobJournal, DOWNLOADED
+from retry_policy import RetryPolicy, retry_options
+from ydl_session import YdlSessionPool
+from download_job import resolve_and_download
+
 # Check if ffmpeg is installed
 try:
     # Try to find ffmpeg in PATH
@@ -21,11 +27,36 @@ ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
 ssl_context.verify_mode = ssl.CERT_NONE
 
-# YouTube video URL list
-URLS = [
+# With --proxy URL, use another proxy; --proxy '' connects directly (e.g. to fake_video_host.py)
+PROXY = 'http://127.0.0.1:7890'
+if '--proxy' in sys.argv[1:]:
+    try:
+        PROXY = sys.argv[sys.argv.index('--proxy') + 1]
+    except IndexError:
+        print("ERROR: --proxy needs a URL, or '' for a direct connection")
+        sys.exit(1)
+
+# YouTube video URL list; URLs given on the command line replace it
+URLS = [arg for arg in sys.argv[1:] if arg.startswith(('http://', 'https://')) and arg != PROXY] or [
     'https://www.youtube.com/watch?v=BUJpAzByMjo&t=279s'
 ]
 
+# With --with-audio, also save the audio track as a separate file from the same download
+EXTRACT_AUDIO = '--with-audio' in sys.argv[1:]
+
+# With --connections N, download each file over N connections
+CONNECTIONS = 1
+if '--connections' in sys.argv[1:]:
+    try:
+        CONNECTIONS = int(sys.argv[sys.argv.index('--connections') + 1])
+    except (IndexError, ValueError):
+        print("ERROR: --connections needs a number, e.g. --connections 8")
+        sys.exit(1)
+
+# Progress is kept in the job journal so a rerun resumes instead of starting over;
+# --no-journal always starts from scratch
+USE_JOURNAL = '--no-journal' not in sys.argv[1:]
+
 # Set download directory to user's Downloads folder
 download_dir = os.path.expanduser('~/Downloads')
 
@@ -35,11 +66,9 @@ os.makedirs(download_dir, exist_ok=True)
 # Video download configuration options
 ydl_opts = {
     # Proxy configuration
-    'proxy': 'http://127.0.0.1:7890',
+    'proxy': PROXY,
     # Add SSL configuration to avoid certificate verification issues
     'nocheckcertificate': True,
-    # Increase retry count to improve download stability
-    'retries': 10,
     # Set timeout duration
     'socket_timeout': 30,
     # Download best available format
@@ -52,6 +81,23 @@ ydl_opts = {
     'outtmpl': os.path.join(download_dir, '%(title)s [%(id)s].%(ext)s')
 }
 
+# Retry transient errors with jittered backoff instead of immediately; RETRY
+# wraps resolving and downloading, so yt-dlp's own retries are turned off
+RETRY = RetryPolicy()
+ydl_opts.update(retry_options(RETRY))
+
+# Split large downloads over several connections
+ydl_opts.update(segmented_download_options(CONNECTIONS))
+
+if EXTRACT_AUDIO:
+    # 'best' copies the audio stream without re-encoding (AAC -> .m4a, Opus -> .opus)
+    ydl_opts['postprocessors'] = [{
+        'key': 'FFmpegExtractAudio',
+        'preferredcodec': 'best',
+    }]
+    # Keep the MP4 after the audio has been extracted
+    ydl_opts['keepvideo'] = True
+
 def download_video():
     """
     Main function for downloading YouTube videos
@@ -60,22 +106,48 @@ def download_video():
     print(f"Files will be saved to: {download_dir}")
     print("Note: Video files may be large, please ensure you have enough disk space.")
     print("To interrupt download, press Ctrl+C.")
+    print(f"Download mode: {describe_connections(CONNECTIONS)}")
+    if EXTRACT_AUDIO:
+        print("The audio track will also be saved as M4A/Opus (stream copy, no re-encoding).")
     
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        try:
-            # Ensure using merged video format
-            ydl_opts['format'] = 'best[ext=mp4]/best'
-            
-            error_code = ydl.download(URLS)
-            if error_code == 0:
-                print("Video download completed successfully!")
-                print("Video will remain in original format and quality, no conversion needed.")
-            else:
-                print(f"Error occurred during video download, error code: {error_code}")
-        except KeyboardInterrupt:
-            print("\nDownload interrupted by user.")
-        except Exception as e:
-            print(f"Exception occurred: {str(e)}")
+    journal = JobJournal() if USE_JOURNAL else None
+    sessions = YdlSessionPool(max_per_profile=1)
+    failed = []
+    try:
+        for url in URLS:
+            if journal is not None and journal.completed_outputs(url, DOWNLOADED, kind='video', output_dir=download_dir):
+                print(f"Already downloaded (job journal), skipping: {url}")
+                continue
+            try:
+                # Every attempt resolves again after a failure, so refused stream URLs aren't retried;
+                # yt-dlp continues the '.part' file (aria2c its control file)
+                filename, info = RETRY.call(
+                    resolve_and_download, sessions, ydl_opts, url, None, journal, download_dir, kind='video',
+                    url=url, description=f"Download of {url}")
+                if journal is not None:
+                    journal.record(url, DOWNLOADED, kind='video', output_dir=download_dir, filename=filename)
+                print(f"Downloaded: {filename}")
+            except yt_dlp.utils.DownloadError as e:
+                print(f"Error occurred during video download: {str(e)}")
+                failed.append(url)
+                if journal is not None:
+                    # Resolve fresh stream URLs on the next run
+                    journal.drop_resolved(url, kind='video', output_dir=download_dir)
+                    journal.record_failure(url, e, kind='video', output_dir=download_dir)
+        
+        if not failed:
+            print("Video download completed successfully!")
+            print("Video will remain in original format and quality, no conversion needed.")
+        else:
+            print(f"{len(failed)} of {len(URLS)} video(s) failed; run again to resume them.")
+    except KeyboardInterrupt:
+        print("\nDownload interrupted by user. Run again to resume.")
+    except Exception as e:
+        print(f"Exception occurred: {str(e)}")
+    finally:
+        sessions.close_all()
+        if journal is not None:
+            journal.close()
 
 if __name__ == "__main__":
     download_video()
\ No newline at end of file
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+import os
+import json
+import math
+import time
+import wave
+import random
+import struct
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from bandwidth import parse_rate
+
+# Content types for the media files the host can serve
+CONTENT_TYPES = {
+    '.wav': 'audio/wav',
+    '.m4a': 'audio/mp4',
+    '.mp4': 'video/mp4',
+    '.webm': 'video/webm',
+}
+
+# Bytes written per socket send; throttling sleeps between blocks
+BLOCK_SIZE = 16 * 1024
+
+
+def make_wav(path, duration=10.0, sample_rate=16000, tone=220.0, noise=0.05, seed=0):
+    """
+    Write a mono 16-bit WAV with a tone plus noise, using only the standard library.
+
+    The first second is noise only, so the denoisers get a usable noise sample.
+    """
+    rng = random.Random(seed)
+    frames = bytearray()
+    for i in range(int(duration * sample_rate)):
+        t = i / sample_rate
+        signal = 0.5 * math.sin(2 * math.pi * tone * t) if t >= 1.0 else 0.0
+        value = signal + rng.uniform(-noise, noise)
+        frames += struct.pack('<h', int(max(-1.0, min(1.0, value)) * 32767))
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(frames))
+    return path
+
+
+def make_media(path, duration=10.0, sample_rate=16000, seed=0):
+    """
+    Write a synthetic media file; the extension picks the container.
+
+    .wav needs nothing else; .m4a, .mp4 and .webm are encoded with ffmpeg
+    from the generated WAV (a test pattern is used as the video stream).
+
+    Raises:
+        RuntimeError: If ffmpeg is needed but not installed
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.wav':
+        return make_wav(path, duration, sample_rate, seed=seed)
+    if not shutil.which('ffmpeg'):
+        raise RuntimeError(f"ffmpeg is required to generate {ext} files")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = make_wav(os.path.join(tmp, 'source.wav'), duration, sample_rate, seed=seed)
+        cmd = ['ffmpeg', '-y', '-v', 'error']
+        if ext in ('.mp4', '.webm'):
+            cmd += ['-f', 'lavfi', '-i', f"testsrc=size=320x180:rate=15:duration={duration}"]
+        cmd += ['-i', wav_path, '-shortest', path]
+        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return path
+
+
+class FaultProfile:
+    """
+    Misbehaviour injected into media responses.
+
+    Args:
+        throttle (float): Bytes per second per response, None for full speed
+        fail_first (int): Answer the first N requests for a file with fail_status
+        fail_status (int): HTTP status used for injected failures, e.g. 429 or 503
+        error_rate (float): Probability (0-1) of failing any later request
+        stall_after (int): Pause the body after this many bytes
+        stall_seconds (float): Length of the pause
+        truncate_after (int): Drop the connection after this many body bytes
+                              (only the first response for a file, so resuming works)
+        seed (int): Seed for error_rate, for reproducible runs
+    """
+
+    FIELDS = {
+        'throttle': parse_rate,
+        'fail_first': int,
+        'fail_status': int,
+        'error_rate': float,
+        'stall_after': int,
+        'stall_seconds': float,
+        'truncate_after': int,
+        'seed': int,
+    }
+
+    def __init__(self, throttle=None, fail_first=0, fail_status=503, error_rate=0.0,
+                 stall_after=None, stall_seconds=0.0, truncate_after=None, seed=None):
+        self.throttle = throttle
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.error_rate = error_rate
+        self.stall_after = stall_after
+        self.stall_seconds = stall_seconds
+        self.truncate_after = truncate_after
+        self.seed = seed
+
+    def with_query(self, query):
+        """Copy of this profile overridden by URL query parameters (?throttle=100K&fail_first=2)"""
+        values = dict(vars(self))
+        for name, items in urllib.parse.parse_qs(query).items():
+            if name in self.FIELDS:
+                values[name] = self.FIELDS[name](items[-1])
+        return FaultProfile(**values)
+
+    def to_query(self):
+        """Query string for the non-default fields"""
+        defaults = vars(FaultProfile())
+        return urllib.parse.urlencode(
+            {k: v for k, v in vars(self).items() if v != defaults[k]})
+
+
+class FakeVideoHost:
+    """
+    Local stand-in for a video site.
+
+    Serves synthetic media files under /media/<id><ext> (with Range support,
+    so resumed and multi-connection downloads work) and yt-dlp info JSON
+    under /info/<id>.json. yt-dlp downloads a media URL directly through its
+    generic extractor, or an info JSON with download_with_info_file().
+
+    Every request is recorded in self.requests as (path, range, status) so
+    tests can assert on retries and resumes.
+
+    Usage:
+        with FakeVideoHost(faults=FaultProfile(throttle=200 * 1024)) as host:
+            host.add_video('talk1', 'First talk', duration=30)
+            url = host.media_url('talk1')
+    """
+
+    def __init__(self, media_dir=None, host='127.0.0.1', port=0, faults=None):
+        self._tmp = None
+        if media_dir is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix='fake_video_host_')
+            media_dir = self._tmp.name
+        self.media_dir = media_dir
+        self.faults = faults or FaultProfile()
+        self.videos = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self._counts = {}
+        self._rng = random.Random(self.faults.seed)
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def add_video(self, video_id, title=None, duration=10.0, ext='.wav', path=None, sample_rate=16000):
+        """
+        Register a video; generates a synthetic file unless path is given.
+
+        Returns:
+            dict: The video's info dict (see info_for)
+        """
+        if path is None:
+            path = os.path.join(self.media_dir, f"{video_id}{ext}")
+            if not os.path.exists(path):
+                make_media(path, duration, sample_rate, seed=len(self.videos))
+        ext = os.path.splitext(path)[1].lower()
+        self.videos[video_id] = {
+            'path': path,
+            'ext': ext,
+            'title': title or video_id,
+            'duration': duration,
+        }
+        return self.info_for(video_id)
+
+    def media_url(self, video_id, faults=None):
+        """URL of a video's media file; faults (a FaultProfile) apply to this URL only"""
+        url = f"{self.base_url}/media/{video_id}{self.videos[video_id]['ext']}"
+        query = faults.to_query() if faults else ''
+        return f"{url}?{query}" if query else url
+
+    def info_for(self, video_id, faults=None):
+        """A minimal yt-dlp info dict with one format pointing at this host"""
+        video = self.videos[video_id]
+        ext = video['ext'].lstrip('.')
+        has_video = video['ext'] in ('.mp4', '.webm')
+        return {
+            'id': video_id,
+            'title': video['title'],
+            'ext': ext,
+            'duration': video['duration'],
+            'webpage_url': f"{self.base_url}/watch/{video_id}",
+            'extractor': 'generic',
+            'extractor_key': 'Generic',
+            'formats': [{
+                'format_id': ext,
+                'url': self.media_url(video_id, faults),
+                'ext': ext,
+                'protocol': 'http',
+                'filesize': os.path.getsize(video['path']),
+                'acodec': 'pcm_s16le' if ext == 'wav' else 'aac',
+                'vcodec': 'h264' if has_video else 'none',
+            }],
+        }
+
+    def write_info_json(self, video_id, directory, faults=None):
+        """Write the info dict for yt-dlp's --load-info-json; returns the path"""
+        path = os.path.join(directory, f"{video_id}.info.json")
+        with open(path, 'w') as f:
+            json.dump(self.info_for(video_id, faults), f, indent=2)
+        return path
+
+    def request_count(self, video_id):
+        """Number of media requests received for a video"""
+        with self.lock:
+            return self._counts.get(video_id, 0)
+
+    def _make_handler(self):
+        host = self
+
+        class FakeHostHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_HEAD(self):
+                self._serve(send_body=False)
+
+            def do_GET(self):
+                self._serve(send_body=True)
+
+            def _record(self, status):
+                with host.lock:
+                    host.requests.append((self.path, self.headers.get('Range'), status))
+
+            def _error(self, status):
+                self._record(status)
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                if status == 429:
+                    self.send_header('Retry-After', '1')
+                self.end_headers()
+
+            def _serve(self, send_body):
+                parsed = urllib.parse.urlparse(self.path)
+                parts = parsed.path.strip('/').split('/')
+                if len(parts) == 2 and parts[0] == 'info' and parts[1].endswith('.json'):
+                    video_id = parts[1][:-len('.json')]
+                    if video_id not in host.videos:
+                        return self._error(404)
+                    body = json.dumps(host.info_for(video_id)).encode('utf-8')
+                    self._record(200)
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    if send_body:
+                        self.wfile.write(body)
+                    return
+                if len(parts) != 2 or parts[0] != 'media':
+                    return self._error(404)
+
+                video_id = os.path.splitext(parts[1])[0]
+                video = host.videos.get(video_id)
+                if video is None:
+                    return self._error(404)
+                faults = host.faults.with_query(parsed.query)
+
+                with host.lock:
+                    count = host._counts.get(video_id, 0) + 1
+                    host._counts[video_id] = count
+                    random_failure = faults.error_rate and host._rng.random() < faults.error_rate
+                if count <= faults.fail_first or random_failure:
+                    return self._error(faults.fail_status)
+
+                size = os.path.getsize(video['path'])
+                start, end = 0, size - 1
+                status = 200
+                range_header = self.headers.get('Range')
+                if range_header and range_header.startswith('bytes='):
+                    first, _, last = range_header[len('bytes='):].split(',')[0].partition('-')
+                    start = int(first) if first else max(0, size - int(last))
+                    end = int(last) if first and last else size - 1
+                    if start >= size:
+                        self._record(416)
+                        self.send_response(416)
+                        self.send_header('Content-Range', f"bytes */{size}")
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    end = min(end, size - 1)
+                    status = 206
+
+                self._record(status)
+                self.send_response(status)
+                self.send_header('Content-Type', CONTENT_TYPES.get(video['ext'], 'application/octet-stream'))
+                self.send_header('Content-Length', str(end - start + 1))
+                self.send_header('Accept-Ranges', 'bytes')
+                if status == 206:
+                    self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+                self.end_headers()
+                if send_body:
+                    # Only the first successful response is cut short, so a resume can finish
+                    truncate = faults.truncate_after if count == faults.fail_first + 1 else None
+                    self._send_body(video['path'], start, end, faults, truncate)
+
+            def _send_body(self, path, start, end, faults, truncate_after):
+                sent = 0
+                stalled = False
+                begin = time.monotonic()
+                with open(path, 'rb') as f:
+                    f.seek(start)
+                    remaining = end - start + 1
+                    while remaining > 0:
+                        block = f.read(min(BLOCK_SIZE, remaining))
+                        if not block:
+                            break
+                        if faults.throttle:
+                            # Hold the block back until sending it keeps the average at the limit
+                            delay = (sent + len(block)) / faults.throttle - (time.monotonic() - begin)
+                            if delay > 0:
+                                time.sleep(delay)
+                        if truncate_after is not None and sent + len(block) > truncate_after:
+                            self.wfile.write(block[:max(0, truncate_after - sent)])
+                            self.wfile.flush()
+                            # Drop the connection mid-body
+                            self.close_connection = True
+                            return
+                        try:
+                            self.wfile.write(block)
+                        except (BrokenPipeError, ConnectionResetError):
+                            return
+                        sent += len(block)
+                        remaining -= len(block)
+                        if faults.stall_after is not None and not stalled and sent >= faults.stall_after:
+                            stalled = True
+                            time.sleep(faults.stall_seconds)
+
+            def log_message(self, format, *args):
+                pass
+
+        return FakeHostHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serve synthetic videos locally for offline downloader tests and benchmarks',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Example:\n"
+            "  python fake_video_host.py --count 4 --duration 120 --throttle 500K --fail-first 1\n"
+            "  python download_process_audio.py --proxy '' http://127.0.0.1:8000/media/video1.wav\n"
+            "\n"
+            "Faults can also be set per URL with query parameters, e.g. ?throttle=100K&stall_after=65536&stall_seconds=40"
+        )
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on, default 127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on, default 8000')
+    parser.add_argument('--media-dir', default=None, help='Directory for generated media, default: temporary')
+    parser.add_argument('--count', type=int, default=3, help='Number of synthetic videos, default 3')
+    parser.add_argument('--duration', type=float, default=60.0, help='Duration of each video in seconds')
+    parser.add_argument('--ext', default='.wav', choices=sorted(CONTENT_TYPES),
+                        help='Container of the generated files (.wav needs no ffmpeg)')
+    parser.add_argument('--throttle', type=parse_rate, default=None, help='Per-response rate, e.g. 500K')
+    parser.add_argument('--fail-first', type=int, default=0, help='Fail the first N requests per file')
+    parser.add_argument('--fail-status', type=int, default=503, help='Status for injected failures')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of failing a request')
+    parser.add_argument('--stall-after', type=int, default=None, help='Pause each response after N bytes')
+    parser.add_argument('--stall-seconds', type=float, default=0.0, help='Length of the pause')
+    parser.add_argument('--truncate-after', type=int, default=None,
+                        help='Drop the first response for each file after N bytes')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for --error-rate')
+    args = parser.parse_args()
+
+    faults = FaultProfile(
+        throttle=args.throttle, fail_first=args.fail_first, fail_status=args.fail_status,
+        error_rate=args.error_rate, stall_after=args.stall_after, stall_seconds=args.stall_seconds,
+        truncate_after=args.truncate_after, seed=args.seed
+    )
+    host = FakeVideoHost(args.media_dir, args.host, args.port, faults)
+    print("=== Fake Video Host ===")
+    print(f"Generating {args.count} synthetic video(s) of {args.duration:.0f} seconds...")
+    for index in range(1, args.count + 1):
+        host.add_video(f"video{index}", f"Synthetic talk {index}", args.duration, args.ext)
+        print(f"  {host.media_url(f'video{index}')}")
+        print(f"  {host.base_url}/info/video{index}.json")
+    print(f"Serving on {host.base_url}. Press Ctrl+C to stop.")
+    host.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        host.stop()
+
+
+if __name__ == "__main__":
+    main()
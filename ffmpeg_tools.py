@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import os
+import json
+import subprocess
+
+# Containers that normally carry a video stream
+VIDEO_EXTENSIONS = ('.mp4', '.m4v', '.mov', '.mkv', '.webm', '.avi')
+
+
+def is_video_file(path):
+    """Guess from the extension whether a file is a video container"""
+    return os.path.splitext(path)[1].lower() in VIDEO_EXTENSIONS
+
+
+def probe_media(path):
+    """
+    Read stream information with ffprobe (headers only, nothing is decoded).
+
+    Args:
+        path (str): Media file path
+
+    Returns:
+        dict: duration (seconds), sample_rate, channels, audio_codec,
+              has_video, has_audio; values are None when unknown
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe fails
+    """
+    result = subprocess.run([
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'format=duration:stream=codec_type,codec_name,sample_rate,channels,duration',
+        '-of', 'json', path
+    ], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    data = json.loads(result.stdout or '{}')
+
+    streams = data.get('streams', [])
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    has_video = any(s.get('codec_type') == 'video' for s in streams)
+
+    duration = data.get('format', {}).get('duration')
+    if duration is None and audio is not None:
+        duration = audio.get('duration')
+
+    return {
+        'duration': float(duration) if duration not in (None, 'N/A') else None,
+        'sample_rate': int(audio['sample_rate']) if audio and audio.get('sample_rate') else None,
+        'channels': audio.get('channels') if audio else None,
+        'audio_codec': audio.get('codec_name') if audio else None,
+        'has_video': has_video,
+        'has_audio': audio is not None,
+    }
+
+
+def audio_encoder_for(path):
+    """Pick an ffmpeg audio encoder that fits the output container"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.webm', '.opus', '.ogg'):
+        return ['-c:a', 'libopus', '-b:a', '96k']
+    if ext == '.wav':
+        return ['-c:a', 'pcm_s16le']
+    if ext == '.flac':
+        return ['-c:a', 'flac']
+    if ext == '.mp3':
+        return ['-c:a', 'libmp3lame', '-b:a', '128k']
+    return ['-c:a', 'aac', '-b:a', '128k']
+
+
+def _safe_filename(name):
+    """Replace characters that are not allowed in file names"""
+    cleaned = ''.join('_' if c in '/\\:*?"<>|' else c for c in name).strip()
+    return cleaned or 'untitled'
+
+
+def split_chapters(input_file, chapters, output_dir=None):
+    """
+    Cut an audio file at chapter boundaries using stream copy (no re-encoding).
+
+    Args:
+        input_file (str): Audio file to split
+        chapters (list): yt-dlp chapter dicts with start_time, end_time and title
+        output_dir (str): Directory for the chapter files, default '<name>_chapters'
+                          next to the input
+
+    Returns:
+        list: Paths of the chapter files, in chapter order
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg fails on a chapter
+    """
+    base, ext = os.path.splitext(input_file)
+    if output_dir is None:
+        output_dir = f"{base}_chapters"
+    os.makedirs(output_dir, exist_ok=True)
+
+    chapter_files = []
+    for index, chapter in enumerate(chapters, 1):
+        title = _safe_filename(chapter.get('title') or f"Chapter {index}")
+        output_file = os.path.join(output_dir, f"{index:02d} - {title}{ext}")
+        # Seeking before -i is fast; -t then limits the output to the chapter length
+        cmd = ['ffmpeg', '-y', '-v', 'error', '-ss', str(chapter['start_time']), '-i', input_file]
+        if chapter.get('end_time') is not None:
+            cmd += ['-t', str(chapter['end_time'] - chapter['start_time'])]
+        cmd += ['-map', '0:a', '-c', 'copy', output_file]
+        subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        chapter_files.append(output_file)
+    return chapter_files
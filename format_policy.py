@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+# Minimum audio bitrate (kbps) per codec that is good enough for speech
+SPEECH_TARGET_KBPS = {
+    'opus': 64,
+    'aac': 96,
+    'vorbis': 96,
+    'mp3': 96,
+}
+
+# Reported bitrates fluctuate around the nominal value (e.g. 62 kbps for a 64k stream)
+BITRATE_TOLERANCE = 0.9
+
+
+def codec_family(acodec):
+    """Map a yt-dlp acodec string (e.g. 'mp4a.40.2') to a codec family name"""
+    if not acodec or acodec == 'none':
+        return None
+    acodec = acodec.lower()
+    if acodec.startswith('opus'):
+        return 'opus'
+    if acodec.startswith('mp4a') or acodec.startswith('aac'):
+        return 'aac'
+    if acodec.startswith('vorbis'):
+        return 'vorbis'
+    if acodec.startswith('mp3'):
+        return 'mp3'
+    return None
+
+
+def audio_only_formats(formats):
+    """Return the formats that carry audio and no video"""
+    return [
+        f for f in formats
+        if f.get('acodec') not in (None, 'none') and f.get('vcodec') == 'none'
+    ]
+
+
+def audio_bitrate(fmt):
+    return fmt.get('abr') or fmt.get('tbr')
+
+
+def estimated_size(fmt, duration=None):
+    """
+    Estimate the download size of a format in bytes.
+
+    Args:
+        fmt (dict): yt-dlp format dictionary
+        duration (float): Media duration in seconds, used when no size is reported
+
+    Returns:
+        int: Estimated size, or None if it can't be worked out
+    """
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if size:
+        return int(size)
+    kbps = audio_bitrate(fmt)
+    if kbps and duration:
+        return int(kbps * 1000 / 8 * duration)
+    return None
+
+
+def meets_target(fmt, targets=SPEECH_TARGET_KBPS):
+    """Check whether a format's bitrate reaches the target for its codec"""
+    target = targets.get(codec_family(fmt.get('acodec')))
+    kbps = audio_bitrate(fmt)
+    if target is None or kbps is None:
+        return False
+    return kbps >= target * BITRATE_TOLERANCE
+
+
+def best_audio_format(formats, preferred_ext=None):
+    """
+    Pick the format 'bestaudio[ext=<preferred_ext>]/bestaudio' would choose.
+
+    Used as the baseline when reporting how many bytes the policy saved.
+    """
+    audio = audio_only_formats(formats)
+    if preferred_ext:
+        same_ext = [f for f in audio if f.get('ext') == preferred_ext]
+        audio = same_ext or audio
+    if not audio:
+        return None
+    return max(audio, key=lambda f: audio_bitrate(f) or 0)
+
+
+def select_audio_format(formats, duration=None, targets=SPEECH_TARGET_KBPS, preferred_ext=None):
+    """
+    Pick the smallest audio-only format that meets the bitrate targets.
+
+    Args:
+        formats (list): yt-dlp format dictionaries
+        duration (float): Media duration in seconds, for size estimates
+        targets (dict): Minimum kbps per codec family
+        preferred_ext (str): Container to prefer (e.g. 'm4a') so no remux or
+                             transcode is needed afterwards
+
+    Returns:
+        dict: The chosen format, or None if no format meets the targets
+    """
+    candidates = [f for f in audio_only_formats(formats) if meets_target(f, targets)]
+    if preferred_ext:
+        same_ext = [f for f in candidates if f.get('ext') == preferred_ext]
+        candidates = same_ext or candidates
+    if not candidates:
+        return None
+
+    def sort_key(f):
+        size = estimated_size(f, duration)
+        return (size if size is not None else float('inf'), audio_bitrate(f) or float('inf'))
+
+    return min(candidates, key=sort_key)
+
+
+def describe_format(fmt, duration=None):
+    size = estimated_size(fmt, duration)
+    size_text = f"{size / (1024 * 1024):.1f} MB" if size else "unknown size"
+    return f"{fmt.get('format_id')} ({fmt.get('ext')}, {codec_family(fmt.get('acodec'))}, {audio_bitrate(fmt) or '?'} kbps, {size_text})"
+
+
+def bandwidth_saver_selector(preferred_ext=None, targets=SPEECH_TARGET_KBPS, log=print):
+    """
+    Build a yt-dlp 'format' callable that applies the bandwidth-saver policy.
+
+    Pass the result as ydl_opts['format']. It picks the smallest audio stream
+    meeting the targets, falls back to the best audio stream, and logs how
+    many bytes were saved compared with plain bestaudio.
+
+    Args:
+        preferred_ext (str): Container to prefer, e.g. 'm4a'
+        targets (dict): Minimum kbps per codec family
+        log: Function used to report the decision
+    """
+    last_message = [None]
+
+    def report(message):
+        # Format selection runs again when info is extracted before downloading
+        if message != last_message[0]:
+            last_message[0] = message
+            log(message)
+
+    def selector(ctx):
+        formats = ctx.get('formats') or []
+        baseline = best_audio_format(formats, preferred_ext)
+        chosen = select_audio_format(formats, targets=targets, preferred_ext=preferred_ext)
+
+        if chosen is None:
+            chosen = baseline or (formats[-1] if formats else None)
+            if chosen is None:
+                return
+            report(f"Bandwidth saver: no stream meets the target, using {describe_format(chosen)}")
+        elif baseline is not None and baseline is not chosen:
+            chosen_size = estimated_size(chosen)
+            baseline_size = estimated_size(baseline)
+            if chosen_size and baseline_size:
+                saved_mb = (baseline_size - chosen_size) / (1024 * 1024)
+                report(f"Bandwidth saver: {describe_format(chosen)} instead of "
+                       f"{describe_format(baseline)}, saving {saved_mb:.1f} MB")
+            else:
+                report(f"Bandwidth saver: {describe_format(chosen)} instead of {describe_format(baseline)}")
+        else:
+            report(f"Bandwidth saver: {describe_format(chosen)} is already the smallest suitable stream")
+        yield chosen
+
+    # Selectors with the same settings are interchangeable, so yt-dlp sessions can be shared
+    selector.profile_key = ('bandwidth_saver', preferred_ext, tuple(sorted(targets.items())))
+    return selector
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import sqlite3
+import threading
+import urllib.parse
+
+# Journal shared by the command line tools
+DEFAULT_JOURNAL_PATH = os.path.expanduser('~/.youtube_media_downloader/journal.sqlite3')
+
+# Phases in the order a job goes through them; denoising writes the encoded
+# file directly, so ENCODED marks a finished denoise as well
+RESOLVED = 'resolved'
+DOWNLOADING = 'downloading'
+DOWNLOADED = 'downloaded'
+ENCODED = 'encoded'
+PHASES = (RESOLVED, DOWNLOADING, DOWNLOADED, ENCODED)
+
+# Reuse resolved stream URLs for at most this long when they carry no expiry
+RESOLVED_INFO_TTL = 3 * 3600
+
+# Stop reusing resolved stream URLs this long before they expire
+EXPIRY_MARGIN = 15 * 60
+
+
+def _stream_expiry(info):
+    """Earliest 'expire' timestamp in the chosen format URLs, or None"""
+    urls = [info.get('url')]
+    urls += [f.get('url') for f in info.get('requested_formats') or []]
+    expiries = []
+    for url in urls:
+        if not url:
+            continue
+        values = urllib.parse.parse_qs(urllib.parse.urlparse(url).query).get('expire')
+        if values and values[0].isdigit():
+            expiries.append(int(values[0]))
+    return min(expiries) if expiries else None
+
+
+def _folder(output_dir):
+    """Normalized output folder used in the journal key ('' when not given)"""
+    return os.path.abspath(os.path.expanduser(output_dir)) if output_dir else ''
+
+
+class JobJournal:
+    """
+    Persistent record of how far each download job got.
+
+    One row per (kind, url, output_dir) holds the furthest phase reached, the
+    resolved info dict, the downloaded file and the outputs; the same URL
+    saved to another folder is a separate job. After a crash a rerun can
+    reuse the resolved info instead of extracting again, let yt-dlp continue
+    the '.part' file, and skip phases whose results are still on disk.
+
+    Safe to use from several threads.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self.lock, self.db:
+            # WAL keeps readers and the writer from blocking each other
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    kind TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    output_dir TEXT NOT NULL DEFAULT '',
+                    phase TEXT,
+                    label TEXT,
+                    info TEXT,
+                    resolved_at REAL,
+                    filename TEXT,
+                    outputs TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL,
+                    PRIMARY KEY (kind, url, output_dir)
+                )
+            ''')
+
+    def get(self, url, kind='audio', output_dir=''):
+        """
+        Return the journal entry for a job, or None if it was never started.
+
+        output_dir is the folder the job saves to, as passed to every other method.
+
+        Returns:
+            dict: phase, label, info (dict or None), resolved_at, filename,
+                  outputs (list), error, attempts, updated_at
+        """
+        with self.lock:
+            row = self.db.execute(
+                'SELECT * FROM jobs WHERE kind = ? AND url = ? AND output_dir = ?',
+                (kind, url, _folder(output_dir))).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry['info'] = json.loads(entry['info']) if entry['info'] else None
+        entry['outputs'] = json.loads(entry['outputs']) if entry['outputs'] else []
+        return entry
+
+    def record(self, url, phase, kind='audio', output_dir='', **fields):
+        """
+        Store that a job reached phase, plus any of: label, info, filename, outputs.
+
+        Recording RESOLVED with an info dict also stamps the resolve time.
+        Recording any phase clears the last error.
+        """
+        if phase not in PHASES:
+            raise ValueError(f"Unknown phase '{phase}', expected one of {', '.join(PHASES)}")
+        values = {'phase': phase, 'error': None, 'updated_at': time.time()}
+        if 'label' in fields:
+            values['label'] = fields['label']
+        if 'info' in fields:
+            values['info'] = json.dumps(fields['info'])
+            values['resolved_at'] = time.time()
+        if 'filename' in fields:
+            values['filename'] = fields['filename']
+        if 'outputs' in fields:
+            values['outputs'] = json.dumps(list(fields['outputs']))
+        self._upsert(kind, url, output_dir, values)
+
+    def record_failure(self, url, error, kind='audio', output_dir=''):
+        """Keep the phase reached so far and remember why the job stopped"""
+        key = (kind, url, _folder(output_dir))
+        with self.lock, self.db:
+            self.db.execute('INSERT OR IGNORE INTO jobs (kind, url, output_dir) VALUES (?, ?, ?)', key)
+            self.db.execute(
+                'UPDATE jobs SET error = ?, attempts = attempts + 1, updated_at = ? '
+                'WHERE kind = ? AND url = ? AND output_dir = ?',
+                (str(error), time.time(), *key))
+
+    def _upsert(self, kind, url, output_dir, values):
+        columns = ', '.join(f"{name} = ?" for name in values)
+        key = (kind, url, _folder(output_dir))
+        with self.lock, self.db:
+            self.db.execute('INSERT OR IGNORE INTO jobs (kind, url, output_dir) VALUES (?, ?, ?)', key)
+            self.db.execute(
+                f'UPDATE jobs SET {columns} WHERE kind = ? AND url = ? AND output_dir = ?',
+                (*values.values(), *key))
+
+    def drop_resolved(self, url, kind='audio', output_dir=''):
+        """Forget the stored info dict, e.g. after its stream URLs were refused"""
+        with self.lock, self.db:
+            self.db.execute(
+                'UPDATE jobs SET info = NULL, resolved_at = NULL WHERE kind = ? AND url = ? AND output_dir = ?',
+                (kind, url, _folder(output_dir)))
+
+    def reached(self, url, phase, kind='audio', output_dir=''):
+        """True if the job got at least as far as phase"""
+        entry = self.get(url, kind, output_dir)
+        if entry is None or entry['phase'] is None:
+            return False
+        return PHASES.index(entry['phase']) >= PHASES.index(phase)
+
+    def resolved_info(self, url, kind='audio', output_dir=''):
+        """
+        The stored info dict if its stream URLs are still usable, else None.
+
+        Uses the 'expire' parameter of the format URLs when present (YouTube),
+        otherwise RESOLVED_INFO_TTL from the resolve time.
+        """
+        entry = self.get(url, kind, output_dir)
+        if entry is None or not entry['info']:
+            return None
+        expiry = _stream_expiry(entry['info'])
+        if expiry is None:
+            expiry = (entry['resolved_at'] or 0) + RESOLVED_INFO_TTL
+        if time.time() > expiry - EXPIRY_MARGIN:
+            return None
+        return entry['info']
+
+    def completed_outputs(self, url, phase, kind='audio', output_dir=''):
+        """
+        Outputs of a job that reached phase, if all of them are still on disk.
+
+        Returns:
+            list: Output paths, or None if the phase must be run (again)
+        """
+        entry = self.get(url, kind, output_dir)
+        if entry is None or not self.reached(url, phase, kind, output_dir):
+            return None
+        # Up to DOWNLOADED the result is the downloaded file, later phases produce outputs
+        if PHASES.index(phase) <= PHASES.index(DOWNLOADED):
+            paths = [entry['filename']]
+        else:
+            paths = entry['outputs']
+        if not paths or not all(p and os.path.exists(p) for p in paths):
+            return None
+        return paths
+
+    def unfinished(self, final_phase=ENCODED, kind='audio', output_dir=''):
+        """URLs of jobs saving to output_dir that stopped before final_phase, oldest first"""
+        done = PHASES[PHASES.index(final_phase):]
+        placeholders = ', '.join('?' for _ in done)
+        with self.lock:
+            rows = self.db.execute(
+                f'SELECT url FROM jobs WHERE kind = ? AND output_dir = ? '
+                f'AND (phase IS NULL OR phase NOT IN ({placeholders})) '
+                'ORDER BY updated_at', (kind, _folder(output_dir), *done)).fetchall()
+        return [row['url'] for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
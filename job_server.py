@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import uuid
+import argparse
+import threading
+import concurrent.futures
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from ydl_session import YdlSessionPool
+from download_job import build_ydl_options, download_url
+from progress_relay import summarize_ytdl_progress
+from bandwidth import BandwidthManager, PRIORITY_WEIGHTS, parse_rate
+
+# Job types accepted by POST /jobs
+JOB_TYPES = ('download', 'denoise', 'download_denoise')
+
+# Numeric job fields and their types, converted when a job is submitted
+NUMERIC_PARAMS = {'noise_duration': float, 'chunk_duration': float, 'connections': int, 'weight': float}
+
+# Job states
+QUEUED = 'queued'
+DOWNLOADING = 'downloading'
+PROCESSING = 'processing'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+def run_denoise(input_file, output_file=None, noise_duration=2.0, chunk_duration=30.0):
+    """Process pool entry point: import de_noise in the worker and denoise one file"""
+    from de_noise import reduce_noise
+    return reduce_noise(input_file, output_file, noise_duration, chunk_duration)
+
+
+class Job:
+    """One download and/or denoise request and its current state"""
+
+    def __init__(self, job_type, params):
+        self.id = uuid.uuid4().hex[:12]
+        self.type = job_type
+        self.params = params
+        self.state = QUEUED
+        self.progress = 0.0
+        self.speed = None
+        self.result = {}
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.cancel_event = threading.Event()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.type,
+            'params': self.params,
+            'state': self.state,
+            'progress': self.progress,
+            'speed': self.speed,
+            'result': self.result,
+            'error': self.error,
+            'created': self.created,
+            'finished': self.finished,
+        }
+
+
+class JobServer:
+    """
+    Run download and denoise jobs on separate worker pools.
+
+    Downloads are network-bound and run on a thread pool that shares pooled
+    yt-dlp sessions; denoising is CPU-bound and runs on a process pool using
+    the same reduce_noise code as the GUI apps.
+    """
+
+    def __init__(self, download_dir, download_workers=4, process_workers=None, proxy=None,
+                 total_rate=None):
+        self.download_dir = download_dir
+        self.proxy = proxy
+        # Shares total_rate between running downloads; None means unlimited
+        self.bandwidth = BandwidthManager(total_rate) if total_rate else None
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.sessions = YdlSessionPool(max_per_profile=download_workers)
+        self.download_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=download_workers, thread_name_prefix='download')
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self.process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.process_workers)
+
+    def submit(self, job_type, params):
+        """
+        Create a job and queue it; returns the Job.
+
+        Raises:
+            ValueError: If the job type or a parameter is invalid (nothing is queued then)
+        """
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type '{job_type}', expected one of {', '.join(JOB_TYPES)}")
+        if job_type == 'denoise':
+            if not params.get('file') or not os.path.exists(params['file']):
+                raise ValueError("A 'denoise' job needs an existing 'file'")
+        elif not params.get('url'):
+            raise ValueError(f"A '{job_type}' job needs a 'url'")
+        if (params.get('priority') or 'normal') not in PRIORITY_WEIGHTS:
+            raise ValueError(f"Unknown priority '{params['priority']}', expected one of {', '.join(PRIORITY_WEIGHTS)}")
+        for name, convert in NUMERIC_PARAMS.items():
+            if params.get(name) is None:
+                continue
+            try:
+                params[name] = convert(params[name])
+            except (TypeError, ValueError):
+                raise ValueError(f"'{name}' must be a number, got {params[name]!r}")
+            if params[name] <= 0:
+                raise ValueError(f"'{name}' must be positive, got {params[name]!r}")
+
+        job = Job(job_type, params)
+        with self.lock:
+            self.jobs[job.id] = job
+
+        if job_type == 'denoise':
+            self._start_denoise(job, params['file'])
+        else:
+            self.download_pool.submit(self._run_download, job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def cancel(self, job_id):
+        """
+        Cancel a job; downloads stop at the next progress update.
+
+        A denoise that already runs in a worker process can't be interrupted:
+        it finishes and the job still ends as done. Only queued jobs and the
+        denoise step of a download_denoise job that is still downloading are skipped.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_event.set()
+        if job.state == QUEUED:
+            self._finish(job, CANCELLED)
+        return job
+
+    def _finish(self, job, state, error=None):
+        job.state = state
+        job.error = error
+        job.finished = time.time()
+
+    def _run_download(self, job):
+        if job.cancel_event.is_set():
+            return
+        job.state = DOWNLOADING
+        params = job.params
+        media = params.get('media', 'audio')
+
+        share = None
+        if self.bandwidth is not None:
+            # Audio-only jobs are small; let them finish first unless told otherwise
+            priority = params.get('priority') or ('high' if media == 'audio' else 'normal')
+            weight = params.get('weight')
+            share = self.bandwidth.register(job.id, priority, weight)
+
+        def progress_hook(d):
+            if job.cancel_event.is_set():
+                from yt_dlp.utils import DownloadCancelled
+                raise DownloadCancelled("Job cancelled")
+            if share is not None:
+                share.progress_hook(d)
+            summary = summarize_ytdl_progress(d)
+            if summary['percentage'] is not None:
+                job.progress = round(summary['percentage'], 1)
+            job.speed = summary['speed']
+
+        log = lambda message: print(f"[{job.id}] {message}")
+        try:
+            ydl_opts = build_ydl_options(
+                params.get('download_dir') or self.download_dir,
+                media=media,
+                proxy=params.get('proxy', self.proxy),
+                bandwidth_saver=bool(params.get('bandwidth_saver')),
+                connections=params.get('connections') or 1,
+                use_aria2c=share is None,
+                log=log
+            )
+            filename, info = download_url(params['url'], ydl_opts, self.sessions, progress_hook, log=log)
+            job.result['file'] = filename
+            job.result['title'] = info.get('title')
+        except Exception as e:
+            if job.cancel_event.is_set():
+                self._finish(job, CANCELLED)
+            else:
+                self._finish(job, FAILED, str(e))
+            return
+        finally:
+            if share is not None:
+                share.release()
+
+        if job.type == 'download_denoise':
+            self._start_denoise(job, filename)
+        else:
+            job.progress = 100.0
+            self._finish(job, DONE)
+
+    def _start_denoise(self, job, input_file):
+        if job.cancel_event.is_set():
+            self._finish(job, CANCELLED)
+            return
+        args = (run_denoise, input_file, job.params.get('output_file'),
+                job.params.get('noise_duration') or 2.0, job.params.get('chunk_duration') or 30.0)
+        try:
+            pool = self.process_pool
+            try:
+                future = pool.submit(*args)
+            except concurrent.futures.BrokenExecutor:
+                # A worker died since the last job; retry once on a new pool
+                pool = self._replace_process_pool(pool)
+                future = pool.submit(*args)
+        except Exception as e:
+            self._finish(job, FAILED, f"Could not start denoising: {e}")
+            return
+        job.state = PROCESSING
+        future.add_done_callback(lambda f: self._denoise_done(job, f, pool))
+
+    def _denoise_done(self, job, future, pool):
+        try:
+            job.result['denoised_file'] = future.result()
+            job.progress = 100.0
+            self._finish(job, DONE)
+        except concurrent.futures.BrokenExecutor:
+            # The worker was killed (e.g. out of memory); later jobs get a new pool
+            self._finish(job, FAILED, "The denoise worker process died")
+            self._replace_process_pool(pool)
+        except Exception as e:
+            self._finish(job, FAILED, str(e))
+
+    def _replace_process_pool(self, broken):
+        """Swap in a new process pool unless another thread already replaced broken"""
+        with self.lock:
+            if self.process_pool is broken:
+                print("A denoise worker died, restarting the process pool")
+                broken.shutdown(wait=False)
+                self.process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.process_workers)
+            return self.process_pool
+
+    def shutdown(self):
+        self.download_pool.shutdown(wait=False, cancel_futures=True)
+        self.process_pool.shutdown(wait=False, cancel_futures=True)
+        self.sessions.close_all()
+
+
+def make_handler(server):
+    """Build the HTTP request handler bound to a JobServer"""
+
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, data):
+            body = json.dumps(data, indent=2).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _job_id(self):
+            parts = self.path.rstrip('/').split('/')
+            return parts[2] if len(parts) == 3 and parts[1] == 'jobs' else None
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/jobs':
+                self._send_json(200, [job.to_dict() for job in server.list()])
+                return
+            job_id = self._job_id()
+            job = server.get(job_id) if job_id else None
+            if job is None:
+                self._send_json(404, {'error': 'Job not found'})
+                return
+            self._send_json(200, job.to_dict())
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/jobs':
+                self._send_json(404, {'error': 'Not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(payload, dict):
+                    raise ValueError('Request body must be a JSON object')
+                job_type = payload.pop('type', 'download')
+                job = server.submit(job_type, payload)
+            except (ValueError, TypeError) as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            self._send_json(201, job.to_dict())
+
+        def do_DELETE(self):
+            job_id = self._job_id()
+            job = server.cancel(job_id) if job_id else None
+            if job is None:
+                self._send_json(404, {'error': 'Job not found'})
+                return
+            self._send_json(200, job.to_dict())
+
+        def log_message(self, format, *args):
+            # Keep the console for job output
+            pass
+
+    return JobRequestHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Headless download/denoise job server with a local HTTP API',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "API:\n"
+            "  POST   /jobs        {\"type\": \"download\"|\"denoise\"|\"download_denoise\", \"url\": ..., \"file\": ...}\n"
+            "  GET    /jobs        list all jobs\n"
+            "  GET    /jobs/<id>   job status, progress and result\n"
+            "  DELETE /jobs/<id>   cancel a job (a denoise already running is finished)\n"
+            "\n"
+            "Optional job fields: media (audio|video|video_audio), bandwidth_saver, connections,\n"
+            "proxy, download_dir, output_file, noise_duration, chunk_duration,\n"
+            "priority (high|normal|low) and weight when --total-rate is set"
+        )
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on, default 127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on, default 8765')
+    parser.add_argument('--download-dir', default=os.path.expanduser('~/Downloads'),
+                        help='Default download directory')
+    parser.add_argument('--download-workers', type=int, default=4,
+                        help='Concurrent downloads, default 4')
+    parser.add_argument('--process-workers', type=int, default=os.cpu_count() or 1,
+                        help='Concurrent denoise processes, default: number of CPUs')
+    parser.add_argument('--proxy', default=None, help='Proxy URL for downloads')
+    parser.add_argument('--total-rate', type=parse_rate, default=None,
+                        help='Total download rate shared by all jobs by priority, e.g. 5M (bytes/s)')
+    args = parser.parse_args()
+
+    os.makedirs(args.download_dir, exist_ok=True)
+    server = JobServer(args.download_dir, args.download_workers, args.process_workers, args.proxy,
+                       args.total_rate)
+    httpd = ThreadingHTTPServer((args.host, args.port), make_handler(server))
+
+    print("=== Headless Download/Denoise Job Server ===")
+    print(f"Listening on http://{args.host}:{args.port}")
+    print(f"Download workers: {args.download_workers}, process workers: {args.process_workers}")
+    if args.total_rate:
+        print(f"Total download rate: {args.total_rate / 1024:.0f} KB/s, shared by priority")
+    print("Press Ctrl+C to stop.")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        httpd.server_close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import signal
+import argparse
+import threading
+import subprocess
+import numpy as np
+
+from de_noise import BlockDenoiser, load_noise_profile, save_noise_profile
+from ffmpeg_tools import audio_encoder_for
+
+# Sample rate used for capture and denoising (speech)
+DEFAULT_SAMPLE_RATE = 24000
+
+# Seconds of audio read from the decoder per step
+READ_SECONDS = 0.1
+
+
+def resolve_live_source(url, proxy=None):
+    """
+    Turn a live page URL into something ffmpeg can read.
+
+    Local files and URLs yt-dlp doesn't recognise are returned unchanged, so
+    a local stand-in (a file read with --realtime, or ffmpeg serving a file)
+    works without network access.
+
+    Returns:
+        tuple: (media URL or path, HTTP header lines for ffmpeg, title)
+    """
+    if os.path.exists(url):
+        return url, '', os.path.splitext(os.path.basename(url))[0]
+
+    import yt_dlp
+
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'nocheckcertificate': True,
+        # Audio is all we keep; HLS audio-only variants save bandwidth
+        'format': 'bestaudio/best',
+    }
+    if proxy is not None:
+        ydl_opts['proxy'] = proxy
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+    except yt_dlp.utils.DownloadError as e:
+        if 'unsupported url' in str(e).lower():
+            return url, '', 'live'
+        raise
+    if not info.get('is_live'):
+        print("Note: this URL is not live; it will be captured like a stream anyway")
+    headers = ''.join(f"{k}: {v}\r\n" for k, v in (info.get('http_headers') or {}).items())
+    return info['url'], headers, info.get('title') or info.get('id') or 'live'
+
+
+def capture_live(source, output_pattern, sample_rate=DEFAULT_SAMPLE_RATE, block_duration=1.0,
+                 context_duration=0.25, segment_time=300, noise_seconds=2.0, noise_profile=None,
+                 save_profile=None, realtime=False, headers='', max_duration=None):
+    """
+    Capture a live stream, denoise it block by block and write rolling segments.
+
+    Args:
+        source (str): Stream URL or file readable by ffmpeg
+        output_pattern (str): Segment path with a counter, e.g. 'talk_%04d.m4a'
+        sample_rate (int): Capture sample rate (mono)
+        block_duration (float): Seconds per denoise block
+        context_duration (float): Extra seconds denoised on each side of a block
+        segment_time (float): Seconds per output segment
+        noise_seconds (float): Learn the noise profile from the first N seconds
+        noise_profile (str): Use this profile (.npz or noise-only audio) instead
+        save_profile (str): Save the learnt noise profile here (.npz)
+        realtime (bool): Read the input at its native rate (for files standing in for a stream)
+        headers (str): HTTP header lines for ffmpeg
+        max_duration (float): Stop after this many seconds of audio
+
+    Returns:
+        BlockDenoiser: The denoiser, with its processing statistics
+    """
+    decode_cmd = ['ffmpeg', '-v', 'error', '-nostdin']
+    if realtime:
+        decode_cmd += ['-re']
+    if headers:
+        decode_cmd += ['-headers', headers]
+    decode_cmd += ['-i', source, '-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 'f32le', 'pipe:1']
+
+    encode_cmd = [
+        'ffmpeg', '-y', '-v', 'error', '-nostdin',
+        '-f', 'f32le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+        *audio_encoder_for(output_pattern),
+        '-f', 'segment', '-segment_time', str(segment_time), '-reset_timestamps', '1',
+        output_pattern
+    ]
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_pattern)), exist_ok=True)
+    # Own sessions keep Ctrl+C (sent to the terminal's process group) away from the
+    # ffmpeg children; only our handler reacts, and it stops them in order
+    decoder = subprocess.Popen(decode_cmd, stdout=subprocess.PIPE, start_new_session=True)
+    encoder = subprocess.Popen(encode_cmd, stdin=subprocess.PIPE, start_new_session=True)
+
+    denoiser = None
+    if noise_profile:
+        denoiser = BlockDenoiser(sample_rate, load_noise_profile(noise_profile, sample_rate),
+                                 block_duration, context_duration)
+        print(f"Using noise profile: {noise_profile}")
+    read_size = 4 * int(sample_rate * READ_SECONDS)
+    warmup = []
+    warmup_samples = 0
+    captured = 0
+    leftover = b''
+    last_report = time.time()
+
+    # Ctrl+C ends the capture cleanly: the decoder is stopped (so a stalled read
+    # returns), the rest is flushed and closing the encoder's input ends the last segment
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(True)
+        decoder.terminate()
+
+    previous_handler = None
+    if threading.current_thread() is threading.main_thread():
+        previous_handler = signal.signal(signal.SIGINT, stop)
+    try:
+        while not stopping:
+            data = decoder.stdout.read1(read_size)
+            if not data:
+                break
+            data = leftover + data
+            usable = len(data) - len(data) % 4
+            leftover = data[usable:]
+            samples = np.frombuffer(data[:usable], dtype=np.float32)
+            captured += len(samples)
+
+            if denoiser is None:
+                # Hold the first noise_seconds back to learn the noise profile from them
+                warmup.append(samples)
+                warmup_samples += len(samples)
+                if warmup_samples < noise_seconds * sample_rate:
+                    continue
+                noise = np.concatenate(warmup)
+                if save_profile:
+                    save_noise_profile(save_profile, noise, sample_rate)
+                    print(f"Noise profile saved to: {save_profile}")
+                denoiser = BlockDenoiser(sample_rate, noise, block_duration, context_duration)
+                print(f"Noise profile learnt from the first {warmup_samples / sample_rate:.1f} seconds")
+                samples = noise
+                warmup = []
+
+            encoder.stdin.write(denoiser.process(samples).tobytes())
+
+            if time.time() - last_report >= 10:
+                last_report = time.time()
+                print(f"Captured {captured / sample_rate:.0f} s, real-time factor "
+                      f"{denoiser.realtime_factor:.2f}, latency {denoiser.latency:.2f} s")
+                if denoiser.realtime_factor >= 1:
+                    print("Warning: denoising is slower than real time; try a larger --block")
+
+            if max_duration is not None and captured >= max_duration * sample_rate:
+                break
+
+        if denoiser is None and warmup:
+            # Stream ended before the noise profile was complete; use what there is
+            denoiser = BlockDenoiser(sample_rate, np.concatenate(warmup), block_duration, context_duration)
+            encoder.stdin.write(denoiser.process(np.concatenate(warmup)).tobytes())
+        if denoiser is not None:
+            encoder.stdin.write(denoiser.flush().tobytes())
+    except BrokenPipeError:
+        print("ERROR: the segment encoder stopped unexpectedly")
+    finally:
+        if previous_handler is not None:
+            signal.signal(signal.SIGINT, previous_handler)
+        decoder.terminate()
+        decoder.wait()
+        try:
+            encoder.stdin.close()
+        except BrokenPipeError:
+            pass
+        encoder.wait()
+
+    if decoder.returncode not in (0, -signal.SIGTERM) and not captured:
+        raise RuntimeError(f"Could not read the stream: {source}")
+    if encoder.returncode != 0:
+        raise RuntimeError("ffmpeg failed to write the segments")
+    print(f"Capture finished: {captured / sample_rate:.1f} seconds")
+    if denoiser is not None:
+        print(f"Real-time factor: {denoiser.realtime_factor:.2f} (below 1 keeps up with the stream)")
+    return denoiser
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Capture a live stream, denoise it in real time and write rolling segments',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Examples:\n"
+            "  python live_capture.py 'https://www.youtube.com/watch?v=LIVE_ID'\n"
+            "  # Local stand-in: read a recording at real-time rate\n"
+            "  python live_capture.py talk.m4a --realtime -o ~/Downloads/talk_live_%%04d.m4a"
+        )
+    )
+    parser.add_argument('source', help='Live page URL, stream URL or file')
+    parser.add_argument('-o', '--output', default=None,
+                        help="Segment path pattern, default '~/Downloads/<title>_live_%%04d.m4a'")
+    parser.add_argument('--segment', type=float, default=300, help='Seconds per segment, default 300')
+    parser.add_argument('--block', type=float, default=1.0, help='Seconds per denoise block, default 1.0')
+    parser.add_argument('--context', type=float, default=0.25,
+                        help='Seconds of context on each side of a block, default 0.25')
+    parser.add_argument('--rate', type=int, default=DEFAULT_SAMPLE_RATE,
+                        help=f'Capture sample rate, default {DEFAULT_SAMPLE_RATE}')
+    parser.add_argument('-d', '--noise-seconds', type=float, default=2.0,
+                        help='Learn the noise profile from the first N seconds, default 2')
+    parser.add_argument('--noise-profile', default=None,
+                        help='Noise profile (.npz) or noise-only audio file to use instead')
+    parser.add_argument('--save-noise-profile', default=None, help='Save the learnt noise profile (.npz)')
+    parser.add_argument('--realtime', action='store_true',
+                        help='Read the input at its native rate (a file standing in for a live stream)')
+    parser.add_argument('--max-duration', type=float, default=None, help='Stop after this many seconds')
+    parser.add_argument('--proxy', default=None, help='Proxy URL for resolving the stream')
+    args = parser.parse_args()
+
+    print("=== Live Capture with Real-Time Noise Reduction ===")
+    source, headers, title = resolve_live_source(args.source, args.proxy)
+    output = args.output or os.path.join(
+        os.path.expanduser('~/Downloads'), f"{title.replace('/', '_')}_live_%04d.m4a")
+    output = os.path.expanduser(output)
+    print(f"Writing {args.segment:.0f}-second segments to: {output}")
+    print(f"Denoise block {args.block} s + context {args.context} s "
+          f"(latency about {args.block + args.context:.2f} s). Press Ctrl+C to stop.")
+
+    try:
+        capture_live(
+            source, output, args.rate, args.block, args.context, args.segment,
+            args.noise_seconds, args.noise_profile, args.save_noise_profile,
+            args.realtime, headers, args.max_duration
+        )
+    except RuntimeError as e:
+        print(f"ERROR: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
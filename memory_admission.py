@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+import os
+import threading
+
+from ffmpeg_tools import is_video_file
+
+# Processing modes, from most to least memory hungry
+FULL = 'full'            # reduce_noise: whole file decoded, plus an output array
+VIDEO = 'video'          # reduce_noise_video: whole audio track as one PCM buffer
+STREAMING = 'streaming'  # reduce_noise_streaming: one chunk at a time
+
+# Memory of a worker with numpy, librosa and noisereduce imported
+PROCESS_OVERHEAD_BYTES = 400 * 1024 * 1024
+
+# noisereduce working set per sample of the chunk being denoised (STFTs,
+# masks and their smoothed copies, float32/complex64)
+CHUNK_BYTES_PER_SAMPLE = 64
+
+# reduce_noise converts M4A to 44.1 kHz mono WAV before loading
+M4A_SAMPLE_RATE = 44100
+
+# Default budget: this share of the memory available when the batch starts
+BUDGET_SHARE = 0.75
+
+# Jobs estimated above this share of the budget run in streaming mode, so one
+# huge file can't keep every other job waiting
+DOWNGRADE_SHARE = 0.5
+
+# Budget used when the available memory can't be read
+FALLBACK_BUDGET_BYTES = 4 * 1024 * 1024 * 1024
+
+
+def available_memory():
+    """Bytes of memory available for new work, or None if unknown"""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        # No /proc (macOS): assume half the physical memory is free
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // 2
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_budget():
+    """Memory budget (bytes) for a batch started now"""
+    available = available_memory()
+    return int(available * BUDGET_SHARE) if available else FALLBACK_BUDGET_BYTES
+
+
+def estimate_peak_bytes(input_file, probe, mode=None, chunk_duration=30.0):
+    """
+    Estimate a denoise job's peak memory.
+
+    Args:
+        input_file (str): File to denoise (the extension picks the loading path)
+        probe (dict): duration, sample_rate and optionally channels
+                      (batch_schedule.probe_duration or ffmpeg_tools.probe_media)
+        mode (str): FULL, VIDEO or STREAMING; default is what reduce_noise would use
+        chunk_duration (float): Seconds per denoised chunk
+
+    Returns:
+        int: Estimated peak bytes of the worker process
+    """
+    if mode is None:
+        mode = VIDEO if is_video_file(input_file) else FULL
+    sample_rate = probe.get('sample_rate') or M4A_SAMPLE_RATE
+    channels = probe.get('channels') or 2
+    if mode == FULL and input_file.lower().endswith('.m4a'):
+        sample_rate, channels = M4A_SAMPLE_RATE, 1
+    samples = int((probe.get('duration') or 0) * sample_rate)
+    chunk_samples = min(samples, int(chunk_duration * sample_rate))
+    working_set = chunk_samples * CHUNK_BYTES_PER_SAMPLE
+
+    if mode == FULL:
+        # Decoded channels, the mono mix and the same-size output array (float32)
+        held = samples * 4 * (channels + 2)
+    elif mode == VIDEO:
+        # The PCM read from the ffmpeg pipe, viewed (not copied) as float32
+        held = samples * 4
+    else:
+        # One chunk read from the decoder and its denoised copy
+        held = chunk_samples * 4 * 2
+    return PROCESS_OVERHEAD_BYTES + held + working_set
+
+
+class MemoryAdmission:
+    """
+    Admit denoise jobs only while their estimated peaks fit in a memory budget.
+
+    plan() picks a job's mode: jobs estimated above DOWNGRADE_SHARE of the
+    budget are switched to streaming mode, whose memory use doesn't depend on
+    the file's length. Callers then start a job once try_admit() accepts its
+    estimate and call release() when it ends. A job is always admitted when
+    nothing else is running, so the batch can't stall on an estimate that is
+    larger than the budget.
+
+    Safe to use from several threads.
+
+    Args:
+        budget_bytes (int): Total memory the running jobs may use, default from default_budget()
+        downgrade_share (float): Share of the budget above which jobs stream
+        log: Function used for status messages
+    """
+
+    def __init__(self, budget_bytes=None, downgrade_share=DOWNGRADE_SHARE, log=print):
+        self.budget = budget_bytes or default_budget()
+        self.downgrade_share = downgrade_share
+        self.log = log
+        self.used = 0
+        self.running = 0
+        self.condition = threading.Condition()
+
+    def plan(self, input_file, probe, chunk_duration=30.0):
+        """
+        Choose how to run a job.
+
+        Returns:
+            tuple: (mode, estimated peak bytes)
+        """
+        mode = VIDEO if is_video_file(input_file) else FULL
+        estimate = estimate_peak_bytes(input_file, probe, mode, chunk_duration)
+        if estimate > self.budget * self.downgrade_share:
+            streaming = estimate_peak_bytes(input_file, probe, STREAMING, chunk_duration)
+            self.log(f"{os.path.basename(input_file)} needs about {estimate / 2**20:.0f} MB loaded whole; "
+                     f"processing it in streaming mode (about {streaming / 2**20:.0f} MB)")
+            return STREAMING, streaming
+        return mode, estimate
+
+    def try_admit(self, estimate):
+        """Reserve estimate bytes if they fit (or nothing is running); returns True if admitted"""
+        with self.condition:
+            if self.running and self.used + estimate > self.budget:
+                return False
+            self.used += estimate
+            self.running += 1
+            return True
+
+    def admit(self, estimate, timeout=None):
+        """Block until estimate bytes can be reserved; returns False on timeout"""
+        with self.condition:
+            admitted = self.condition.wait_for(
+                lambda: not self.running or self.used + estimate <= self.budget, timeout)
+            if admitted:
+                self.used += estimate
+                self.running += 1
+            return admitted
+
+    def release(self, estimate):
+        """Return the memory reserved for a job that ended"""
+        with self.condition:
+            self.used = max(0, self.used - estimate)
+            self.running = max(0, self.running - 1)
+            self.condition.notify_all()
+
+    def describe(self):
+        return f"{self.used / 2**20:.0f}/{self.budget / 2**20:.0f} MB reserved by {self.running} jobs"
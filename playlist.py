@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+import re
+import queue
+import threading
+
+# URL patterns that point at a collection of videos rather than a single one
+COLLECTION_PATTERNS = [
+    r'[?&]list=',
+    r'/playlist\b',
+    r'/channel/',
+    r'/c/',
+    r'/user/',
+    r'/@[^/]+',
+]
+
+# Marks the end of the entries in a job queue
+END_OF_ENTRIES = None
+
+
+def is_collection_url(url):
+    """Check whether a URL looks like a playlist or channel"""
+    if 'watch?v=' in url and 'list=' not in url:
+        return False
+    return any(re.search(pattern, url) for pattern in COLLECTION_PATTERNS)
+
+
+def _entry_url(entry):
+    url = entry.get('url') or entry.get('webpage_url')
+    if url and url.startswith('http'):
+        return url
+    if entry.get('id'):
+        return f"https://www.youtube.com/watch?v={entry['id']}"
+    return url
+
+
+def _matches_filters(entry, date_after=None, date_before=None, min_duration=None, max_duration=None):
+    """
+    Apply date and duration filters to a flat entry.
+
+    Flat entries don't always carry upload_date or duration; unknown values
+    pass the filter so nothing is dropped without evidence.
+    """
+    upload_date = entry.get('upload_date')
+    if upload_date:
+        if date_after and upload_date < date_after:
+            return False
+        if date_before and upload_date > date_before:
+            return False
+
+    duration = entry.get('duration')
+    if duration is not None:
+        if min_duration is not None and duration < min_duration:
+            return False
+        if max_duration is not None and duration > max_duration:
+            return False
+    return True
+
+
+def parse_playlist_items(spec):
+    """
+    Parse an index selection such as '1-20,25,40-' into a predicate.
+
+    Returns:
+        tuple: (function index -> bool, highest selected index or None if unbounded)
+    """
+    ranges = []
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            ranges.append((int(start) if start else 1, int(end) if end else None))
+        else:
+            ranges.append((int(part), int(part)))
+
+    if not ranges:
+        return (lambda index: True), None
+
+    def selected(index):
+        return any(start <= index and (end is None or index <= end) for start, end in ranges)
+
+    ends = [end for _, end in ranges]
+    last = None if None in ends else max(ends)
+    return selected, last
+
+
+def enumerate_entries(url, ydl_opts=None, playlist_items=None, date_after=None,
+                      date_before=None, min_duration=None, max_duration=None):
+    """
+    List the videos of a playlist or channel without resolving each one.
+
+    The playlist is extracted without processing, so only the listing pages
+    are fetched and entries are yielded as the pages arrive. A channel's tabs
+    are flattened into one list, so indices and the selection run across tabs.
+
+    Args:
+        url (str): Playlist or channel URL
+        ydl_opts (dict): Base yt-dlp options (proxy, timeouts, ...)
+        playlist_items (str): Index selection, e.g. '1-20,25'
+        date_after (str): Keep entries uploaded on or after YYYYMMDD
+        date_before (str): Keep entries uploaded on or before YYYYMMDD
+        min_duration (float): Minimum duration in seconds
+        max_duration (float): Maximum duration in seconds
+
+    Yields:
+        dict: index, url, id, title, duration, upload_date
+    """
+    import yt_dlp
+
+    opts = dict(ydl_opts or {})
+    opts.update({
+        'extract_flat': 'in_playlist',
+        'skip_download': True,
+        'quiet': True,
+        'no_warnings': True,
+        # Hooks and postprocessors belong to the real downloads
+        'progress_hooks': [],
+        'postprocessors': [],
+    })
+    opts.pop('format', None)
+
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        yield from _select_entries(_flat_entries(ydl, url), playlist_items, date_after,
+                                   date_before, min_duration, max_duration)
+
+
+def _flat_entries(ydl, url, visited=None):
+    """
+    Yield the video entries of a playlist or channel as one flat sequence.
+
+    Channel pages list their tabs (Videos, Shorts, ...) as nested playlists;
+    their entries are yielded in place, so indices count across all tabs.
+    """
+    visited = visited if visited is not None else set()
+    visited.add(url)
+    info = ydl.extract_info(url, download=False, process=False)
+    if info.get('_type') not in ('playlist', 'multi_video'):
+        # A single video: nothing to enumerate
+        yield info
+        return
+    yield from _flatten(ydl, info.get('entries') or [], visited)
+
+
+def _flatten(ydl, entries, visited):
+    """Yield videos from entries, descending into nested playlists"""
+    for entry in entries:
+        if not entry:
+            continue
+        if entry.get('ie_key') == 'YoutubeTab' or entry.get('_type') == 'playlist':
+            if entry.get('entries') is not None:
+                # A tab yt-dlp already listed; its webpage_url may be the channel itself
+                yield from _flatten(ydl, entry['entries'], visited)
+                continue
+            # Only a reference to a tab: list it now
+            nested_url = entry.get('url') or entry.get('webpage_url')
+            if nested_url and nested_url not in visited:
+                yield from _flat_entries(ydl, nested_url, visited)
+            continue
+        yield entry
+
+
+def _select_entries(entries, playlist_items=None, date_after=None, date_before=None,
+                    min_duration=None, max_duration=None):
+    """Number flat entries from 1 and apply the index selection and filters"""
+    selected, last_index = parse_playlist_items(playlist_items)
+    for index, entry in enumerate(entries, 1):
+        if last_index is not None and index > last_index:
+            # Stop before the next listing page is fetched
+            break
+        if not selected(index):
+            continue
+        if not _matches_filters(entry, date_after, date_before, min_duration, max_duration):
+            continue
+        yield {
+            'index': index,
+            'url': _entry_url(entry),
+            'id': entry.get('id'),
+            'title': entry.get('title') or entry.get('id') or 'Unknown',
+            'duration': entry.get('duration'),
+            'upload_date': entry.get('upload_date'),
+        }
+
+
+def start_entry_producer(entries, maxsize=20, stop_event=None):
+    """
+    Feed entries into a bounded queue from a background thread.
+
+    The producer blocks while the queue is full, so enumeration never runs
+    far ahead of processing. END_OF_ENTRIES is put on the queue when the
+    entries are exhausted (or enumeration fails).
+
+    Args:
+        entries: Iterable of entries, e.g. from enumerate_entries()
+        maxsize (int): Maximum number of queued entries
+        stop_event (threading.Event): Set to stop producing early
+
+    Returns:
+        tuple: (queue.Queue, producer thread)
+    """
+    job_queue = queue.Queue(maxsize=max(1, maxsize))
+    stop_event = stop_event or threading.Event()
+
+    def produce():
+        try:
+            for entry in entries:
+                while not stop_event.is_set():
+                    try:
+                        job_queue.put(entry, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                if stop_event.is_set():
+                    break
+        except Exception as e:
+            print(f"Error enumerating entries: {str(e)}")
+        finally:
+            job_queue.put(END_OF_ENTRIES)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    return job_queue, thread
+
+
+def iter_queue(job_queue):
+    """Yield entries from a job queue until END_OF_ENTRIES"""
+    while True:
+        entry = job_queue.get()
+        if entry is END_OF_ENTRIES:
+            return
+        yield entry
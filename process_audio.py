@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 import os
-import sys
 import glob
 import time
-from de_noise import reduce_noise
+import argparse
+import concurrent.futures
+from de_noise import reduce_noise, reduce_noise_streaming
+from batch_schedule import probe_batch, CostModel, longest_first, predict_makespan, format_eta
+from memory_admission import MemoryAdmission, STREAMING
 
 def find_file_in_downloads(keyword):
     """
@@ -14,17 +17,68 @@ def find_file_in_downloads(keyword):
     matches = glob.glob(pattern)
     return matches
 
+def process_file(audio_file, mode=None):
+    """
+    Denoise one file; returns (output_file, seconds), output_file is None on failure
+
+    mode STREAMING keeps only one chunk in memory (for files too large to load whole)
+    """
+    print(f"\nTarget file: {audio_file}")
+    
+    # Check if file exists
+    if not os.path.exists(audio_file):
+        print(f"❌ Error: File '{audio_file}' does not exist.")
+        return None, 0.0
+    
+    try:
+        total_start_time = time.time()
+        
+        print("\nStarting file processing...")
+        print("- Processing progress bar and timing for each stage will be displayed")
+        print("- Processing may take some time for large files")
+        print("- Press Ctrl+C to interrupt processing at any time")
+        print("\n----------------------------------")
+        
+        # Call noise reduction function with default parameters
+        # For large files, you can add parameter: chunk_duration=60 (or other suitable value)
+        if mode == STREAMING:
+            output_file = reduce_noise_streaming(audio_file)
+        else:
+            output_file = reduce_noise(audio_file)
+        
+        total_time = time.time() - total_start_time
+        
+        print("\n----------------------------------")
+        print(f"\n✅ Noise reduction processing complete!")
+        print(f"Total time: {total_time:.2f} seconds")
+        print(f"Original file: {audio_file}")
+        print(f"Processed file: {output_file}")
+        return output_file, total_time
+        
+    except Exception as e:
+        print(f"❌ Processing failed: {str(e)}")
+        print("Please check the error message and try to resolve the issue.")
+        return None, 0.0
+
 def main():
+    parser = argparse.ArgumentParser(description='Reduce background noise in audio files')
+    parser.add_argument('files', nargs='*', help='Audio files to process (default: search ~/Downloads)')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='Number of files processed in parallel, default 1')
+    parser.add_argument('--memory-budget', type=float, default=None,
+                        help='GB the running jobs may use together, default 75%% of the available memory')
+    args = parser.parse_args()
+    
     print("=== Audio Noise Reduction Tool ===")
     print("This tool will help you process the specified audio file to reduce background noise")
     print("\nUsage:")
     print("1. Run this script directly and it will try to search for files automatically")
-    print("2. Or specify a file path: python process_audio.py /path/to/your/audio/file.m4a")
+    print("2. Or specify file paths: python process_audio.py [-j WORKERS] /path/to/your/audio/file.m4a [more files...]")
     
     # Check if there are command line arguments
-    if len(sys.argv) > 1:
-        # User provided a file path
-        audio_files = [os.path.expanduser(sys.argv[1])]
+    if args.files:
+        # User provided file paths
+        audio_files = [os.path.expanduser(f) for f in args.files]
     else:
         # Try to search for files automatically
         print("\nAttempting to search for audio files automatically...")
@@ -72,40 +126,90 @@ def main():
                 print("❌ Invalid input, will process the first file")
                 audio_files = [audio_files[0]]
     
-    for audio_file in audio_files:
-        print(f"\nTarget file: {audio_file}")
-        
-        # Check if file exists
-        if not os.path.exists(audio_file):
-            print(f"❌ Error: File '{audio_file}' does not exist.")
-            continue
-        
-        try:
-            total_start_time = time.time()
-            
-            print("\nStarting file processing...")
-            print("- Processing progress bar and timing for each stage will be displayed")
-            print("- Processing may take some time for large files")
-            print("- Press Ctrl+C to interrupt processing at any time")
-            print("\n----------------------------------")
-            
-            # Call noise reduction function with default parameters
-            # For large files, you can add parameter: chunk_duration=60 (or other suitable value)
-            output_file = reduce_noise(audio_file)
-            
-            total_time = time.time() - total_start_time
-            
-            print("\n----------------------------------")
-            print(f"\n✅ Noise reduction processing complete!")
-            print(f"Total time: {total_time:.2f} seconds")
-            print(f"Original file: {audio_file}")
-            print(f"Processed file: {output_file}")
-            
-        except KeyboardInterrupt:
-            print("\n⚠️ Processing interrupted by user.")
-        except Exception as e:
-            print(f"❌ Processing failed: {str(e)}")
-            print("Please check the error message and try to resolve the issue.")
+    # Longest files first: with several workers no long file is left running alone at the end
+    probes = probe_batch(audio_files)
+    cost_model = CostModel()
+    audio_files = longest_first(audio_files, lambda f: cost_model.cost(probes[f]))
+    workers = max(1, min(args.workers, len(audio_files)))
+    if len(audio_files) > 1:
+        print(f"\nProcessing order (longest first, {workers} workers):")
+        for i, audio_file in enumerate(audio_files, 1):
+            guess = " (estimated from file size)" if probes[audio_file]['estimated'] else ""
+            print(f"{i}. {os.path.basename(audio_file)}: {format_eta(probes[audio_file]['duration'])} of audio{guess}")
+    predicted = predict_makespan([cost_model.cost(probes[f]) for f in audio_files], workers)
+    print(f"Predicted processing time: about {format_eta(predicted)}")
+    
+    # Files too large to load whole are streamed; the rest start only while memory fits
+    admission = MemoryAdmission(int(args.memory_budget * 2**30) if args.memory_budget else None)
+    plans = {f: admission.plan(f, probes[f]) for f in audio_files}
+    
+    try:
+        if workers == 1:
+            for i, audio_file in enumerate(audio_files):
+                output_file, total_time = process_file(audio_file, plans[audio_file][0])
+                if output_file:
+                    cost_model.observe(probes[audio_file], total_time)
+                remaining = audio_files[i + 1:]
+                if remaining:
+                    eta = predict_makespan([cost_model.cost(probes[f]) for f in remaining], 1)
+                    print(f"\n{len(remaining)} files left, about {format_eta(eta)} to go")
+        else:
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+            try:
+                queued = list(audio_files)
+                futures = {}
+                running = set()
+                failed = []
+                while queued or running:
+                    # Longest first, skipping files that don't fit in memory yet
+                    broken = False
+                    for audio_file in list(queued):
+                        if len(running) >= workers:
+                            break
+                        if admission.try_admit(plans[audio_file][1]):
+                            try:
+                                future = executor.submit(process_file, audio_file, plans[audio_file][0])
+                            except concurrent.futures.BrokenExecutor:
+                                # Broke since the last check; the file waits for the new pool
+                                admission.release(plans[audio_file][1])
+                                broken = True
+                                break
+                            queued.remove(audio_file)
+                            futures[future] = audio_file
+                            running.add(future)
+                    if running:
+                        done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    else:
+                        done = set()
+                    for future in done:
+                        audio_file = futures[future]
+                        admission.release(plans[audio_file][1])
+                        try:
+                            output_file, total_time = future.result()
+                        except concurrent.futures.BrokenExecutor:
+                            # A worker died (e.g. killed when memory ran out); its files fail
+                            print(f"❌ {os.path.basename(audio_file)} failed: a worker process died")
+                            failed.append(audio_file)
+                            broken = True
+                            continue
+                        if output_file:
+                            cost_model.observe(probes[audio_file], total_time)
+                    if broken and not running:
+                        # A broken pool can't run anything again; the rest of the batch gets a new one
+                        print("Restarting the worker pool")
+                        executor.shutdown(wait=False)
+                        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+                    left = queued + [futures[f] for f in running]
+                    if left:
+                        # Rough: the files still running are counted as not started
+                        eta = predict_makespan([cost_model.cost(probes[f]) for f in left], workers)
+                        print(f"\n{len(left)} files left, at most about {format_eta(eta)} to go")
+                if failed:
+                    print(f"\n❌ {len(failed)} file(s) failed: {', '.join(os.path.basename(f) for f in failed)}")
+            finally:
+                executor.shutdown(wait=True)
+    except KeyboardInterrupt:
+        print("\n⚠️ Processing interrupted by user.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
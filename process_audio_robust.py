@@ -4,9 +4,31 @@ import sys
 import glob
 import time
 import signal
-import subprocess
 from pathlib import Path
 
+# Warm worker pool shared by every run_noise_reduction() call in this process
+_pool = None
+
+def get_pool(workers=1, timeout=300):
+    """
+    Return the shared denoise worker pool, starting it on first use
+    """
+    global _pool
+    if _pool is None:
+        # Imported here so the file helpers work without the audio stack
+        from denoise_pool import DenoisePool
+        _pool = DenoisePool(workers=workers, timeout=timeout)
+    return _pool
+
+def close_pool():
+    """
+    Stop the shared worker pool
+    """
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
 class TimeoutException(Exception):
     pass
 
@@ -52,10 +74,16 @@ def list_audio_files():
         print(f"Error listing audio files: {str(e)}")
         return []
 
-def run_noise_reduction(input_file, timeout=300):
+def run_noise_reduction(input_file, timeout=300, pool=None):
     """
     Run noise reduction processing with timeout mechanism
+
+    The work runs in a pre-imported worker process (see denoise_pool.py), so
+    only the first file pays for importing librosa and noisereduce. A job that
+    exceeds the timeout has its worker killed and replaced.
     """
+    from denoise_pool import PoolJobError
+
     try:
         # Ensure input file exists
         if not os.path.exists(input_file):
@@ -70,42 +98,23 @@ def run_noise_reduction(input_file, timeout=300):
         print(f"Output file will be saved as: {output_file}")
         print(f"Timeout set to: {timeout} seconds")
         
-        # Use subprocess to run noise reduction with timeout
-        cmd = [
-            sys.executable,
-            '-c',
-            f"import soundfile as sf; import librosa; import noisereduce as nr; import numpy as np;"
-            f"audio_data, sr = librosa.load('{input_file}', sr=None);"
-            f"noise_sample = audio_data[:int(2.0 * sr)];"
-            f"reduced_noise = nr.reduce_noise(y=audio_data, y_noise=noise_sample, sr=sr);"
-            f"sf.write('{output_file}', reduced_noise, sr)"
-        ]
-        
-        # Using shell=False is safer, but requires proper handling of spaces and special characters in paths
+        # Paths are sent to the worker as values, so quotes and spaces need no escaping
+        pool = pool or get_pool(timeout=timeout)
         start_time = time.time()
-        result = subprocess.run(
-            cmd,
-            check=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=timeout,
-            shell=False
-        )
-        
-        if result.returncode == 0:
-            total_time = time.time() - start_time
-            print(f"✅ Noise reduction processing complete!")
-            print(f"Total time: {total_time:.2f} seconds")
-            print(f"Processed file: {output_file}")
-            return True
-        else:
-            print(f"❌ Processing failed, return code: {result.returncode}")
-            print(f"Error output: {result.stderr}")
-            return False
+        pool.denoise(input_file, output_file, timeout=timeout)
+        
+        total_time = time.time() - start_time
+        print(f"✅ Noise reduction processing complete!")
+        print(f"Total time: {total_time:.2f} seconds")
+        print(f"Processed file: {output_file}")
+        return True
             
-    except subprocess.TimeoutExpired:
-        print(f"❌ Processing timed out, exceeded {timeout} seconds")
+    except PoolJobError as e:
+        if 'timed out' in str(e):
+            print(f"❌ Processing timed out, exceeded {timeout} seconds")
+        else:
+            print(f"❌ Processing failed")
+            print(f"Error output: {str(e)}")
         return False
     except Exception as e:
         print(f"❌ Error during processing: {str(e)}")
@@ -176,19 +185,29 @@ def main():
     print("This tool provides more stable audio noise processing functionality")
     print("\nUsage:")
     print("1. Run this script directly and it will display a list of processable audio files")
-    print("2. Or specify a file path: python process_audio_robust.py /path/to/your/audio/file.m4a")
+    print("2. Or specify file paths: python process_audio_robust.py /path/to/your/audio/file.m4a [more files...]")
     print("\nNote: This version enhances handling of paths with special characters and adds timeout mechanism")
     
     # Check if there are command line arguments
     if len(sys.argv) > 1:
-        # User provided a file path
-        input_file = os.path.expanduser(sys.argv[1])
+        # User provided file paths
+        input_files = [os.path.expanduser(arg) for arg in sys.argv[1:]]
         
-        # Try to process directly
-        success = run_noise_reduction(input_file)
+        if len(input_files) > 1:
+            # Several files: keep a few warm workers busy in parallel
+            import concurrent.futures
+            workers = min(len(input_files), max(1, (os.cpu_count() or 2) // 2))
+            get_pool(workers=workers)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(run_noise_reduction, input_files))
+            failed = [f for f, ok in zip(input_files, results) if not ok]
+            print(f"\nProcessed {len(input_files) - len(failed)}/{len(input_files)} files")
+        else:
+            # Try to process directly
+            failed = [] if run_noise_reduction(input_files[0]) else input_files
         
-        if not success:
-            print("\nAttempting to process with alternative method...")
+        for input_file in failed:
+            print(f"\nAttempting to process {input_file} with alternative method...")
             alt_script = create_alternative_script(input_file)
     else:
         # Display all audio files in Downloads folder
@@ -226,6 +245,8 @@ def main():
         except ValueError:
             print("❌ Invalid input")
     
+    close_pool()
+    
     print("\n💡 Tips:")
     print("1. If timeout occurs when processing large files, you can modify the timeout parameter in the script")
     print("2. If filenames contain special characters, it's recommended to rename them first")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+import queue
+
+
+class ProgressRelay:
+    """
+    Pass progress events from worker threads to the Tk main loop.
+
+    Workers call post() which never blocks. The Tk loop drains the queue at a
+    fixed frame rate, keeps only the newest event per key and hands those to
+    the apply callback, so a hook firing hundreds of times per second costs
+    one widget update per frame.
+    """
+
+    def __init__(self, root, apply_callback, fps=15):
+        """
+        Args:
+            root: Tk root (or any widget) used to schedule the drain loop
+            apply_callback: Called on the Tk thread with each coalesced event
+            fps (int): Drain rate in frames per second
+        """
+        self.root = root
+        self.apply_callback = apply_callback
+        self.interval_ms = max(1, int(1000 / fps))
+        self.queue = queue.SimpleQueue()
+        self._after_id = None
+
+    def post(self, event, key=None):
+        """
+        Queue a progress event from any thread.
+
+        Args:
+            event: Value passed to the apply callback
+            key: Events with the same key are coalesced; only the latest is applied
+        """
+        self.queue.put((key, event))
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        # Apply whatever is still pending so the final state is shown
+        self.flush()
+
+    def flush(self):
+        """Apply all pending events now (Tk thread only)"""
+        latest = {}
+        while True:
+            try:
+                key, event = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            # Re-inserting moves the key to the end, keeping update order
+            latest.pop(key, None)
+            latest[key] = event
+        for event in latest.values():
+            try:
+                self.apply_callback(event)
+            except Exception as e:
+                print(f"Error applying progress update: {str(e)}")
+
+    def _drain(self):
+        self.flush()
+        self._after_id = self.root.after(self.interval_ms, self._drain)
+
+
+def summarize_ytdl_progress(d):
+    """
+    Turn a yt-dlp progress hook dictionary into display values.
+
+    Uses total_bytes, then total_bytes_estimate, then fragment counts to work
+    out the percentage.
+
+    Args:
+        d (dict): Dictionary passed to a yt-dlp progress hook
+
+    Returns:
+        dict: status, percentage (None if unknown), speed (bytes/s), eta,
+              downloaded_bytes, total_bytes, fragment_index, fragment_count, filename
+    """
+    status = d.get('status')
+    downloaded = d.get('downloaded_bytes') or 0
+    total = d.get('total_bytes') or d.get('total_bytes_estimate')
+    fragment_index = d.get('fragment_index')
+    fragment_count = d.get('fragment_count')
+
+    percentage = None
+    if status == 'finished':
+        percentage = 100.0
+    elif total:
+        percentage = min(100.0, downloaded / total * 100)
+    elif fragment_index and fragment_count:
+        percentage = min(100.0, fragment_index / fragment_count * 100)
+
+    return {
+        'status': status,
+        'percentage': percentage,
+        'speed': d.get('speed') or 0,
+        'eta': d.get('eta'),
+        'downloaded_bytes': downloaded,
+        'total_bytes': total,
+        'fragment_index': fragment_index,
+        'fragment_count': fragment_count,
+        'filename': d.get('filename'),
+        'elapsed': d.get('elapsed'),
+        # Filled in by callers that download over several connections
+        'connections': 1,
+    }
+
+
+def format_progress_text(summary):
+    """Build the status bar text for a summary from summarize_ytdl_progress()"""
+    if summary['status'] == 'finished':
+        return "Processing final file..."
+
+    parts = ["Downloading..."]
+    if summary['percentage'] is not None:
+        parts.append(f"{summary['percentage']:.1f}%")
+    if summary['fragment_count']:
+        parts.append(f"(fragment {summary['fragment_index'] or 0}/{summary['fragment_count']})")
+    if summary['speed']:
+        parts.append(f"{summary['speed'] / (1024 * 1024):.2f} MB/s")
+    if summary.get('connections', 1) > 1:
+        parts.append(f"[{summary['connections']} connections]")
+    if summary['eta'] is not None:
+        parts.append(f"ETA {int(summary['eta'])}s")
+    return " ".join(parts)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+import ssl
+import time
+import threading
+import urllib.request
+import concurrent.futures
+
+# Small, always-available target used to measure each route
+DEFAULT_TEST_URL = 'https://www.youtube.com/favicon.ico'
+
+# Proxy the scripts have traditionally used
+DEFAULT_CUSTOM_PROXY = 'http://127.0.0.1:7890'
+
+
+class ProbeResult:
+    """Outcome of probing one route"""
+
+    def __init__(self, name, proxy, connect_time=None, throughput=None, error=None):
+        self.name = name
+        self.proxy = proxy
+        self.connect_time = connect_time
+        self.throughput = throughput
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def score(self, payload_bytes):
+        """Estimated seconds to fetch payload_bytes over this route (lower is better)"""
+        if not self.ok:
+            return float('inf')
+        transfer = payload_bytes / self.throughput if self.throughput else 0.0
+        return self.connect_time + transfer
+
+    def describe(self):
+        if not self.ok:
+            return f"{self.name}: failed ({self.error})"
+        speed = f"{self.throughput / 1024:.0f} KB/s" if self.throughput else "n/a"
+        return f"{self.name}: connect {self.connect_time * 1000:.0f} ms, {speed}"
+
+
+def probe_route(name, proxy, test_url=DEFAULT_TEST_URL, timeout=5.0, max_bytes=256 * 1024):
+    """
+    Measure connect time and throughput of one route.
+
+    Args:
+        name (str): Route name for reporting ('direct', 'system', 'custom')
+        proxy (str): Proxy URL, or None to connect directly
+        test_url (str): URL fetched through the route
+        timeout (float): Socket timeout in seconds
+        max_bytes (int): Stop reading after this many bytes
+
+    Returns:
+        ProbeResult
+    """
+    # Same certificate handling as the downloaders
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+
+    # An empty ProxyHandler disables environment proxies for the direct route
+    proxies = {'http': proxy, 'https': proxy} if proxy else {}
+    opener = urllib.request.build_opener(
+        urllib.request.ProxyHandler(proxies),
+        urllib.request.HTTPSHandler(context=context)
+    )
+
+    start = time.monotonic()
+    try:
+        with opener.open(test_url, timeout=timeout) as response:
+            connect_time = time.monotonic() - start
+            received = 0
+            read_start = time.monotonic()
+            while received < max_bytes:
+                block = response.read(min(64 * 1024, max_bytes - received))
+                if not block:
+                    break
+                received += len(block)
+            read_time = time.monotonic() - read_start
+    except Exception as e:
+        return ProbeResult(name, proxy, error=str(e))
+
+    # Tiny payloads finish instantly; don't report an absurd throughput
+    throughput = received / read_time if received and read_time > 0.001 else None
+    return ProbeResult(name, proxy, connect_time=connect_time, throughput=throughput)
+
+
+def probe_routes(routes, test_url=DEFAULT_TEST_URL, timeout=5.0, max_bytes=256 * 1024):
+    """
+    Probe several routes in parallel.
+
+    Args:
+        routes (list): (name, proxy) pairs; proxy None means direct
+
+    Returns:
+        list: ProbeResult per route, in the given order
+    """
+    if not routes:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(routes)) as executor:
+        futures = [
+            executor.submit(probe_route, name, proxy, test_url, timeout, max_bytes)
+            for name, proxy in routes
+        ]
+        return [future.result() for future in futures]
+
+
+def select_fastest(results, payload_bytes=10 * 1024 * 1024):
+    """
+    Pick the route expected to fetch payload_bytes fastest.
+
+    Returns:
+        ProbeResult: The best working route, or None if every route failed
+    """
+    working = [r for r in results if r.ok]
+    if not working:
+        return None
+    return min(working, key=lambda r: r.score(payload_bytes))
+
+
+class RouteSelector:
+    """
+    Keep track of the fastest route and re-probe it periodically.
+
+    best_route() probes on first use and again once recheck_interval seconds
+    have passed, so every job gets a recent decision without probing each time.
+    """
+
+    def __init__(self, test_url=DEFAULT_TEST_URL, recheck_interval=300, timeout=5.0,
+                 max_bytes=256 * 1024, payload_bytes=10 * 1024 * 1024):
+        self.test_url = test_url
+        self.recheck_interval = recheck_interval
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.payload_bytes = payload_bytes
+        self.lock = threading.Lock()
+        self.routes = None
+        self.best = None
+        self.results = []
+        self.checked_at = 0.0
+
+    def best_route(self, routes, log=print):
+        """
+        Return the fastest route among routes, re-probing when stale.
+
+        Args:
+            routes (list): (name, proxy) pairs; proxy None means direct
+            log: Function used to report probe results
+
+        Returns:
+            ProbeResult: The chosen route, or None if every route failed
+        """
+        routes = list(routes)
+        with self.lock:
+            stale = time.time() - self.checked_at > self.recheck_interval
+            if self.best is None or stale or routes != self.routes:
+                self.results = probe_routes(routes, self.test_url, self.timeout, self.max_bytes)
+                self.best = select_fastest(self.results, self.payload_bytes)
+                self.routes = routes
+                self.checked_at = time.time()
+                for result in self.results:
+                    log(f"Route probe - {result.describe()}")
+                if self.best is not None:
+                    log(f"Fastest route: {self.best.name}")
+                else:
+                    log("All routes failed the probe")
+            return self.best
+
+    def invalidate(self):
+        """Force a new probe on the next call, e.g. after a download error"""
+        with self.lock:
+            self.checked_at = 0.0
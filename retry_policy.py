@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+import time
+import random
+import threading
+import collections
+import urllib.parse
+
+# Longest a stalled transfer may go without noticing a cancel (seconds)
+CANCEL_POLL_SECONDS = 1.0
+
+# Error classes returned by classify_error()
+RETRYABLE = 'retryable'
+RATE_LIMITED = 'rate_limited'
+FATAL = 'fatal'
+
+# Message fragments (lower case) of errors that retrying won't fix
+FATAL_PATTERNS = (
+    'video unavailable',
+    'private video',
+    'this video has been removed',
+    'members-only',
+    'sign in to confirm your age',
+    'unsupported url',
+    'is not a valid url',
+    'http error 404',
+    'http error 410',
+    'requested format is not available',
+    'no video formats found',
+    'copyright',
+)
+
+# Message fragments of errors caused by the host throttling us
+RATE_LIMIT_PATTERNS = (
+    'http error 429',
+    'too many requests',
+    'rate-limit',
+    'rate limit',
+)
+
+# Message fragments of transient network and server errors
+RETRYABLE_PATTERNS = (
+    'timed out',
+    'timeout',
+    'connection reset',
+    'connection refused',
+    'connection aborted',
+    'remote end closed',
+    'incompleteread',
+    'incomplete read',
+    'temporary failure in name resolution',
+    'network is unreachable',
+    'unable to download',
+    'http error 403',  # usually an expired stream URL; a new attempt resolves again
+    'http error 500',
+    'http error 502',
+    'http error 503',
+    'http error 504',
+    'did not get any data blocks',
+    'content too short',
+    # yt-dlp's reports once its own retries (turned off by retry_options) ran out
+    'giving up after',
+    'not found, unable to continue',
+)
+
+
+def classify_error(error):
+    """
+    Decide whether an error is worth retrying.
+
+    Args:
+        error (Exception): Exception raised by yt-dlp or the network stack
+
+    Returns:
+        str: RETRYABLE, RATE_LIMITED or FATAL
+    """
+    if type(error).__name__ in ('DownloadCancelled', 'UserNotLive'):
+        return FATAL
+    message = str(error).lower()
+    if any(pattern in message for pattern in FATAL_PATTERNS):
+        return FATAL
+    if any(pattern in message for pattern in RATE_LIMIT_PATTERNS):
+        return RATE_LIMITED
+    if any(pattern in message for pattern in RETRYABLE_PATTERNS):
+        return RETRYABLE
+    # Unknown errors are not retried: a retry of the whole job is expensive,
+    # and a transient error worth retrying should get a pattern above
+    return FATAL
+
+
+def host_of(url):
+    """Host name used to key circuit breakers ('' for non-URLs)"""
+    return urllib.parse.urlparse(url).hostname or ''
+
+
+class CircuitOpen(Exception):
+    """Raised when a host's circuit stays open longer than the caller wants to wait"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker over a sliding window of recent outcomes.
+
+    closed:    requests pass; once at least min_requests outcomes are in the
+               window and the failure ratio reaches failure_ratio, it opens
+    open:      new requests wait until cooldown seconds have passed
+    half-open: one trial request passes; success closes the breaker, failure
+               opens it again with a doubled cooldown (up to max_cooldown)
+    """
+
+    def __init__(self, failure_ratio=0.5, window=20, min_requests=5, cooldown=30.0, max_cooldown=600.0):
+        self.failure_ratio = failure_ratio
+        self.min_requests = min_requests
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.outcomes = collections.deque(maxlen=window)
+        self.state = 'closed'
+        self.opened_at = 0.0
+        self.trial_running = False
+        self.condition = threading.Condition()
+
+    def before_request(self, max_wait=None, log=print, name=''):
+        """
+        Block while the breaker is open.
+
+        Raises:
+            CircuitOpen: If it would have to wait longer than max_wait seconds
+        """
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        announced = False
+        with self.condition:
+            while True:
+                if self.state == 'closed':
+                    return
+                remaining = self.opened_at + self.cooldown - time.monotonic()
+                if remaining <= 0 and not self.trial_running:
+                    self.state = 'half-open'
+                    self.trial_running = True
+                    return
+                if not announced:
+                    log(f"Too many errors from {name or 'host'}, pausing new requests for {max(remaining, 0):.0f} seconds")
+                    announced = True
+                wait = remaining if remaining > 0 else 1.0
+                if deadline is not None:
+                    if time.monotonic() + wait > deadline:
+                        raise CircuitOpen(f"Circuit for {name or 'host'} is open")
+                self.condition.wait(wait)
+
+    def record(self, success):
+        with self.condition:
+            if self.state == 'half-open':
+                self.trial_running = False
+                if success:
+                    self.state = 'closed'
+                    self.cooldown = self.base_cooldown
+                    self.outcomes.clear()
+                else:
+                    self._open(min(self.cooldown * 2, self.max_cooldown))
+                self.condition.notify_all()
+                return
+            self.outcomes.append(success)
+            failures = self.outcomes.count(False)
+            if (not success and self.state == 'closed' and len(self.outcomes) >= self.min_requests
+                    and failures / len(self.outcomes) >= self.failure_ratio):
+                self._open(self.cooldown)
+
+    def _open(self, cooldown):
+        self.state = 'open'
+        self.cooldown = cooldown
+        self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Retry transient failures with jittered exponential backoff.
+
+    Attempt n (0-based) waits a random time in [0, min(max_delay, base_delay * 2**n)]
+    ("full jitter"), so parallel jobs don't retry in lockstep. Rate-limit
+    errors use rate_limit_factor times longer delays. Every host gets a
+    CircuitBreaker, shared by all jobs using this policy.
+    """
+
+    def __init__(self, max_attempts=5, base_delay=2.0, max_delay=120.0, rate_limit_factor=4.0,
+                 breaker_options=None, seed=None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limit_factor = rate_limit_factor
+        self.breaker_options = breaker_options or {}
+        self.breakers = {}
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+
+    def delay(self, attempt, error_class=RETRYABLE):
+        """Seconds to wait before retry number attempt + 1"""
+        base = self.base_delay * (self.rate_limit_factor if error_class == RATE_LIMITED else 1)
+        cap = min(self.max_delay, base * (2 ** attempt))
+        return self.random.uniform(0, cap)
+
+    def breaker(self, host):
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(**self.breaker_options)
+            return self.breakers[host]
+
+    def call(self, func, *args, url=None, log=print, description='request', **kwargs):
+        """
+        Call func(*args, **kwargs), retrying retryable errors.
+
+        Args:
+            func: Function to call
+            url (str): URL the call talks to; picks the circuit breaker
+            log: Function used to report retries
+            description (str): What is being attempted, for log messages
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            The last error when it is fatal or the attempts are used up
+        """
+        host = host_of(url) if url else ''
+        breaker = self.breaker(host)
+        for attempt in range(self.max_attempts):
+            breaker.before_request(log=log, name=host)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                error_class = classify_error(e)
+                # Fatal errors are about the video, not the host's health
+                breaker.record(error_class == FATAL)
+                if error_class == FATAL or attempt + 1 >= self.max_attempts:
+                    raise
+                wait = self.delay(attempt, error_class)
+                log(f"{description} failed ({error_class}): {str(e).strip()[:200]}")
+                log(f"Retrying in {wait:.1f} seconds (attempt {attempt + 2}/{self.max_attempts})")
+                time.sleep(wait)
+                continue
+            breaker.record(True)
+            return result
+
+
+def retry_options(policy, outer=True, retries=5):
+    """
+    yt-dlp options for its own low-level retries (HTTP reads, fragments, extractor).
+
+    Only one layer may retry, or the attempts and backoff times multiply.
+    With outer=True the caller retries through policy.call(), so yt-dlp's own
+    retries are turned off and its failures surface right away (a missing
+    fragment fails instead of being skipped); the next attempt continues the
+    '.part' file. With outer=False yt-dlp retries on its own, up to retries
+    times with the policy's backoff.
+    """
+    if outer:
+        return {
+            'retries': 0,
+            'fragment_retries': 0,
+            'extractor_retries': 0,
+            'skip_unavailable_fragments': False,
+        }
+
+    def sleep(n):
+        return policy.delay(n)
+    # Same policy -> same key, so pooled yt-dlp sessions can still be shared
+    sleep.profile_key = ('retry_sleep', id(policy))
+
+    return {
+        'retries': retries,
+        'fragment_retries': retries,
+        'extractor_retries': 2,
+        'retry_sleep_functions': {
+            'http': sleep,
+            'fragment': sleep,
+            'extractor': sleep,
+        },
+    }
+
+
+def cancel_options(cancel_event, poll_interval=CANCEL_POLL_SECONDS, retries=30, max_delay=10.0):
+    """
+    yt-dlp options that stop a download soon after cancel_event is set.
+
+    Progress hooks only run when data arrives, so a stalled connection never
+    reaches them. Here the socket times out after poll_interval seconds
+    instead; yt-dlp then reconnects and resumes, calling the retry sleep
+    function first, which raises DownloadCancelled once cancel_event is set.
+    As every stall uses up a retry, retries is higher than yt-dlp's default.
+    """
+    def sleep(n):
+        # Back off between reconnects, but wake up as soon as the download is cancelled
+        if cancel_event.wait(min(max_delay, 0.5 * 2 ** n)):
+            from yt_dlp.utils import DownloadCancelled
+            raise DownloadCancelled("Download cancelled by user")
+        return 0
+    # Same event -> same key, so pooled yt-dlp sessions can still be shared
+    sleep.profile_key = ('cancel_sleep', id(cancel_event))
+
+    return {
+        'socket_timeout': poll_interval,
+        'retries': retries,
+        'fragment_retries': retries,
+        'retry_sleep_functions': {
+            'http': sleep,
+            'fragment': sleep,
+        },
+    }
@@ -10,6 +10,17 @@ import subprocess
 import re
 import urllib.request
 import shutil
+import glob
+
+from progress_relay import ProgressRelay, summarize_ytdl_progress, format_progress_text
+from bounded_log import BoundedLog, DEFAULT_MAX_LINES
+from format_policy import bandwidth_saver_selector, SPEECH_TARGET_KBPS
+from artifact_store import ArtifactManifest
+from playlist import is_collection_url, enumerate_entries, start_entry_producer, iter_queue
+from segmented_download import segmented_download_options, describe_connections, ThroughputTracker
+from ydl_session import YdlSessionPool
+from proxy_probe import RouteSelector
+from retry_policy import cancel_options
 
 # Lazy imports for heavy libraries
 yt_dlp = None
@@ -42,28 +53,58 @@ class SimpleYouTubeDownloader:
         # Track if download is in progress
         self.download_in_progress = False
         
+        # Lines kept in the status pane; older lines go to the log file
+        self.log_max_lines = DEFAULT_MAX_LINES
+        
+        # Set by cancel_download; checked by the yt-dlp progress hook and, when the
+        # connection stalls, by the retry sleep function (see cancel_options)
+        self.cancel_event = threading.Event()
+        # Final filenames reported by the progress hook, used to find partial files on cancel
+        self.active_downloads = set()
+        
+        # yt-dlp instances reused across downloads with the same options
+        self.ydl_sessions = YdlSessionPool()
+        
         # Proxy settings
         self.system_proxy = self.detect_system_proxy()
         self.use_system_proxy = tk.BooleanVar(value=bool(self.system_proxy))
         self.use_custom_proxy = tk.BooleanVar(value=False)
         self.custom_proxy_url = tk.StringVar(value="http://127.0.0.1:7890")
+        # Probe direct/system/custom routes and use the fastest one
+        self.auto_select_route = tk.BooleanVar(value=False)
+        self.route_selector = RouteSelector()
         
-        # Download type (audio or video)
+        # Download type (audio, video, or video plus a stream-copied audio file)
         self.download_type = tk.StringVar(value="audio")
         
         # Format selection
         self.format_var = tk.StringVar(value="m4a")
         
+        # Pick the smallest audio stream that is good enough for speech
+        self.bandwidth_saver = tk.BooleanVar(value=False)
+        
+        # Connections per file (segmented download); 1 keeps yt-dlp's default downloader
+        self.connections = tk.IntVar(value=1)
+        self.active_connections = 1
+        self.throughput = ThroughputTracker()
+        
         # Noise reduction options
         self.apply_denoise = tk.BooleanVar(value=False)
         self.keep_original_audio = tk.BooleanVar(value=True)
         
+        # Keep .part files on cancel so the next download can resume them
+        self.keep_partial_files = tk.BooleanVar(value=False)
+        
         # Initialize ffmpeg status to False before GUI creation
         self.has_ffmpeg = False
         
         # Create GUI components
         self.create_widgets()
         
+        # Progress events from the yt-dlp thread are queued and applied by the Tk loop
+        self.progress_relay = ProgressRelay(self.root, self.apply_progress)
+        self.progress_relay.start()
+        
         # Now check for ffmpeg installation after GUI is ready
         self.check_ffmpeg_installation()
         
@@ -127,6 +168,10 @@ class SimpleYouTubeDownloader:
         
         ttk.Radiobutton(type_frame, text="Audio Only", variable=self.download_type, value="audio", command=self.toggle_format_options).pack(side=tk.LEFT, padx=10)
         ttk.Radiobutton(type_frame, text="Video with Audio (Single File)", variable=self.download_type, value="video", command=self.toggle_format_options).pack(side=tk.LEFT, padx=10)
+        ttk.Radiobutton(type_frame, text="Video + Audio File", variable=self.download_type, value="video_audio", command=self.toggle_format_options).pack(side=tk.LEFT, padx=10)
+        
+        ttk.Spinbox(type_frame, from_=1, to=16, increment=1, textvariable=self.connections, width=4).pack(side=tk.RIGHT)
+        ttk.Label(type_frame, text="Connections:").pack(side=tk.RIGHT, padx=(10, 5))
         
         # Format selection
         self.format_frame = ttk.LabelFrame(main_frame, text="Format Options", padding="10")
@@ -137,6 +182,8 @@ class SimpleYouTubeDownloader:
         self.m4a_radio.pack(side=tk.LEFT, padx=10)
         self.mp3_radio = ttk.Radiobutton(self.format_frame, text="MP3 (Compatibility)", variable=self.format_var, value="mp3")
         self.mp3_radio.pack(side=tk.LEFT, padx=10)
+        self.bandwidth_saver_check = ttk.Checkbutton(self.format_frame, text="Bandwidth Saver (Speech)", variable=self.bandwidth_saver)
+        self.bandwidth_saver_check.pack(side=tk.LEFT, padx=10)
         
         # Noise reduction options
         self.denoise_frame = ttk.LabelFrame(main_frame, text="Audio Enhancement", padding="10")
@@ -177,6 +224,14 @@ class SimpleYouTubeDownloader:
         )
         self.custom_proxy_check.pack(anchor=tk.W, pady=(0, 5))
         
+        # Automatic fastest-route selection
+        ttk.Checkbutton(
+            proxy_frame,
+            text="Auto-select Fastest Route (probes direct, system and custom proxy)",
+            variable=self.auto_select_route,
+            command=self.toggle_proxy_options
+        ).pack(anchor=tk.W, pady=(0, 5))
+        
         # Custom proxy URL entry
         proxy_entry_frame = ttk.Frame(proxy_frame)
         proxy_entry_frame.pack(fill=tk.X, pady=(0, 5))
@@ -201,6 +256,12 @@ class SimpleYouTubeDownloader:
         self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_download, state=tk.DISABLED)
         self.cancel_button.pack(side=tk.LEFT)
         
+        ttk.Checkbutton(
+            button_frame,
+            text="Keep partial files on cancel (resume later)",
+            variable=self.keep_partial_files
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
         # Progress bar
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(main_frame, variable=self.progress_var, maximum=100)
@@ -218,10 +279,18 @@ class SimpleYouTubeDownloader:
         self.info_var = tk.StringVar(value="Ready. Please enter a YouTube URL and click Download.")
         info_bar = ttk.Label(self.root, textvariable=self.info_var, relief=tk.SUNKEN, anchor=tk.W)
         info_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        # Bounded, frame-batched log for the status pane
+        self.log = BoundedLog(self.root, self.status_text, self.info_var,
+                              name='simple_downloader', max_lines=self.log_max_lines)
     
     def toggle_proxy_options(self):
         """Toggle the state of proxy options based on user selections"""
-        if self.use_system_proxy.get():
+        if self.auto_select_route.get():
+            # Every route is a candidate; the custom URL stays editable
+            self.custom_proxy_check.config(state=tk.DISABLED)
+            self.proxy_entry.config(state=tk.NORMAL)
+        elif self.use_system_proxy.get():
             # Disable custom proxy options if system proxy is selected
             self.use_custom_proxy.set(False)
             self.custom_proxy_check.config(state=tk.DISABLED)
@@ -240,6 +309,7 @@ class SimpleYouTubeDownloader:
             self.m4a_radio.config(state=tk.NORMAL)
             self.mp3_radio.pack(side=tk.LEFT, padx=10)  # Make MP3 option visible
             self.mp3_radio.config(state=tk.NORMAL)
+            self.bandwidth_saver_check.config(state=tk.NORMAL)
             self.format_frame.config(text="Audio Format Options")
             # Enable noise reduction options for audio
             self.denoise_frame.config(state=tk.NORMAL)
@@ -249,7 +319,11 @@ class SimpleYouTubeDownloader:
             # For video downloads, hide audio format options
             self.m4a_radio.config(state=tk.DISABLED)
             self.mp3_radio.pack_forget()  # Hide MP3 option
-            self.format_frame.config(text="Video will be downloaded in MP4 format")
+            self.bandwidth_saver_check.config(state=tk.DISABLED)
+            if self.download_type.get() == "video_audio":
+                self.format_frame.config(text="MP4 video plus its audio track copied to M4A/Opus (no re-encoding)")
+            else:
+                self.format_frame.config(text="Video will be downloaded in MP4 format")
             # Disable noise reduction options for video
             self.denoise_frame.config(state=tk.DISABLED)
             self.denoise_checkbox.config(state=tk.DISABLED)
@@ -304,12 +378,8 @@ class SimpleYouTubeDownloader:
             self.log_message(f"ERROR: ffmpeg is required but error occurred: {str(e)}")
     
     def log_message(self, message):
-        self.status_text.config(state=tk.NORMAL)
-        timestamp = time.strftime("%H:%M:%S")
-        self.status_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.status_text.see(tk.END)
-        self.status_text.config(state=tk.DISABLED)
-        self.info_var.set(message)
+        """Add a message to the status log (safe to call from worker threads)"""
+        self.log.append(message)
     
     def start_download(self):
         url = self.url_entry.get().strip()
@@ -329,21 +399,134 @@ class SimpleYouTubeDownloader:
         self.download_button.config(state=tk.DISABLED)
         self.cancel_button.config(state=tk.NORMAL)
         self.download_in_progress = True
+        self.cancel_event.clear()
+        self.active_downloads.clear()
+        try:
+            self.active_connections = max(1, int(self.connections.get()))
+        except (tk.TclError, ValueError):
+            self.active_connections = 1
         
+        # Playlists and channels are enumerated and downloaded one entry at a time
+        if is_collection_url(url):
+            threading.Thread(target=self.download_collection, args=(url,), daemon=True).start()
         # Start appropriate download method based on selection
-        if self.download_type.get() == "audio":
+        elif self.download_type.get() == "audio":
             threading.Thread(target=self.download_audio, args=(url,), daemon=True).start()
+        elif self.download_type.get() == "video_audio":
+            threading.Thread(target=self.download_video, args=(url, True), daemon=True).start()
         else:
             threading.Thread(target=self.download_video, args=(url,), daemon=True).start()
     
     def cancel_download(self):
         self.download_in_progress = False
-        self.log_message("Download cancelled.")
-        self.download_button.config(state=tk.NORMAL)
+        # The progress hook raises on its next call, aborting the yt-dlp transfer;
+        # a stalled transfer times out and its retry sleep raises (see cancel_options)
+        self.cancel_event.set()
+        self.log_message("Cancelling download...")
+        # Download stays disabled until the worker thread has stopped and calls reset_ui;
+        # a new download before that would clear cancel_event and revive the old one
         self.cancel_button.config(state=tk.DISABLED)
         self.progress_var.set(0)
     
-    def download_audio(self, url):
+    def cleanup_partial_files(self):
+        """Remove or keep the partial files of a cancelled download"""
+        if self.keep_partial_files.get():
+            self.log_message("Partial files kept; download the same URL again to resume.")
+            return
+        
+        removed = 0
+        for filename in self.active_downloads:
+            # yt-dlp writes '<name>.part', '<name>.part-FragN' and '<name>.ytdl' while downloading
+            candidates = glob.glob(glob.escape(filename) + '.part*') + glob.glob(glob.escape(filename) + '.ytdl')
+            for path in candidates:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError as e:
+                    self.log_message(f"Could not remove partial file {os.path.basename(path)}: {str(e)}")
+        self.active_downloads.clear()
+        if removed:
+            self.log_message(f"Removed {removed} partial file(s).")
+    
+    def download_for_type(self, url, reset_ui_when_done=True):
+        """Download one URL according to the selected download type"""
+        if self.download_type.get() == "audio":
+            self.download_audio(url, reset_ui_when_done)
+        elif self.download_type.get() == "video_audio":
+            self.download_video(url, True, reset_ui_when_done)
+        else:
+            self.download_video(url, False, reset_ui_when_done)
+    
+    def candidate_routes(self):
+        """Routes considered by automatic route selection: (name, proxy) pairs"""
+        routes = [('direct', None)]
+        if self.system_proxy:
+            routes.append(('system', self.system_proxy))
+        custom = self.custom_proxy_url.get().strip()
+        if custom and custom != self.system_proxy:
+            routes.append(('custom', custom))
+        return routes
+    
+    def resolve_proxy(self):
+        """Return the proxy to use for the next job (None for direct) and log the choice"""
+        if self.auto_select_route.get():
+            # Cached between jobs and re-probed every few minutes
+            best = self.route_selector.best_route(self.candidate_routes(), log=self.log_message)
+            if best is None:
+                self.log_message("No route passed the probe, trying a direct connection")
+                return None
+            self.log_message(f"Using fastest route: {best.name}" + (f" ({best.proxy})" if best.proxy else ""))
+            return best.proxy
+        
+        if self.use_system_proxy.get() and self.system_proxy:
+            self.log_message(f"Using system proxy: {self.system_proxy}")
+            return self.system_proxy
+        if self.use_custom_proxy.get():
+            proxy = self.custom_proxy_url.get().strip()
+            if proxy:
+                self.log_message(f"Using custom proxy: {proxy}")
+                return proxy
+            self.log_message("Custom proxy URL is empty, not using proxy")
+            return None
+        self.log_message("Not using proxy")
+        return None
+    
+    def download_collection(self, url):
+        """
+        Download every video of a playlist or channel.
+        
+        The listing is read with flat extraction by a producer thread into a
+        bounded queue; entries are downloaded one by one as they arrive.
+        """
+        stop_event = threading.Event()
+        count = 0
+        try:
+            self.log_message(f"Enumerating playlist/channel: {url}")
+            base_opts = {'nocheckcertificate': True, 'socket_timeout': 30}
+            proxy = self.resolve_proxy()
+            if proxy:
+                base_opts['proxy'] = proxy
+            
+            entries = enumerate_entries(url, base_opts)
+            job_queue, _ = start_entry_producer(entries, maxsize=20, stop_event=stop_event)
+            for entry in iter_queue(job_queue):
+                if self.cancel_event.is_set():
+                    break
+                count += 1
+                self.log_message(f"[{entry['index']}] {entry['title']}")
+                self.download_for_type(entry['url'], reset_ui_when_done=False)
+            
+            if self.cancel_event.is_set():
+                self.log_message(f"Playlist download cancelled after {count} item(s).")
+            else:
+                self.log_message(f"Playlist download finished: {count} item(s).")
+        except Exception as e:
+            self.log_message(f"Error: {str(e)}")
+        finally:
+            stop_event.set()
+            self.root.after(0, self.reset_ui)
+    
+    def download_audio(self, url, reset_ui_when_done=True):
         try:
             self.log_message(f"Starting audio download from: {url}")
             
@@ -356,27 +539,25 @@ class SimpleYouTubeDownloader:
             else:  # mp3
                 format_str = 'bestaudio'
             
+            # Bitrate for MP3 conversion
+            mp3_quality = '192'
+            
+            if self.bandwidth_saver.get():
+                # Smallest stream meeting the speech targets; for M4A only m4a streams
+                # are considered when available so no transcode is needed
+                format_str = bandwidth_saver_selector(
+                    preferred_ext='m4a' if format == "m4a" else None,
+                    log=self.log_message
+                )
+                # Encoding above the source bitrate only adds bytes
+                mp3_quality = str(SPEECH_TARGET_KBPS['mp3'])
+            
             # Determine proxy settings
-            proxy = None
-            if self.use_system_proxy.get() and self.system_proxy:
-                proxy = self.system_proxy
-                self.log_message(f"Using system proxy: {proxy}")
-            elif self.use_custom_proxy.get():
-                proxy = self.custom_proxy_url.get().strip()
-                if proxy:
-                    self.log_message(f"Using custom proxy: {proxy}")
-                else:
-                    self.log_message("Custom proxy URL is empty, not using proxy")
-            else:
-                self.log_message("Not using proxy")
+            proxy = self.resolve_proxy()
             
             ydl_opts = {
                 # Add SSL configuration
                 'nocheckcertificate': True,
-                # Increase retry count
-                'retries': 10,
-                # Set timeout
-                'socket_timeout': 30,
                 # Download audio format
                 'format': format_str,
                 # Progress hook for updates
@@ -394,12 +575,19 @@ class SimpleYouTubeDownloader:
             if proxy:
                 ydl_opts['proxy'] = proxy
             
+            # Short socket timeouts let Cancel stop a stalled transfer within about a second
+            ydl_opts.update(cancel_options(self.cancel_event))
+            
+            # Split the transfer over several connections if requested
+            ydl_opts.update(segmented_download_options(self.active_connections))
+            self.log_message(f"Download mode: {describe_connections(self.active_connections)}")
+            
             # If we want MP3, use postprocessor to convert
             if format == "mp3":
                 ydl_opts['postprocessors'] = [{
                     'key': 'FFmpegExtractAudio',
                     'preferredcodec': 'mp3',
-                    'preferredquality': '192',
+                    'preferredquality': mp3_quality,
                 }]
             else:
                 # No postprocessors needed for M4A format
@@ -407,7 +595,7 @@ class SimpleYouTubeDownloader:
             
             # Import heavy libraries when needed
             yt_dlp_lib, reduce_noise_func = _import_heavy_libraries()
-            with yt_dlp_lib.YoutubeDL(ydl_opts) as ydl:
+            with self.ydl_sessions.session(ydl_opts) as ydl:
                 # Check if download was cancelled before starting
                 if not self.download_in_progress:
                     return
@@ -453,37 +641,37 @@ class SimpleYouTubeDownloader:
                 self.log_message(f"File saved to: {self.download_dir}")
                 
         except Exception as e:
-            self.log_message(f"Error: {str(e)}")
+            if self.cancel_event.is_set():
+                self.log_message("Download cancelled.")
+                self.cleanup_partial_files()
+            else:
+                self.log_message(f"Error: {str(e)}")
         finally:
-            # Reset UI state
-            self.root.after(0, self.reset_ui)
+            # Reset UI state (a playlist download resets it once at the end)
+            if reset_ui_when_done:
+                self.root.after(0, self.reset_ui)
                 
-    def download_video(self, url):
+    def download_video(self, url, extract_audio=False, reset_ui_when_done=True):
+        """
+        Download a video; with extract_audio, also stream-copy its audio track
+        into a separate M4A/Opus file from the same download.
+        """
+        extracted_audio = []
+        
+        def on_postprocess(d):
+            if d['status'] == 'finished' and d.get('postprocessor') == 'ExtractAudio':
+                extracted_audio.append(d['info_dict'].get('filepath'))
+        
         try:
             self.log_message(f"Starting video download from: {url}")
             self.log_message("Note: Video files may be large, please ensure you have enough disk space.")
             
             # Determine proxy settings
-            proxy = None
-            if self.use_system_proxy.get() and self.system_proxy:
-                proxy = self.system_proxy
-                self.log_message(f"Using system proxy: {proxy}")
-            elif self.use_custom_proxy.get():
-                proxy = self.custom_proxy_url.get().strip()
-                if proxy:
-                    self.log_message(f"Using custom proxy: {proxy}")
-                else:
-                    self.log_message("Custom proxy URL is empty, not using proxy")
-            else:
-                self.log_message("Not using proxy")
+            proxy = self.resolve_proxy()
             
             ydl_opts = {
                 # Add SSL configuration
                 'nocheckcertificate': True,
-                # Increase retry count
-                'retries': 10,
-                # Set timeout
-                'socket_timeout': 30,
                 # Download merged video format (MP4 is preferred)
                 'format': 'best[ext=mp4]/best',
                 # Disable automatic merging feature
@@ -503,9 +691,28 @@ class SimpleYouTubeDownloader:
             if proxy:
                 ydl_opts['proxy'] = proxy
             
+            # Short socket timeouts let Cancel stop a stalled transfer within about a second
+            ydl_opts.update(cancel_options(self.cancel_event))
+            
+            # Split the transfer over several connections if requested
+            ydl_opts.update(segmented_download_options(self.active_connections))
+            self.log_message(f"Download mode: {describe_connections(self.active_connections)}")
+            
+            if extract_audio:
+                # 'best' makes FFmpegExtractAudio copy the audio stream as-is
+                # (AAC -> .m4a, Opus -> .opus) instead of re-encoding it
+                ydl_opts['postprocessors'] = [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': 'best',
+                }]
+                ydl_opts['keepvideo'] = True
+                ydl_opts['postprocessor_hooks'] = [on_postprocess]
+                ydl_opts['ffmpeg_location'] = shutil.which('ffmpeg') or ''
+                self.log_message("Audio track will be copied to a separate file after download.")
+            
             # Import heavy libraries when needed
             yt_dlp_lib, _ = _import_heavy_libraries()
-            with yt_dlp_lib.YoutubeDL(ydl_opts) as ydl:
+            with self.ydl_sessions.session(ydl_opts) as ydl:
                 # Check if download was cancelled before starting
                 if not self.download_in_progress:
                     return
@@ -529,28 +736,71 @@ class SimpleYouTubeDownloader:
                 self.log_message(f"File saved to: {self.download_dir}")
                 self.log_message("Video remains in original format and quality, no conversion needed.")
                 
+                audio_file = extracted_audio[-1] if extracted_audio else None
+                if audio_file and os.path.exists(audio_file):
+                    self.log_message(f"Audio track saved (stream copy): {os.path.basename(audio_file)}")
+                    # Record both artifacts of the single download
+                    manifest = ArtifactManifest(filename)
+                    manifest.add_variant('audio', audio_file, 'file', codec='copy')
+                    manifest.save()
+                elif extract_audio:
+                    self.log_message("Audio track could not be extracted from the video.")
+                
         except Exception as e:
-            self.log_message(f"Error: {str(e)}")
-            # Reset UI state
-            self.root.after(0, self.reset_ui)
+            if self.cancel_event.is_set():
+                self.log_message("Download cancelled.")
+                self.cleanup_partial_files()
+            else:
+                self.log_message(f"Error: {str(e)}")
+        finally:
+            # Reset UI state (a playlist download resets it once at the end)
+            if reset_ui_when_done:
+                self.root.after(0, self.reset_ui)
     
     def update_progress(self, d):
-        if d['status'] == 'downloading':
-            # Calculate progress percentage
-            if d.get('total_bytes'):
-                percentage = (d['downloaded_bytes'] / d['total_bytes']) * 100
-                self.progress_var.set(percentage)
+        # Remember the target file so its partial files can be cleaned up on cancel
+        if d.get('filename'):
+            self.active_downloads.add(d['filename'])
+        
+        # Abort the transfer: yt-dlp calls this hook for every received block,
+        # so raising here stops the download almost immediately
+        if self.cancel_event.is_set():
+            raise yt_dlp.utils.DownloadCancelled("Download cancelled by user")
+        
+        # This runs on the yt-dlp thread: only queue the event, never touch Tk here
+        if d['status'] in ('downloading', 'finished'):
+            summary = summarize_ytdl_progress(d)
+            summary['connections'] = self.active_connections
+            self.progress_relay.post(summary, key='download')
             
-            # Update status message with speed
-            speed = d.get('speed', 0)
-            if speed:
-                speed_mb = speed / (1024 * 1024)
-                self.info_var.set(f"Downloading... {speed_mb:.2f} MB/s")
-        elif d['status'] == 'finished':
-            self.progress_var.set(100)
-            self.info_var.set("Processing final file...")
+            if d['status'] == 'finished':
+                self.report_throughput(summary)
+    
+    def report_throughput(self, summary):
+        """Log the average throughput of a finished file and the gain from extra connections"""
+        average = self.throughput.record(self.active_connections, summary['downloaded_bytes'] or summary['total_bytes'], summary['elapsed'])
+        if average is None:
+            return
+        message = f"Average throughput: {average / (1024 * 1024):.2f} MB/s ({describe_connections(self.active_connections)})"
+        gain = self.throughput.gain(self.active_connections, average)
+        if gain is not None:
+            message += f", {gain:.1f}x the last single-connection download"
+        self.log_message(message)
+    
+    def apply_progress(self, summary):
+        """Show a coalesced progress summary (runs on the Tk thread)"""
+        if summary['percentage'] is not None:
+            self.progress_var.set(summary['percentage'])
+        self.info_var.set(format_progress_text(summary))
+    
+    def on_close(self):
+        """Close pooled yt-dlp sessions (saving cookies) before exiting"""
+        self.ydl_sessions.close_all()
+        self.root.destroy()
     
     def reset_ui(self):
+        # Show the final progress state before deciding whether to clear the bar
+        self.progress_relay.flush()
         self.download_button.config(state=tk.NORMAL)
         self.cancel_button.config(state=tk.DISABLED)
         self.download_in_progress = False
@@ -563,4 +813,5 @@ if __name__ == "__main__":
     
     # Create and run the application
     app = SimpleYouTubeDownloader(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
\ No newline at end of file
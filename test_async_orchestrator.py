@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+import urllib.request
+import concurrent.futures
+
+import async_orchestrator
+from fake_video_host import FakeVideoHost, FaultProfile
+from async_orchestrator import Orchestrator, ResourceLimits
+
+# Stage limits and back-pressure of the orchestrator. Downloads fetch real bytes
+# from the offline fake host; denoising is a slow copy, so finished downloads
+# must wait for it instead of piling up
+
+opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+class StageMonitor:
+    """Counts jobs inside each stage and the finished downloads waiting for denoise"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {'download': 0, 'denoise': 0}
+        self.peak = {'download': 0, 'denoise': 0}
+        self.downloaded = 0
+        self.denoise_started = 0
+        self.peak_waiting = 0
+
+    def enter(self, stage):
+        with self.lock:
+            self.running[stage] += 1
+            self.peak[stage] = max(self.peak[stage], self.running[stage])
+            if stage == 'denoise':
+                self.denoise_started += 1
+
+    def leave(self, stage):
+        with self.lock:
+            self.running[stage] -= 1
+            if stage == 'download':
+                self.downloaded += 1
+                self.peak_waiting = max(self.peak_waiting, self.downloaded - self.denoise_started)
+
+
+def make_stages(monitor, folder, denoise_seconds):
+    """Stand-ins for download_url and run_denoise with the same signatures"""
+    def download(url, ydl_opts, sessions, progress_hook=None):
+        monitor.enter('download')
+        try:
+            path = os.path.join(folder, os.path.basename(url.split('?')[0]))
+            with opener.open(url, timeout=10) as response, open(path, 'wb') as f:
+                shutil.copyfileobj(response, f)
+            return path, {'title': os.path.basename(path)}
+        finally:
+            monitor.leave('download')
+
+    def denoise(input_file, output_file=None, noise_duration=2.0, chunk_duration=30.0):
+        monitor.enter('denoise')
+        try:
+            time.sleep(denoise_seconds)
+            output_file = input_file.replace('.wav', '_denoised.wav')
+            shutil.copy(input_file, output_file)
+            return output_file
+        finally:
+            monitor.leave('denoise')
+
+    return download, denoise
+
+
+def test_stage_limits_and_backpressure():
+    monitor = StageMonitor()
+    originals = async_orchestrator.download_url, async_orchestrator.run_denoise
+    with FakeVideoHost() as host, tempfile.TemporaryDirectory() as folder:
+        ids = [f"talk{index}" for index in range(12)]
+        for video_id in ids:
+            host.add_video(video_id, duration=0.5)
+        urls = [host.media_url(video_id, FaultProfile(throttle='200K')) for video_id in ids]
+        download, denoise = make_stages(monitor, folder, denoise_seconds=0.15)
+        async_orchestrator.download_url, async_orchestrator.run_denoise = download, denoise
+
+        async def orchestrate():
+            limits = ResourceLimits(network=3, cpu=1)
+            orchestrator = Orchestrator({}, limits, queue_size=1)
+            # Threads stand in for the denoise processes so the monitor can count them
+            orchestrator.process_pool.shutdown()
+            orchestrator.process_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+            return await orchestrator.run(urls)
+
+        try:
+            jobs = asyncio.run(orchestrate())
+        finally:
+            async_orchestrator.download_url, async_orchestrator.run_denoise = originals
+
+        assert len(jobs) == len(ids)
+        assert all(job.error is None for job in jobs), [job.error for job in jobs]
+        assert all(job.file.endswith('_denoised.wav') and os.path.exists(job.file) for job in jobs)
+        # Every stage stays within its semaphore, and the download stage used all its slots
+        assert monitor.peak['download'] == 3 and monitor.peak['denoise'] == 1, monitor.peak
+        # Downloads outrun denoising, yet only one job per download worker, the queue
+        # between the stages and the job the denoise worker holds can wait: the rest
+        # of the URLs are not fetched early
+        assert 0 < monitor.peak_waiting <= 3 + 1 + 1, monitor.peak_waiting
+
+
+if __name__ == "__main__":
+    print("=== Testing async orchestrator ===")
+    test_stage_limits_and_backpressure()
+    print("Stage limits and back-pressure: OK")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+import time
+import threading
+
+from bandwidth import BandwidthManager, MIN_RATE, HEADROOM, BURST_SECONDS
+
+# Weighted max-min allocation across downloads and the token bucket in throttle()
+
+KB = 1024
+
+
+def test_fair_split_by_weight():
+    manager = BandwidthManager(700 * KB)
+    high = manager.register('audio', 'high')
+    normal = manager.register('video', 'normal')
+    low = manager.register('extra', 'low')
+    assert (high.rate, normal.rate, low.rate) == (400 * KB, 200 * KB, 100 * KB)
+
+    # A finished job's bandwidth goes back to the others
+    low.release()
+    assert round(high.rate) == round(700 * KB * 4 / 6)
+    assert round(normal.rate) == round(700 * KB * 2 / 6)
+
+
+def test_underuse_cap():
+    manager = BandwidthManager(600 * KB)
+    fast = manager.register('fast')
+    slow = manager.register('slow')
+    # The slow source only manages 100 KB/s of its 300 KB/s
+    fast.speed, slow.speed = 300 * KB, 100 * KB
+    manager.rebalance()
+    assert slow.rate == 100 * KB * HEADROOM
+    assert fast.rate == 600 * KB - slow.rate
+
+
+def test_stalled_share_keeps_a_floor():
+    manager = BandwidthManager(1000 * KB)
+    busy = manager.register('busy')
+    stalled = manager.register('stalled')
+    busy.speed, stalled.speed = 500 * KB, 0.0
+    manager.rebalance()
+    # Capped, but never to 0 (which would have read as unlimited)
+    assert stalled.rate == MIN_RATE
+    assert busy.rate == 1000 * KB - MIN_RATE
+    assert 'unlimited' not in ' '.join(manager.describe())
+
+
+def test_burst_limiting():
+    manager = BandwidthManager(1000 * KB)
+    share = manager.register('job')
+    share.throttle(0)
+
+    # After a long idle spell only BURST_SECONDS worth of data passes without waiting
+    share._last_time -= 10
+    start = time.monotonic()
+    share.throttle(int(1000 * KB * BURST_SECONDS))
+    assert time.monotonic() - start < 0.05
+
+    start = time.monotonic()
+    share.throttle(int(1000 * KB * BURST_SECONDS) + 200 * KB)
+    assert 0.15 <= time.monotonic() - start < 0.4
+
+
+def test_concurrent_fragments():
+    manager = BandwidthManager(1000 * KB)
+    share = manager.register('job')
+    share.throttle(0)
+    total = [0]
+    total_lock = threading.Lock()
+
+    def fragment_thread():
+        # Like yt-dlp's concurrent fragment threads reporting the job's running total
+        for _ in range(10):
+            with total_lock:
+                total[0] += 15 * KB
+                downloaded = total[0]
+            share.throttle(downloaded)
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=fragment_thread) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    # 600 KB at 1000 KB/s: the threads share one bucket instead of each getting the full rate
+    assert 0.5 <= elapsed < 1.5, elapsed
+    assert share._allowance <= 1000 * KB * BURST_SECONDS
+
+
+if __name__ == "__main__":
+    print("=== Testing bandwidth sharing ===")
+    test_fair_split_by_weight()
+    print("Weighted fair split: OK")
+    test_underuse_cap()
+    print("Underuse cap: OK")
+    test_stalled_share_keeps_a_floor()
+    print("Stalled-share floor: OK")
+    test_burst_limiting()
+    print("Burst limiting: OK")
+    test_concurrent_fragments()
+    print("Concurrent fragment threads: OK")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+import os
+import tempfile
+
+from fake_video_host import make_wav
+from batch_schedule import probe_duration, CostModel, longest_first, predict_makespan, format_eta
+
+# Duration probing from headers and longest-first scheduling
+
+
+def test_probe_wav_headers():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'short.wav')
+        make_wav(path, duration=3.0, sample_rate=8000)
+        probe = probe_duration(path)
+        assert abs(probe['duration'] - 3.0) < 0.01
+        assert probe['sample_rate'] == 8000 and not probe['estimated']
+
+        # Unreadable files fall back to a size-based guess
+        path = os.path.join(tmp, 'broken.m4a')
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 16000)
+        probe = probe_duration(path)
+        assert probe['estimated'] and abs(probe['duration'] - 1.0) < 0.01
+
+
+def test_longest_first_beats_list_order():
+    # One long file at the end of the list
+    costs = [10, 10, 10, 10, 40]
+    assert predict_makespan(costs, 2) == 40
+    in_order = [0, 0]
+    for cost in costs:
+        in_order[in_order.index(min(in_order))] += cost
+    assert max(in_order) == 60
+
+    assert longest_first(['a', 'b', 'c'], {'a': 1, 'b': 3, 'c': 2}.get) == ['b', 'c', 'a']
+    # Running jobs keep their workers busy
+    assert predict_makespan([5], 2, busy=[10, 1]) == 10
+
+
+def test_cost_model_learns_speed():
+    model = CostModel(samples_per_second=1000)
+    probe = {'duration': 10.0, 'sample_rate': 1000, 'estimated': False}
+    assert model.cost(probe) == 10.0
+    model.observe(probe, 5.0)
+    assert model.cost(probe) == 5.0
+    assert format_eta(3725) == '1h 02m' and format_eta(90) == '1m 30s' and format_eta(4) == '4s'
+
+
+if __name__ == "__main__":
+    print("=== Testing batch scheduling ===")
+    test_probe_wav_headers()
+    print("Duration probing: OK")
+    test_longest_first_beats_list_order()
+    print("Longest-first scheduling: OK")
+    test_cost_model_learns_speed()
+    print("Cost model: OK")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+import os
+import time
+import shutil
+import tempfile
+import threading
+import multiprocessing
+
+import denoise_batch_app
+from fake_video_host import make_wav
+from denoise_batch_app import BatchAudioDenoiseApp
+
+# Headless batch runs on the app's own worker processes: a worker that dies
+# mid-file is replaced, and Cancel terminates a worker stuck inside a file
+
+
+def copy_crash_or_hang(index, input_file, output_file, noise_duration, chunk_duration, mode=None):
+    """Stand-in for _denoise_batch_file: 'crash' files kill the worker, 'stuck' files never return"""
+    denoise_batch_app._events.put(('progress', index, 0.0))
+    name = os.path.basename(input_file)
+    if name.startswith('crash'):
+        os._exit(137)
+    if name.startswith('stuck'):
+        # Like a worker stuck loading a file: never reaches a chunk boundary
+        time.sleep(60)
+    shutil.copy(input_file, output_file)
+    return 0.01
+
+
+class FakeRoot:
+    def after(self, delay, callback):
+        pass
+
+
+class HeadlessBatch:
+    """Just enough of BatchAudioDenoiseApp to run process_batch_denoise without Tk"""
+
+    process_batch_denoise = BatchAudioDenoiseApp.process_batch_denoise
+    estimate_eta = BatchAudioDenoiseApp.estimate_eta
+
+    def __init__(self, jobs):
+        self.root = FakeRoot()
+        self.state_lock = threading.Lock()
+        # Rows start out queued, as start_batch_denoise sets them up
+        self.file_states = {input_file: ('Queued', 0.0) for input_file, _ in jobs}
+        self.cancel_event = None
+        self.denoise_in_progress = True
+        self.eta_text = ""
+        self.messages = []
+
+    def set_file_state(self, input_file, status, fraction=None):
+        # Records every change; finished rows keep their state like the real app
+        with self.state_lock:
+            old_status, old_fraction = self.file_states.get(input_file, ('Queued', 0.0))
+            if old_status not in denoise_batch_app.FINISHED_STATES:
+                self.file_states[input_file] = (status, old_fraction if fraction is None else fraction)
+
+    def status(self, input_file):
+        with self.state_lock:
+            return self.file_states.get(input_file, ('Queued', 0.0))[0]
+
+    def log_message(self, message):
+        self.messages.append(message)
+
+    def reset_ui(self):
+        pass
+
+
+class Patched:
+    """Swap module attributes of denoise_batch_app for the duration of a test"""
+
+    def __init__(self, **values):
+        self.values = values
+        self.originals = {}
+
+    def __enter__(self):
+        for name, value in self.values.items():
+            self.originals[name] = getattr(denoise_batch_app, name)
+            setattr(denoise_batch_app, name, value)
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, value in self.originals.items():
+            setattr(denoise_batch_app, name, value)
+
+
+def make_jobs(folder, names):
+    output_dir = os.path.join(folder, 'denoised')
+    os.makedirs(output_dir, exist_ok=True)
+    return [(make_wav(os.path.join(folder, name), duration=0.1),
+             os.path.join(output_dir, name.replace('.wav', '_denoised.wav'))) for name in names]
+
+
+def test_dead_worker_is_replaced():
+    spawned = []
+
+    class CountedWorker(denoise_batch_app._BatchWorker):
+        def __init__(self, *args):
+            super().__init__(*args)
+            spawned.append(self)
+
+    # Forked workers see the stand-in patched into this process
+    with Patched(_denoise_batch_file=copy_crash_or_hang, _BatchWorker=CountedWorker), \
+            tempfile.TemporaryDirectory() as folder:
+        jobs = make_jobs(folder, ['crash.wav', 'one.wav', 'two.wav'])
+        app = HeadlessBatch(jobs)
+        app.process_batch_denoise(jobs, 1, 2.0, 30.0, False, context=multiprocessing.get_context('fork'))
+
+        assert app.status(jobs[0][0]) == 'Failed'
+        assert any('worker stopped unexpectedly' in message for message in app.messages), app.messages
+        # The other files ran on the replacement worker
+        assert [app.status(input_file) for input_file, _ in jobs[1:]] == ['Done', 'Done']
+        assert all(os.path.exists(output_file) for _, output_file in jobs[1:])
+        assert len(spawned) == 2
+        assert not any(worker.process.is_alive() for worker in spawned)
+        assert app.denoise_in_progress is False
+
+
+def test_cancel_terminates_stuck_worker():
+    context = multiprocessing.get_context('fork')
+    with Patched(_denoise_batch_file=copy_crash_or_hang, CANCEL_GRACE_SECONDS=0.5), \
+            tempfile.TemporaryDirectory() as folder:
+        jobs = make_jobs(folder, ['stuck.wav', 'quick.wav'])
+        stuck, quick = jobs[0][0], jobs[1][0]
+        app = HeadlessBatch(jobs)
+        cancel_event = context.Event()
+        app.cancel_event = cancel_event
+        batch = threading.Thread(target=app.process_batch_denoise,
+                                 args=(jobs, 2, 2.0, 30.0, False),
+                                 kwargs={'context': context, 'cancel_event': cancel_event})
+        batch.start()
+
+        deadline = time.time() + 10
+        while time.time() < deadline and (app.status(stuck) != 'Processing' or app.status(quick) != 'Done'):
+            time.sleep(0.05)
+        assert (app.status(stuck), app.status(quick)) == ('Processing', 'Done')
+
+        # Cancel: the stuck worker ignores it and is terminated after the grace period
+        start = time.time()
+        cancel_event.set()
+        batch.join(10)
+        assert not batch.is_alive(), "batch did not stop after cancel"
+        assert time.time() - start < 5
+        assert app.status(stuck) == 'Cancelled' and app.status(quick) == 'Done'
+        assert any('cancelled' in message for message in app.messages), app.messages
+        assert app.cancel_event is None
+
+
+if __name__ == "__main__":
+    print("=== Testing batch denoise workers ===")
+    test_dead_worker_is_replaced()
+    print("Dead worker replaced: OK")
+    test_cancel_terminates_stuck_worker()
+    print("Cancel terminates stuck worker: OK")
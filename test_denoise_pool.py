@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+import os
+import time
+
+from denoise_pool import DenoisePool, PoolJobError
+
+# The warm pool with plain stdlib jobs: workers are reused, killed on timeout
+# and recycled after a number of jobs or on memory growth
+
+quiet = lambda message: None
+
+
+def worker_pid(value=None):
+    return os.getpid(), value
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def fail():
+    raise ValueError("bad input")
+
+
+def grow(megabytes):
+    # Kept alive in the worker on purpose, like a leak
+    grow.kept = getattr(grow, 'kept', []) + [bytearray(megabytes * 1024 * 1024)]
+    return os.getpid()
+
+
+def test_reuses_warm_worker():
+    with DenoisePool(workers=1, preload=(), log=quiet) as pool:
+        # Quotes and spaces arrive as values, not as code
+        first_pid, value = pool.run(worker_pid, "it's a \"file\".m4a")
+        second_pid, _ = pool.run(worker_pid)
+        assert value == "it's a \"file\".m4a"
+        assert first_pid == second_pid != os.getpid()
+
+
+def test_errors_and_timeout():
+    with DenoisePool(workers=1, timeout=0.5, preload=(), log=quiet) as pool:
+        pid, _ = pool.run(worker_pid)
+        try:
+            pool.run(fail)
+            assert False, "expected PoolJobError"
+        except PoolJobError as e:
+            assert 'bad input' in str(e)
+        # A failed job doesn't cost the worker
+        assert pool.run(worker_pid)[0] == pid
+
+        try:
+            pool.run(sleep_for, 5)
+            assert False, "expected a timeout"
+        except PoolJobError as e:
+            assert 'timed out' in str(e)
+        # The stuck worker was replaced
+        assert pool.run(worker_pid)[0] != pid
+        assert pool.run(sleep_for, 0.1, timeout=2) == 0.1
+
+
+def test_recycling():
+    with DenoisePool(workers=1, max_jobs=2, preload=(), log=quiet) as pool:
+        pids = [pool.run(worker_pid)[0] for _ in range(4)]
+        assert pids[0] == pids[1] != pids[2] == pids[3]
+
+    with DenoisePool(workers=1, max_memory_growth_mb=50, preload=(), log=quiet) as pool:
+        first = pool.run(grow, 80)
+        assert pool.run(grow, 1) != first
+        assert pool.recycled == 1
+
+
+def test_fails_when_no_workers_left():
+    with DenoisePool(workers=1, timeout=0.3, preload=(), log=quiet) as pool:
+        # Replacements can't start (e.g. the audio modules broke), so the stuck worker is the last one
+        def cannot_start():
+            raise RuntimeError("import failed")
+        pool._start_worker = cannot_start
+        try:
+            pool.run(sleep_for, 5)
+            assert False, "expected a timeout"
+        except PoolJobError as e:
+            assert 'timed out' in str(e)
+
+        start = time.time()
+        try:
+            pool.run(worker_pid)
+            assert False, "expected PoolJobError"
+        except PoolJobError as e:
+            assert 'no denoise workers left' in str(e).lower()
+        assert time.time() - start < 2
+
+
+if __name__ == "__main__":
+    print("=== Testing warm denoise worker pool ===")
+    test_reuses_warm_worker()
+    print("Warm worker reuse: OK")
+    test_errors_and_timeout()
+    print("Job errors and timeouts: OK")
+    test_recycling()
+    print("Recycling by job count and memory: OK")
+    test_fails_when_no_workers_left()
+    print("No workers left: OK")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+import os
+import time
+import tempfile
+import urllib.error
+import urllib.request
+
+from fake_video_host import FakeVideoHost, FaultProfile
+
+# Exercises the offline stand-in for the video site; the last test runs yt-dlp
+# against it when yt-dlp is installed
+
+# Connect directly; never send localhost requests to a configured proxy
+opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+def fetch(url, start=None):
+    request = urllib.request.Request(url)
+    if start is not None:
+        request.add_header('Range', f"bytes={start}-")
+    with opener.open(request, timeout=5) as response:
+        return response.status, response.read()
+
+
+def test_failures_then_resume_after_truncation():
+    with FakeVideoHost() as host:
+        host.add_video('talk', duration=2)
+        expected = open(host.videos['talk']['path'], 'rb').read()
+        url = host.media_url('talk', FaultProfile(fail_first=2, fail_status=429, truncate_after=10000))
+
+        for _ in range(2):
+            try:
+                fetch(url)
+                assert False, "expected an injected failure"
+            except urllib.error.HTTPError as e:
+                assert e.code == 429
+
+        # The first successful response is cut short...
+        partial = b''
+        try:
+            fetch(url)
+        except Exception as e:
+            partial = getattr(e, 'partial', b'')
+        assert 0 < len(partial) <= 10000
+
+        # ...and a range request picks up where it stopped
+        status, rest = fetch(url, start=len(partial))
+        assert status == 206
+        assert partial + rest == expected
+        assert host.request_count('talk') == 4
+
+
+def test_throttle_and_stall():
+    with FakeVideoHost() as host:
+        host.add_video('talk', duration=2)
+        size = os.path.getsize(host.videos['talk']['path'])
+
+        start = time.monotonic()
+        fetch(host.media_url('talk', FaultProfile(throttle=size / 0.5)))
+        throttled = time.monotonic() - start
+        assert throttled >= 0.4, throttled
+
+        start = time.monotonic()
+        fetch(host.media_url('talk', FaultProfile(stall_after=16384, stall_seconds=0.5)))
+        assert time.monotonic() - start >= 0.5
+
+
+def test_ytdlp_downloads_from_fake_host():
+    try:
+        import yt_dlp
+    except ImportError:
+        print("yt-dlp not installed, skipping download test")
+        return
+    with tempfile.TemporaryDirectory() as output_dir, FakeVideoHost() as host:
+        host.add_video('talk', 'Synthetic talk', duration=2)
+        info_json = host.write_info_json('talk', output_dir, FaultProfile(fail_first=1))
+        ydl_opts = {
+            'proxy': '',
+            'quiet': True,
+            'retries': 3,
+            'outtmpl': os.path.join(output_dir, '%(title)s [%(id)s].%(ext)s'),
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            assert ydl.download_with_info_file(info_json) == 0
+        downloaded = os.path.join(output_dir, 'Synthetic talk [talk].wav')
+        assert os.path.getsize(downloaded) == os.path.getsize(host.videos['talk']['path'])
+
+
+if __name__ == "__main__":
+    print("=== Testing the fake video host ===")
+    test_failures_then_resume_after_truncation()
+    print("Injected failures and resume: OK")
+    test_throttle_and_stall()
+    print("Throttling and stalls: OK")
+    test_ytdlp_downloads_from_fake_host()
+    print("yt-dlp download check finished")
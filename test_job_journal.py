@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+import os
+import tempfile
+import contextlib
+
+from download_job import resolve_and_download
+from retry_policy import RetryPolicy
+from job_journal import JobJournal, PHASES, RESOLVED, DOWNLOADING, DOWNLOADED, ENCODED
+
+# Phase tracking, resume and per-folder keys of the job journal
+
+URL = 'https://www.youtube.com/watch?v=BUJpAzByMjo'
+
+
+def test_phase_ordering():
+    journal = JobJournal(':memory:')
+    assert PHASES == (RESOLVED, DOWNLOADING, DOWNLOADED, ENCODED)
+    assert not journal.reached(URL, RESOLVED)
+
+    journal.record(URL, RESOLVED, label='talk', info={'title': 'talk'})
+    journal.record(URL, DOWNLOADING, filename='/tmp/talk.m4a')
+    assert journal.reached(URL, RESOLVED) and journal.reached(URL, DOWNLOADING)
+    assert not journal.reached(URL, DOWNLOADED)
+
+    # A failure keeps the phase reached so far
+    journal.record_failure(URL, 'connection reset')
+    entry = journal.get(URL)
+    assert entry['phase'] == DOWNLOADING
+    assert entry['error'] == 'connection reset' and entry['attempts'] == 1
+
+    try:
+        journal.record(URL, 'denoised')
+        assert False, "unknown phase accepted"
+    except ValueError:
+        pass
+    journal.close()
+
+
+def test_resume():
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'journal.sqlite3')
+        download = os.path.join(folder, 'talk.m4a')
+        output = os.path.join(folder, 'talk_denoised.mp3')
+        other = 'https://www.youtube.com/watch?v=other'
+
+        journal = JobJournal(path)
+        journal.record(URL, RESOLVED, output_dir=folder, info={'title': 'talk'})
+        journal.record(URL, DOWNLOADED, output_dir=folder, filename=download)
+        journal.record(other, RESOLVED, output_dir=folder, info={'title': 'other'})
+        journal.close()
+
+        # A new run sees both jobs as unfinished and reuses the resolved info
+        journal = JobJournal(path)
+        assert journal.unfinished(output_dir=folder) == [URL, other]
+        assert journal.resolved_info(other, output_dir=folder) == {'title': 'other'}
+
+        # The download only counts while the file is still on disk
+        assert journal.completed_outputs(URL, DOWNLOADED, output_dir=folder) is None
+        open(download, 'wb').close()
+        assert journal.completed_outputs(URL, DOWNLOADED, output_dir=folder) == [download]
+        assert journal.completed_outputs(URL, ENCODED, output_dir=folder) is None
+
+        open(output, 'wb').close()
+        journal.record(URL, ENCODED, output_dir=folder, outputs=[output])
+        assert journal.completed_outputs(URL, ENCODED, output_dir=folder) == [output]
+        assert journal.unfinished(output_dir=folder) == [other]
+        journal.close()
+
+
+def test_output_dir_is_part_of_the_key():
+    with tempfile.TemporaryDirectory() as folder:
+        output = os.path.join(folder, 'talk_denoised.mp3')
+        open(output, 'wb').close()
+        journal = JobJournal(':memory:')
+        journal.record(URL, ENCODED, output_dir=folder, outputs=[output])
+
+        # The same URL saved to another folder is still to do
+        other_folder = os.path.join(folder, 'elsewhere')
+        assert journal.completed_outputs(URL, ENCODED, output_dir=folder) == [output]
+        assert journal.get(URL, output_dir=other_folder) is None
+        assert journal.completed_outputs(URL, ENCODED, output_dir=other_folder) is None
+        # Equivalent spellings of a folder share one job
+        assert journal.reached(URL, ENCODED, output_dir=folder + os.sep + '.')
+        journal.close()
+
+
+class FakeSessions:
+    """Session pool whose yt-dlp refuses the stream URLs it resolved first (expired or IP-bound)"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.resolved = 0
+        self.downloaded = []
+
+    @contextlib.contextmanager
+    def session(self, ydl_opts):
+        yield self
+
+    def extract_info(self, url, download=False):
+        self.resolved += 1
+        return {'id': 'abc', 'title': 'talk', 'url': f"https://media.example/{self.resolved}"}
+
+    def sanitize_info(self, info):
+        return info
+
+    def prepare_filename(self, info):
+        return os.path.join(self.folder, 'talk [abc].mp4')
+
+    def process_ie_result(self, info, download=True):
+        if info['url'] == 'https://media.example/stale':
+            raise Exception("ERROR: unable to download video data: HTTP Error 403: Forbidden")
+        self.downloaded.append(info['url'])
+
+
+def test_retry_resolves_again():
+    with tempfile.TemporaryDirectory() as folder:
+        journal = JobJournal(':memory:')
+        # An interrupted run left stream URLs the host now refuses
+        journal.record(URL, RESOLVED, kind='video', output_dir=folder,
+                       info={'id': 'abc', 'title': 'talk', 'url': 'https://media.example/stale'})
+        sessions = FakeSessions(folder)
+        policy = RetryPolicy(max_attempts=3, base_delay=0.01, seed=1)
+        filename, info = policy.call(resolve_and_download, sessions, {}, URL, None, journal, folder,
+                                     kind='video', url=URL, log=lambda message: None)
+        # The second attempt resolved fresh URLs instead of retrying the stale ones
+        assert sessions.resolved == 1 and sessions.downloaded == ['https://media.example/1']
+        assert journal.get(URL, 'video', folder)['phase'] == DOWNLOADING
+        assert filename.endswith('talk [abc].mp4')
+        journal.close()
+
+
+if __name__ == "__main__":
+    print("=== Testing job journal ===")
+    test_phase_ordering()
+    print("Phase ordering: OK")
+    test_resume()
+    print("Resume: OK")
+    test_output_dir_is_part_of_the_key()
+    print("Output folder in the key: OK")
+    test_retry_resolves_again()
+    print("Retry resolves again: OK")
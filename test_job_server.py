@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import urllib.request
+import urllib.error
+from http.server import ThreadingHTTPServer
+
+import job_server
+from fake_video_host import make_wav
+from job_server import JobServer, make_handler, DONE, FAILED
+
+# HTTP API of the job server: request validation and denoise jobs on the
+# process pool, including a worker that dies mid-job
+
+opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+def copy_or_crash(input_file, output_file=None, noise_duration=2.0, chunk_duration=30.0):
+    """Stand-in for run_denoise in the workers: dies on 'crash' files like an OOM kill"""
+    if os.path.basename(input_file).startswith('crash'):
+        os._exit(137)
+    output_file = output_file or input_file.replace('.wav', '_denoised.wav')
+    shutil.copy(input_file, output_file)
+    return output_file
+
+
+class ApiServer:
+    """JobServer behind a local HTTP server on a free port"""
+
+    def __init__(self, download_dir):
+        self.server = JobServer(download_dir, download_workers=1, process_workers=1)
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(self.server))
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def request(self, method, path, body=None):
+        data = body if isinstance(body, bytes) else (json.dumps(body).encode() if body is not None else None)
+        request = urllib.request.Request(self.url + path, data=data, method=method)
+        try:
+            with opener.open(request, timeout=10) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def wait_for(self, job_id, states, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            _, job = self.request('GET', f'/jobs/{job_id}')
+            if job['state'] in states:
+                return job
+            time.sleep(0.05)
+        raise AssertionError(f"job {job_id} stuck in {job['state']}")
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.server.shutdown()
+
+
+def test_rejects_bad_requests():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = make_wav(os.path.join(tmp, 'talk.wav'), duration=0.1)
+        api = ApiServer(tmp)
+        try:
+            for body in (b'"x"', b'42', b'null', b'not json'):
+                status, reply = api.request('POST', '/jobs', body)
+                assert status == 400, (body, status)
+            assert api.request('POST', '/jobs', {'type': 'upload'})[0] == 400
+            assert api.request('POST', '/jobs', {'type': 'denoise', 'file': os.path.join(tmp, 'missing.wav')})[0] == 400
+            status, reply = api.request('POST', '/jobs', {'type': 'denoise', 'file': source, 'noise_duration': 'abc'})
+            assert status == 400 and 'noise_duration' in reply['error']
+            assert api.request('POST', '/jobs', {'type': 'denoise', 'file': source, 'chunk_duration': -1})[0] == 400
+            # Rejected requests leave no job behind
+            assert api.request('GET', '/jobs') == (200, [])
+            assert api.request('GET', '/jobs/unknown')[0] == 404
+            assert api.request('DELETE', '/jobs/unknown')[0] == 404
+        finally:
+            api.close()
+
+
+def test_denoise_jobs_survive_dead_worker():
+    original = job_server.run_denoise
+    job_server.run_denoise = copy_or_crash
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            crash = make_wav(os.path.join(tmp, 'crash.wav'), duration=0.1)
+            good = make_wav(os.path.join(tmp, 'good.wav'), duration=0.1)
+            api = ApiServer(tmp)
+            try:
+                status, job = api.request('POST', '/jobs', {'type': 'denoise', 'file': crash})
+                assert status == 201
+                job = api.wait_for(job['id'], (DONE, FAILED))
+                assert job['state'] == FAILED and 'died' in job['error']
+
+                # The next job runs on a new pool, with its numbers converted on submit
+                status, job = api.request('POST', '/jobs', {'type': 'denoise', 'file': good, 'noise_duration': '1.5'})
+                assert status == 201 and job['params']['noise_duration'] == 1.5
+                job = api.wait_for(job['id'], (DONE, FAILED))
+                assert job['state'] == DONE, job
+                assert os.path.exists(job['result']['denoised_file'])
+            finally:
+                api.close()
+    finally:
+        job_server.run_denoise = original
+
+
+if __name__ == "__main__":
+    print("=== Testing job server API ===")
+    test_rejects_bad_requests()
+    print("Request validation: OK")
+    test_denoise_jobs_survive_dead_worker()
+    print("Dead denoise worker: OK")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import threading
+
+from memory_admission import (MemoryAdmission, estimate_peak_bytes, FULL, VIDEO, STREAMING,
+                              PROCESS_OVERHEAD_BYTES)
+
+# Peak memory estimates, budget-limited admission and the streaming downgrade
+
+MB = 2**20
+quiet = lambda message: None
+
+hour_stereo = {'duration': 3600.0, 'sample_rate': 48000, 'channels': 2}
+
+
+def test_estimates_by_mode():
+    full = estimate_peak_bytes('talk.flac', hour_stereo, FULL)
+    video = estimate_peak_bytes('talk.mp4', hour_stereo)
+    streaming = estimate_peak_bytes('talk.flac', hour_stereo, STREAMING)
+    # One hour of 48 kHz stereo: 2 decoded channels + mono mix + output, float32
+    assert full - video == 3600 * 48000 * 4 * 3
+    assert streaming < PROCESS_OVERHEAD_BYTES + 200 * MB < video < full
+    # Streaming memory doesn't grow with the file
+    assert estimate_peak_bytes('a.flac', dict(hour_stereo, duration=36000), STREAMING) == streaming
+
+
+def test_downgrades_large_jobs():
+    admission = MemoryAdmission(budget_bytes=2048 * MB, log=quiet)
+    assert admission.plan('short.flac', dict(hour_stereo, duration=60))[0] == FULL
+    assert admission.plan('short.mp4', dict(hour_stereo, duration=60))[0] == VIDEO
+    mode, estimate = admission.plan('long.flac', hour_stereo)
+    assert mode == STREAMING and estimate < 1024 * MB
+
+
+def test_admits_within_budget():
+    admission = MemoryAdmission(budget_bytes=1000 * MB, log=quiet)
+    assert admission.try_admit(600 * MB)
+    assert not admission.try_admit(600 * MB)
+    assert admission.try_admit(300 * MB)
+
+    # A blocked job starts as soon as enough memory is released
+    started = threading.Event()
+    thread = threading.Thread(target=lambda: admission.admit(600 * MB) and started.set())
+    thread.start()
+    assert not started.wait(0.2)
+    admission.release(600 * MB)
+    assert started.wait(2)
+    thread.join()
+
+    # Nothing running: even an oversized job is admitted rather than stalling the batch
+    admission.release(300 * MB)
+    admission.release(600 * MB)
+    assert admission.try_admit(5000 * MB)
+
+
+if __name__ == "__main__":
+    print("=== Testing memory admission control ===")
+    test_estimates_by_mode()
+    print("Peak memory estimates: OK")
+    test_downgrades_large_jobs()
+    print("Streaming downgrade: OK")
+    test_admits_within_budget()
+    print("Budget-limited admission: OK")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+from playlist import _flat_entries, _select_entries, parse_playlist_items, is_collection_url
+
+# Enumeration of playlists and channels: nested channel tabs are flattened so
+# --playlist-items and the reported indices apply across all tabs
+
+CHANNEL = 'https://www.youtube.com/@speaker'
+
+
+class FakeYdl:
+    """Answers extract_info(process=False) from a dict of listings, counting requests"""
+
+    def __init__(self, listings):
+        self.listings = listings
+        self.requests = []
+
+    def extract_info(self, url, download=False, process=False):
+        self.requests.append(url)
+        return self.listings[url]
+
+
+def videos(prefix, count):
+    return [{'id': f"{prefix}{n}", 'title': f"{prefix} {n}", 'duration': 60 * n} for n in range(1, count + 1)]
+
+
+def channel_listings():
+    # Like yt-dlp's channel data: tabs come back as nested playlists with their
+    # entries, and the first tab's webpage_url is the channel URL itself
+    return {
+        CHANNEL: {'_type': 'playlist', 'webpage_url': CHANNEL, 'entries': [
+            {'_type': 'playlist', 'id': 'videos', 'webpage_url': CHANNEL, 'entries': videos('v', 3)},
+            {'_type': 'playlist', 'id': 'shorts', 'webpage_url': CHANNEL + '/shorts', 'entries': videos('s', 4)},
+            # A tab only referenced by URL is listed when it is reached
+            {'_type': 'url', 'ie_key': 'YoutubeTab', 'url': CHANNEL + '/streams'},
+        ]},
+        CHANNEL + '/streams': {'_type': 'playlist', 'entries': videos('l', 2)},
+    }
+
+
+def test_selection_spans_channel_tabs():
+    ydl = FakeYdl(channel_listings())
+    entries = list(_select_entries(_flat_entries(ydl, CHANNEL), '1-5'))
+    # Five entries in total, not five per tab, numbered without collisions
+    assert [e['index'] for e in entries] == [1, 2, 3, 4, 5]
+    assert [e['id'] for e in entries] == ['v1', 'v2', 'v3', 's1', 's2']
+    assert entries[3]['url'] == 'https://www.youtube.com/watch?v=s1'
+    # Listed tabs are not fetched again
+    assert ydl.requests == [CHANNEL]
+    # The last tab is never fetched once the selection is complete
+    assert CHANNEL + '/streams' not in ydl.requests
+
+
+def test_selection_and_filters():
+    ydl = FakeYdl(channel_listings())
+    entries = list(_select_entries(_flat_entries(ydl, CHANNEL), '2,8-', min_duration=100))
+    assert [(e['index'], e['id']) for e in entries] == [(2, 'v2'), (9, 'l2')]
+    assert ydl.requests == [CHANNEL, CHANNEL + '/streams']
+
+    selected, last = parse_playlist_items('1-20,25')
+    assert selected(25) and not selected(21) and last == 25
+    assert is_collection_url(CHANNEL) and not is_collection_url('https://www.youtube.com/watch?v=abc')
+
+
+if __name__ == "__main__":
+    print("=== Testing playlist enumeration ===")
+    test_selection_spans_channel_tabs()
+    print("Selection across channel tabs: OK")
+    test_selection_and_filters()
+    print("Selection and filters: OK")
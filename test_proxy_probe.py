@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+import time
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from proxy_probe import probe_routes, select_fastest, RouteSelector
+
+# Local stand-ins: an origin serving a test payload and forward proxies in front of it
+
+PAYLOAD = b'x' * (256 * 1024)
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_proxy_handler(delay=0.0, bytes_per_second=None):
+    """Forward proxy that adds connect delay and optionally throttles the body"""
+    class ProxyHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+            with opener.open(self.path, timeout=5) as upstream:
+                body = upstream.read()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            block = 16 * 1024
+            for i in range(0, len(body), block):
+                self.wfile.write(body[i:i + block])
+                if bytes_per_second:
+                    time.sleep(block / bytes_per_second)
+
+        def log_message(self, format, *args):
+            pass
+    return ProxyHandler
+
+
+def start_server(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_fastest_proxy_is_selected():
+    origin = start_server(OriginHandler)
+    fast = start_server(make_proxy_handler())
+    slow = start_server(make_proxy_handler(delay=0.3, bytes_per_second=512 * 1024))
+    try:
+        test_url = f"http://127.0.0.1:{origin.server_port}/payload"
+        routes = [
+            ('slow', f"http://127.0.0.1:{slow.server_port}"),
+            ('fast', f"http://127.0.0.1:{fast.server_port}"),
+            ('dead', 'http://127.0.0.1:9'),
+        ]
+        results = probe_routes(routes, test_url=test_url, timeout=2)
+        by_name = {r.name: r for r in results}
+        assert by_name['fast'].ok and by_name['slow'].ok
+        assert not by_name['dead'].ok
+        assert by_name['slow'].connect_time > by_name['fast'].connect_time
+
+        best = select_fastest(results)
+        assert best.name == 'fast', best.describe()
+    finally:
+        for server in (origin, fast, slow):
+            server.shutdown()
+
+
+def test_selector_caches_until_recheck():
+    origin = start_server(OriginHandler)
+    proxy = start_server(make_proxy_handler())
+    try:
+        test_url = f"http://127.0.0.1:{origin.server_port}/payload"
+        routes = [('proxy', f"http://127.0.0.1:{proxy.server_port}")]
+        selector = RouteSelector(test_url=test_url, recheck_interval=60, timeout=2)
+        messages = []
+        first = selector.best_route(routes, log=messages.append)
+        probes = len(messages)
+        second = selector.best_route(routes, log=messages.append)
+        assert first is second
+        assert len(messages) == probes  # no new probe within the interval
+
+        selector.invalidate()
+        selector.best_route(routes, log=messages.append)
+        assert len(messages) > probes
+    finally:
+        origin.shutdown()
+        proxy.shutdown()
+
+
+if __name__ == "__main__":
+    print("=== Testing proxy route probing with local stand-in proxies ===")
+    test_fastest_proxy_is_selected()
+    print("Fastest route selection: OK")
+    test_selector_caches_until_recheck()
+    print("Route caching and re-check: OK")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import os
+import time
+import shutil
+import tempfile
+import threading
+
+import watch_folder as watch_folder_module
+from fake_video_host import make_wav
+from watch_folder import FolderWatcher, is_up_to_date, output_path_for, watch_folder
+
+# Watch-folder ingestion in polling mode: files are reported once their
+# writes settle, partial and output files are ignored, outputs are skipped when current
+
+
+def poll_until(watcher, seconds):
+    found = []
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        found += watcher.poll()
+        time.sleep(0.05)
+    return found
+
+
+def test_reports_settled_files():
+    with tempfile.TemporaryDirectory() as folder:
+        output_dir = os.path.join(folder, 'denoised')
+        os.makedirs(output_dir)
+        watcher = FolderWatcher(folder, settle_seconds=0.3, poll_interval=0.05,
+                                ignore_dirs=[output_dir], use_inotify=False)
+        assert watcher.mode == 'polling'
+
+        # A file still being written is not reported
+        path = os.path.join(folder, 'talk.wav')
+        with open(path, 'wb') as f:
+            for _ in range(5):
+                f.write(b'\0' * 1000)
+                f.flush()
+                assert watcher.poll() == []
+                time.sleep(0.1)
+        for name in ('talk.m4a.part', '.hidden.wav', 'notes.txt', 'talk_temp.wav'):
+            with open(os.path.join(folder, name), 'wb') as f:
+                f.write(b'\0' * 100)
+        make_wav(os.path.join(output_dir, 'old_denoised.wav'), duration=0.1)
+
+        assert poll_until(watcher, 0.6) == [path]
+        # Reported once, and again only after it changes
+        assert poll_until(watcher, 0.4) == []
+        with open(path, 'ab') as f:
+            f.write(b'\0' * 10)
+        assert poll_until(watcher, 0.6) == [path]
+
+
+def test_up_to_date_outputs():
+    with tempfile.TemporaryDirectory() as folder:
+        source = os.path.join(folder, 'talk.wav')
+        make_wav(source, duration=0.1)
+        output = output_path_for(source, os.path.join(folder, 'denoised'))
+        assert output.endswith(os.path.join('denoised', 'talk_denoised.wav'))
+        assert not is_up_to_date(source, output)
+
+        os.makedirs(os.path.dirname(output))
+        make_wav(output, duration=0.1)
+        assert is_up_to_date(source, output)
+        # A newer input makes the output stale
+        later = time.time() + 10
+        os.utime(source, (later, later))
+        assert not is_up_to_date(source, output)
+
+
+def test_once_with_empty_file():
+    with tempfile.TemporaryDirectory() as folder:
+        open(os.path.join(folder, 'empty.m4a'), 'wb').close()
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(watch_folder(
+            folder, settle_seconds=0.2, poll_interval=0.05, use_inotify=False, once=True)), daemon=True)
+        thread.start()
+        thread.join(5)
+        # The empty file settles without being processed, so --once finishes
+        assert not thread.is_alive(), "--once kept waiting on the empty file"
+        assert result == {'processed': 0, 'skipped': 0, 'failed': 0}
+
+
+
+def copy_or_crash(input_file, output_file, noise_duration=2.0, chunk_duration=30.0, mode=None):
+    """Stand-in for denoise_one run in the workers: dies on 'crash' files like an OOM kill"""
+    if os.path.basename(input_file).startswith('crash'):
+        os._exit(137)
+    shutil.copy(input_file, output_file)
+    return 0.0
+
+
+def test_survives_dead_worker():
+    original = watch_folder_module.denoise_one
+    watch_folder_module.denoise_one = copy_or_crash
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            make_wav(os.path.join(folder, 'crash.wav'), duration=0.1)
+            make_wav(os.path.join(folder, 'good.wav'), duration=0.1)
+            result = watch_folder(folder, workers=1, settle_seconds=0.2, poll_interval=0.05,
+                                  use_inotify=False, once=True)
+            # The dead worker fails its file; a new pool handles the next one
+            assert result == {'processed': 1, 'skipped': 0, 'failed': 1}, result
+            assert os.path.exists(os.path.join(folder, 'denoised', 'good_denoised.wav'))
+    finally:
+        watch_folder_module.denoise_one = original
+
+
+if __name__ == "__main__":
+    print("=== Testing watch folder ===")
+    test_reports_settled_files()
+    print("Settled file detection: OK")
+    test_up_to_date_outputs()
+    print("Up-to-date outputs: OK")
+    test_once_with_empty_file()
+    print("--once with an empty file: OK")
+    test_survives_dead_worker()
+    print("Dead worker: OK")
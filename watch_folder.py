@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+import argparse
+import threading
+import concurrent.futures
+
+from batch_schedule import probe_duration, format_eta
+from memory_admission import MemoryAdmission, STREAMING
+
+# Files picked up from the watched folder
+WATCH_EXTENSIONS = ('.m4a', '.mp3', '.wav', '.flac', '.ogg', '.aac', '.opus',
+                    '.mp4', '.m4v', '.mov', '.mkv', '.webm')
+
+# Names of files that are still being written by a downloader or by us
+PARTIAL_SUFFIXES = ('.part', '.ytdl', '.tmp', '.temp', '.crdownload', '.download')
+
+# Seconds a file's size and modification time must stay unchanged before it is processed
+DEFAULT_SETTLE_SECONDS = 5.0
+
+# Seconds between scans when polling (and between readiness checks with inotify)
+DEFAULT_POLL_INTERVAL = 2.0
+
+# With inotify, still rescan the whole folder this often in case an event was missed
+FULL_RESCAN_INTERVAL = 60.0
+
+
+def output_path_for(input_file, output_dir):
+    """Where the denoised version of input_file goes"""
+    stem, ext = os.path.splitext(os.path.basename(input_file))
+    return os.path.join(output_dir, f"{stem}_denoised{ext}")
+
+
+def is_up_to_date(input_file, output_file):
+    """True if output_file exists and is newer than input_file"""
+    try:
+        return os.path.getmtime(output_file) >= os.path.getmtime(input_file)
+    except OSError:
+        return False
+
+
+def denoise_one(input_file, output_file, noise_duration=2.0, chunk_duration=30.0, mode=None):
+    """
+    Denoise one file in a pool worker.
+
+    The result is written under a hidden temporary name and renamed into
+    place, so the output folder never shows half-written files.
+
+    Returns:
+        float: Processing time in seconds
+    """
+    # Imported in the worker: the watcher itself doesn't need the audio stack
+    from de_noise import reduce_noise, reduce_noise_streaming
+
+    output_dir, name = os.path.split(output_file)
+    temp_file = os.path.join(output_dir, f".{name}")
+    start_time = time.time()
+    denoise = reduce_noise_streaming if mode == STREAMING else reduce_noise
+    try:
+        denoise(input_file, output_file=temp_file, noise_sample_duration=noise_duration,
+                chunk_duration=chunk_duration)
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    return time.time() - start_time
+
+
+class FolderWatcher:
+    """
+    Report media files in a folder once they have finished being written.
+
+    With the optional watchdog package the folder is watched through inotify
+    (FSEvents on macOS) and only files named in events are checked; without
+    it the folder is scanned every poll_interval seconds, comparing size and
+    modification time. Either way a file is reported once its size and
+    modification time stayed the same for settle_seconds, and reported again
+    only if it changes later.
+
+    Args:
+        folder (str): Folder to watch
+        settle_seconds (float): Quiet time before a file counts as complete
+        poll_interval (float): Seconds between checks
+        extensions (tuple): File extensions to pick up (lower case)
+        ignore_dirs (list): Folders whose files are never reported (e.g. the output folder)
+        recursive (bool): Also watch subfolders
+        use_inotify (bool): Use watchdog when it is installed
+    """
+
+    def __init__(self, folder, settle_seconds=DEFAULT_SETTLE_SECONDS, poll_interval=DEFAULT_POLL_INTERVAL,
+                 extensions=WATCH_EXTENSIONS, ignore_dirs=(), recursive=False, use_inotify=True):
+        self.folder = os.path.abspath(folder)
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.extensions = tuple(extensions)
+        self.ignore_dirs = [os.path.abspath(d) for d in ignore_dirs]
+        self.recursive = recursive
+        # path -> (size, mtime, time of last change) for files not yet reported
+        self.candidates = {}
+        # path -> (size, mtime) when last reported
+        self.reported = {}
+        self.touched = set()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.observer = None
+        self.last_full_scan = 0.0
+        if use_inotify:
+            self._start_observer()
+        self.mode = 'inotify' if self.observer else 'polling'
+
+    def _start_observer(self):
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                with watcher.lock:
+                    watcher.touched.add(event.src_path)
+                    if getattr(event, 'dest_path', None):
+                        watcher.touched.add(event.dest_path)
+                watcher.wakeup.set()
+
+        observer = Observer()
+        observer.schedule(Handler(), self.folder, recursive=self.recursive)
+        observer.daemon = True
+        observer.start()
+        self.observer = observer
+
+    def wants(self, path):
+        """True for media files that aren't partial downloads, hidden or in an ignored folder"""
+        name = os.path.basename(path)
+        lower = name.lower()
+        if name.startswith('.') or lower.endswith(PARTIAL_SUFFIXES) or lower.endswith('_temp.wav'):
+            return False
+        if not lower.endswith(self.extensions):
+            return False
+        path = os.path.abspath(path)
+        if any(path.startswith(d + os.sep) for d in self.ignore_dirs):
+            return False
+        if not self.recursive and os.path.dirname(path) != self.folder:
+            return False
+        return True
+
+    def _scan(self):
+        """Every wanted file in the folder"""
+        paths = []
+        for root, dirs, files in os.walk(self.folder):
+            paths.extend(os.path.join(root, name) for name in files)
+            if not self.recursive:
+                break
+        return [p for p in paths if self.wants(p)]
+
+    def poll(self):
+        """
+        Check for files that finished being written since the last call.
+
+        Returns:
+            list: Paths of settled files, oldest change first
+        """
+        now = time.time()
+        if self.observer is None or now - self.last_full_scan >= FULL_RESCAN_INTERVAL:
+            paths = set(self._scan())
+            self.last_full_scan = now
+        else:
+            with self.lock:
+                paths = {p for p in self.touched if self.wants(p)}
+                self.touched = set()
+        paths |= set(self.candidates)
+
+        settled = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Deleted or renamed away
+                self.candidates.pop(path, None)
+                self.reported.pop(path, None)
+                continue
+            version = (stat.st_size, stat.st_mtime)
+            if self.reported.get(path) == version:
+                self.candidates.pop(path, None)
+                continue
+            previous = self.candidates.get(path)
+            if previous is None or previous[:2] != version:
+                self.candidates[path] = (*version, now)
+                continue
+            if now - previous[2] >= self.settle_seconds:
+                # An empty file has nothing to denoise; it is looked at again once it changes
+                if stat.st_size > 0:
+                    settled.append((previous[2], path))
+                self.reported[path] = version
+                del self.candidates[path]
+        return [path for _, path in sorted(settled)]
+
+    def wait(self):
+        """Sleep until the next check is due (earlier when an inotify event arrives)"""
+        self.wakeup.wait(self.poll_interval)
+        self.wakeup.clear()
+
+    def stop(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+
+
+def watch_folder(folder, output_dir=None, workers=1, noise_duration=2.0, chunk_duration=30.0,
+                 settle_seconds=DEFAULT_SETTLE_SECONDS, poll_interval=DEFAULT_POLL_INTERVAL,
+                 memory_budget=None, recursive=False, use_inotify=True, once=False):
+    """
+    Denoise every media file that appears in folder, as it arrives.
+
+    Files already in the folder are handled first. Files whose output is
+    newer than the input are skipped, so restarting the watcher only picks
+    up new or changed files.
+
+    Args:
+        folder (str): Folder to watch
+        output_dir (str): Where denoised files go, default '<folder>/denoised'
+        workers (int): Files processed in parallel
+        noise_duration (float): Noise sample duration (seconds)
+        chunk_duration (float): Processing chunk duration (seconds)
+        settle_seconds (float): Quiet time before a file counts as complete
+        poll_interval (float): Seconds between checks
+        memory_budget (int): Bytes the running jobs may use together (see memory_admission)
+        recursive (bool): Also watch subfolders
+        use_inotify (bool): Use watchdog when it is installed
+        once (bool): Process what is there (once settled) and return
+
+    Returns:
+        dict: Counts of 'processed', 'skipped' and 'failed' files
+    """
+    folder = os.path.abspath(os.path.expanduser(folder))
+    output_dir = os.path.abspath(os.path.expanduser(output_dir or os.path.join(folder, 'denoised')))
+    os.makedirs(output_dir, exist_ok=True)
+
+    watcher = FolderWatcher(folder, settle_seconds, poll_interval, ignore_dirs=[output_dir],
+                            recursive=recursive, use_inotify=use_inotify)
+    admission = MemoryAdmission(memory_budget)
+    print(f"Watching {folder} ({watcher.mode}), writing to {output_dir}")
+    print(f"{workers} workers, files start once unchanged for {settle_seconds:g} seconds. Press Ctrl+C to stop.")
+
+    counts = {'processed': 0, 'skipped': 0, 'failed': 0}
+    queued = []
+    plans = {}
+    running = {}
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=max(1, workers))
+    broken = False
+    try:
+        while True:
+            for input_file in watcher.poll():
+                output_file = output_path_for(input_file, output_dir)
+                if is_up_to_date(input_file, output_file):
+                    counts['skipped'] += 1
+                    continue
+                if input_file in queued or any(job[0] == input_file for job in running.values()):
+                    continue
+                print(f"New file: {os.path.basename(input_file)}")
+                plans[input_file] = admission.plan(input_file, probe_duration(input_file), chunk_duration)
+                queued.append(input_file)
+
+            # Arrival order; files that don't fit in memory yet let smaller ones go ahead
+            for input_file in list(queued):
+                if len(running) >= workers:
+                    break
+                mode, estimate = plans[input_file]
+                if not admission.try_admit(estimate):
+                    continue
+                try:
+                    future = executor.submit(denoise_one, input_file, output_path_for(input_file, output_dir),
+                                             noise_duration, chunk_duration, mode)
+                except concurrent.futures.BrokenExecutor:
+                    # The pool broke since the last check; the file stays queued for the new pool
+                    admission.release(estimate)
+                    broken = True
+                    break
+                queued.remove(input_file)
+                del plans[input_file]
+                running[future] = (input_file, estimate)
+
+            for future in [f for f in running if f.done()]:
+                input_file, estimate = running.pop(future)
+                admission.release(estimate)
+                name = os.path.basename(input_file)
+                try:
+                    total_time = future.result()
+                    counts['processed'] += 1
+                    print(f"✅ {name} denoised in {format_eta(total_time)}")
+                except concurrent.futures.BrokenExecutor:
+                    # A worker died (e.g. killed when memory ran out); every running file fails with it
+                    counts['failed'] += 1
+                    broken = True
+                    print(f"❌ {name} failed: a worker process died")
+                except Exception as e:
+                    # Not retried until the file changes again
+                    counts['failed'] += 1
+                    print(f"❌ {name} failed: {str(e)}")
+
+            if broken and not running:
+                # A broken pool can't run anything again; the watcher keeps going with a new one
+                print("Restarting the worker pool")
+                executor.shutdown(wait=False)
+                executor = concurrent.futures.ProcessPoolExecutor(max_workers=max(1, workers))
+                broken = False
+                continue
+
+            if once and not queued and not running and not watcher.candidates:
+                break
+            if running:
+                concurrent.futures.wait(list(running), timeout=watcher.poll_interval,
+                                        return_when=concurrent.futures.FIRST_COMPLETED)
+            else:
+                watcher.wait()
+    except KeyboardInterrupt:
+        print("\nStopping: queued files are dropped, running files are abandoned")
+        executor.shutdown(wait=False, cancel_futures=True)
+        executor = None
+    finally:
+        watcher.stop()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    print(f"Processed {counts['processed']}, skipped {counts['skipped']} (up to date), failed {counts['failed']}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Watch a folder and denoise media files as they arrive',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Examples:\n"
+            "  python watch_folder.py ~/Downloads/lectures -j 4\n"
+            "  python watch_folder.py ~/Downloads/lectures --once   # catch up and exit"
+        )
+    )
+    parser.add_argument('folder', help='Folder to watch')
+    parser.add_argument('-o', '--output-dir', default=None, help="Output folder, default '<folder>/denoised'")
+    parser.add_argument('-j', '--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='Files processed in parallel, default half the cores')
+    parser.add_argument('-d', '--duration', type=float, default=2.0,
+                        help='Noise sample duration (seconds), default 2')
+    parser.add_argument('-c', '--chunk', type=float, default=30.0,
+                        help='Processing chunk duration (seconds), default 30')
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE_SECONDS,
+                        help=f'Seconds a file must stay unchanged before processing, default {DEFAULT_SETTLE_SECONDS:.0f}')
+    parser.add_argument('--poll', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f'Seconds between checks, default {DEFAULT_POLL_INTERVAL:.0f}')
+    parser.add_argument('--memory-budget', type=float, default=None,
+                        help='GB the running jobs may use together, default 75%% of the available memory')
+    parser.add_argument('-r', '--recursive', action='store_true', help='Also watch subfolders')
+    parser.add_argument('--no-inotify', action='store_true', help='Poll even when watchdog is installed')
+    parser.add_argument('--once', action='store_true', help='Process the files already there, then exit')
+    args = parser.parse_args()
+
+    if not os.path.isdir(os.path.expanduser(args.folder)):
+        print(f"Error: '{args.folder}' is not a folder")
+        sys.exit(1)
+
+    print("=== Watch Folder Noise Reduction ===")
+    watch_folder(
+        args.folder, args.output_dir, max(1, args.workers), args.duration, args.chunk,
+        args.settle, args.poll, int(args.memory_budget * 2**30) if args.memory_budget else None,
+        args.recursive, not args.no_inotify, args.once
+    )
+
+
+if __name__ == "__main__":
+    main()
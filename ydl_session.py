@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+import time
+import threading
+import contextlib
+
+# Options that change per job; sessions forward them instead of keying on them
+PER_JOB_OPTIONS = ('progress_hooks', 'postprocessor_hooks')
+
+
+def _hashable(value):
+    """Turn an option value into something usable as part of a dict key"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if callable(value):
+        # Callables (e.g. format selectors) may declare what makes them equivalent
+        return getattr(value, 'profile_key', ('callable', id(value)))
+    return value
+
+
+def profile_key(ydl_opts):
+    """
+    Key identifying an option profile (proxy, format, output template, ...).
+
+    Jobs with the same key can share a YoutubeDL instance.
+    """
+    return _hashable({k: v for k, v in ydl_opts.items() if k not in PER_JOB_OPTIONS})
+
+
+class YdlSession:
+    """
+    One long-lived YoutubeDL instance.
+
+    The instance keeps its extractor state, cookies and HTTP connection pool
+    between jobs. Progress and postprocessor hooks are forwarded to whichever
+    job currently holds the session.
+    """
+
+    def __init__(self, ydl_opts):
+        import yt_dlp
+
+        opts = {k: v for k, v in ydl_opts.items() if k not in PER_JOB_OPTIONS}
+        opts['progress_hooks'] = [self._on_progress]
+        opts['postprocessor_hooks'] = [self._on_postprocess]
+        self.ydl = yt_dlp.YoutubeDL(opts)
+        self.progress_hooks = []
+        self.postprocessor_hooks = []
+        self.jobs = 0
+        self.last_used = time.time()
+
+    def bind(self, ydl_opts):
+        """Attach a job's hooks before it uses the session"""
+        self.progress_hooks = list(ydl_opts.get('progress_hooks') or [])
+        self.postprocessor_hooks = list(ydl_opts.get('postprocessor_hooks') or [])
+        self.jobs += 1
+
+    def unbind(self):
+        self.progress_hooks = []
+        self.postprocessor_hooks = []
+        self.last_used = time.time()
+
+    def _on_progress(self, d):
+        for hook in self.progress_hooks:
+            hook(d)
+
+    def _on_postprocess(self, d):
+        for hook in self.postprocessor_hooks:
+            hook(d)
+
+    def close(self):
+        try:
+            self.ydl.close()
+        except Exception as e:
+            print(f"Error closing yt-dlp session: {str(e)}")
+
+
+class YdlSessionPool:
+    """
+    Thread-safe pool of YoutubeDL sessions keyed by option profile.
+
+    A session is used by one job at a time. Jobs with the same profile reuse
+    idle sessions; up to max_per_profile sessions are created per profile so
+    concurrent jobs don't wait on each other. Sessions idle for longer than
+    idle_timeout seconds are closed.
+    """
+
+    def __init__(self, max_per_profile=4, idle_timeout=600):
+        self.max_per_profile = max(1, max_per_profile)
+        self.idle_timeout = idle_timeout
+        self._condition = threading.Condition()
+        self._idle = {}
+        self._created = {}
+
+    @contextlib.contextmanager
+    def session(self, ydl_opts):
+        """
+        Borrow a YoutubeDL configured with ydl_opts.
+
+        Usage:
+            with pool.session(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=False)
+        """
+        key = profile_key(ydl_opts)
+        session = self._acquire(key, ydl_opts)
+        session.bind(ydl_opts)
+        try:
+            yield session.ydl
+        finally:
+            session.unbind()
+            self._release(key, session)
+
+    def _acquire(self, key, ydl_opts):
+        with self._condition:
+            self._close_expired()
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop()
+                if self._created.get(key, 0) < self.max_per_profile:
+                    self._created[key] = self._created.get(key, 0) + 1
+                    break
+                self._condition.wait()
+
+        # Creating a YoutubeDL is slow; don't hold the lock meanwhile
+        try:
+            return YdlSession(ydl_opts)
+        except Exception:
+            with self._condition:
+                self._created[key] -= 1
+                self._condition.notify_all()
+            raise
+
+    def _release(self, key, session):
+        with self._condition:
+            self._idle.setdefault(key, []).append(session)
+            self._condition.notify_all()
+
+    def _close_expired(self):
+        """Close sessions idle for longer than idle_timeout (lock held)"""
+        now = time.time()
+        for key, sessions in list(self._idle.items()):
+            keep = []
+            for session in sessions:
+                if now - session.last_used > self.idle_timeout:
+                    session.close()
+                    self._created[key] -= 1
+                else:
+                    keep.append(session)
+            self._idle[key] = keep
+
+    def close_all(self):
+        """Close every idle session"""
+        with self._condition:
+            for key, sessions in self._idle.items():
+                for session in sessions:
+                    session.close()
+                    self._created[key] -= 1
+            self._idle.clear()